@@ -0,0 +1,75 @@
+"""Фикстуры и опции бенчмарков; корпус страниц — в `benchmarks/corpus.py`."""
+import json
+from pathlib import Path
+
+import pytest
+
+
+MEMORY_BASELINE = Path(__file__).parent / "baseline" / "memory.json"
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption(
+        "--memory",
+        action="store_true",
+        help="Сравнить пиковую память с benchmarks/baseline/memory.json (базовая линия зависит от машины)",
+    )
+    parser.addoption(
+        "--memory-save",
+        action="store_true",
+        help="Перезаписать benchmarks/baseline/memory.json текущими значениями пиковой памяти",
+    )
+    parser.addoption(
+        "--memory-threshold",
+        type=float,
+        default=0.25,
+        help="Допустимый рост пиковой памяти относительно базовой линии (доля)",
+    )
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]) -> None:
+    # Замер памяти сравнивается с базовой линией конкретной машины — только по явному запросу
+    if config.getoption("--memory") or config.getoption("--memory-save"):
+        return
+    skip = pytest.mark.skip(reason="замер памяти запускается с --memory (just bench)")
+    for item in items:
+        if "memory" in item.keywords:
+            item.add_marker(skip)
+
+
+class MemoryBaseline:
+    """Базовая линия пиковой памяти: сравнение или перезапись по `--memory-save`."""
+
+    def __init__(self, path: Path, save: bool, threshold: float):
+        self._path = path
+        self._save = save
+        self._threshold = threshold
+        self._values: dict[str, int] = json.loads(path.read_text()) if path.exists() else {}
+        self.updated = False
+
+    def check(self, key: str, peak: int) -> None:
+        if self._save:
+            self._values[key] = peak
+            self.updated = True
+            return
+        baseline = self._values.get(key)
+        if baseline is None:
+            pytest.skip(f"нет базовой линии памяти для {key}, запустите just bench-save")
+        limit = baseline * (1 + self._threshold)
+        assert peak <= limit, f"{key}: пик памяти {peak} Б больше базовой линии {baseline} Б на >{self._threshold:.0%}"
+
+    def write(self) -> None:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._path.write_text(json.dumps(dict(sorted(self._values.items())), indent=2) + "\n")
+
+
+@pytest.fixture(scope="session")
+def memory_baseline(request: pytest.FixtureRequest):
+    baseline = MemoryBaseline(
+        MEMORY_BASELINE,
+        save=request.config.getoption("--memory-save"),
+        threshold=request.config.getoption("--memory-threshold"),
+    )
+    yield baseline
+    if baseline.updated:
+        baseline.write()
@@ -0,0 +1,55 @@
+"""Корпус страниц результатов ФССП для бенчмарков.
+
+Небольшие страницы лежат в `fixtures/` (обезличенные записи ответа сайта).
+Страницы на 1k и 10k строк собираются из строк `multi_region.html`: номера ИП
+делаются уникальными, заголовок региона повторяется каждые 250 строк.
+"""
+import re
+from functools import cache
+from pathlib import Path
+
+from src.infrastructure.parser import FsspHtmlParser, LxmlHtmlParser
+
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+# Движки разбора (`PARSER_ENGINE`), которые сравниваются на корпусе
+ENGINES = {"bs4": FsspHtmlParser, "lxml": LxmlHtmlParser}
+
+# Все страницы корпуса и число строк в каждой
+PAGES = {
+    "empty": 0,
+    "rows_10": 10,
+    "multi_region": 30,
+    "rows_1k": 1_000,
+    "rows_10k": 10_000,
+}
+ROW_PAGES = [name for name, rows in PAGES.items() if rows]
+
+_ROW_RE = re.compile(r"<tr>\s*<td.*?</tr>\s*", re.S)
+_REGION_RE = re.compile(r'<tr class="region-title">.*?</tr>\s*', re.S)
+_IP_RE = re.compile(r"(\d+)(/\d\d/\d+-ИП)")
+
+
+@cache
+def load_page(name: str) -> str:
+    path = FIXTURES / f"{name}.html"
+    if path.exists():
+        return path.read_text(encoding="utf-8")
+    return _scaled_page(PAGES[name])
+
+
+def _scaled_page(rows: int) -> str:
+    source = load_page("multi_region")
+    sample_rows = _ROW_RE.findall(source)
+    regions = _REGION_RE.findall(source)
+    first_row = source.index(regions[0])
+    table_end = source.index("</tbody>")
+
+    parts = []
+    for index in range(rows):
+        if index % 250 == 0:
+            parts.append(regions[(index // 250) % len(regions)])
+        row = sample_rows[index % len(sample_rows)]
+        parts.append(_IP_RE.sub(lambda match: f"{int(match.group(1)) + index}{match.group(2)}", row, count=1))
+    return source[:first_row] + "".join(parts) + source[table_end:]
@@ -0,0 +1,36 @@
+"""Локальное распознавание капчи на размеченном наборе `fixtures/captcha` (`<код>_<номер>.png`).
+
+Набор сгенерирован рендерером симулятора, как и шаблоны поставляемой модели: точность здесь
+проверяет конвейер сегментации и классификации, а не качество распознавания капч сайта ФССП.
+"""
+import pytest
+
+from src.infrastructure.captcha_ocr import default_model, evaluate, load_corpus
+
+from benchmarks.corpus import FIXTURES
+
+
+# Порог точности на наборе симулятора; о капчах сайта он ничего не говорит
+MIN_ACCURACY = 0.95
+
+
+@pytest.fixture(scope="module")
+def corpus() -> list[tuple[str, bytes]]:
+    return load_corpus(FIXTURES / "captcha")
+
+
+def test_recognize(benchmark, corpus):
+    benchmark.group = "captcha_ocr"
+    model = default_model()
+    code, png = corpus[0]
+
+    result = benchmark(model.recognize, png, len(code))
+
+    assert result.code == code
+
+
+def test_accuracy(corpus):
+    report = evaluate(default_model(), corpus, min_confidence=0.8)
+
+    assert report["accuracy"] >= MIN_ACCURACY
+    assert report["accepted_accuracy"] is None or report["accepted_accuracy"] >= MIN_ACCURACY
@@ -0,0 +1,33 @@
+"""Пиковая память полного пути: разбор страницы, модели, ответ API.
+
+tracemalloc видит только кучу Python: память libxml2 под дерево lxml в замер
+не попадает, поэтому сравнивать имеет смысл один движок с его же базовой линией.
+"""
+import tracemalloc
+
+from pydantic_core import to_json
+import pytest
+
+from src.domain import DebtorCaseList
+
+from benchmarks.corpus import ENGINES, ROW_PAGES, load_page
+
+
+pytestmark = pytest.mark.memory
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("page", ROW_PAGES)
+def test_peak_memory(memory_baseline, engine, page):
+    parser = ENGINES[engine]()
+    html = load_page(page)
+
+    tracemalloc.start()
+    try:
+        cases = DebtorCaseList.from_rows(parser.iter_cases(html))
+        to_json(cases.items)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    memory_baseline.check(f"{engine}:{page}", peak)
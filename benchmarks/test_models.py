@@ -0,0 +1,60 @@
+"""Сборка доменных моделей и сериализация ответа API."""
+from pydantic_core import to_json
+import pytest
+
+from src.domain import DebtorCaseList
+from src.infrastructure.http.schemas import DebItemList
+from src.infrastructure.parser import LxmlHtmlParser
+
+from benchmarks.corpus import PAGES, ROW_PAGES, load_page
+
+
+@pytest.fixture(scope="module")
+def parsed_rows() -> dict[str, list[dict]]:
+    parser = LxmlHtmlParser()
+    return {page: parser.parse_cases(load_page(page)) for page in ROW_PAGES}
+
+
+@pytest.mark.parametrize("page", ROW_PAGES)
+def test_from_rows(benchmark, parsed_rows, page):
+    benchmark.group = f"models:{page}"
+    rows = parsed_rows[page]
+
+    result = benchmark(DebtorCaseList.from_rows, rows)
+
+    assert len(result.items) == PAGES[page]
+
+
+@pytest.mark.parametrize("page", ROW_PAGES)
+def test_from_trusted_rows(benchmark, parsed_rows, page):
+    benchmark.group = f"models:{page}"
+    rows = parsed_rows[page]
+
+    result = benchmark(DebtorCaseList.from_trusted_rows, rows)
+
+    assert len(result.items) == PAGES[page]
+
+
+@pytest.mark.parametrize("page", ROW_PAGES)
+def test_serialize_revalidated(benchmark, parsed_rows, page):
+    """`model_dump` каждого производства и повторная валидация в `DebItemList` — путь ручек API до отказа от нее."""
+    benchmark.group = f"serialize:{page}"
+    cases = DebtorCaseList.from_rows(parsed_rows[page])
+
+    def serialize() -> bytes:
+        return DebItemList(root=[case.model_dump() for case in cases.items]).model_dump_json().encode()
+
+    body = benchmark(serialize)
+
+    assert body.startswith(b"[")
+
+
+@pytest.mark.parametrize("page", ROW_PAGES)
+def test_serialize_to_json(benchmark, parsed_rows, page):
+    """JSON ответа ручек API: производства сериализуются напрямую, без повторной валидации."""
+    benchmark.group = f"serialize:{page}"
+    cases = DebtorCaseList.from_rows(parsed_rows[page])
+
+    body = benchmark(to_json, cases.items)
+
+    assert body.startswith(b"[")
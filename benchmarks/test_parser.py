@@ -0,0 +1,43 @@
+"""Время разбора страницы результатов обоими движками парсера."""
+import pytest
+
+from src.domain.errors import CaptchaLimitExceeded
+from src.infrastructure.parser import FsspHtmlParser, LxmlHtmlParser
+
+from benchmarks.corpus import ENGINES, PAGES, load_page
+
+
+def rounds_for(rows: int) -> int:
+    # Большие страницы разбираются секундами, калибровка pytest-benchmark для них слишком долгая
+    return 3 if rows >= 10_000 else 10 if rows >= 1_000 else 50
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("page", PAGES)
+def test_parse_cases(benchmark, engine, page):
+    benchmark.group = f"parse:{page}"
+    parser = ENGINES[engine]()
+    html = load_page(page)
+
+    rows = benchmark.pedantic(parser.parse_cases, args=(html,), rounds=rounds_for(PAGES[page]), warmup_rounds=1)
+
+    assert len(rows) == PAGES[page]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_parse_captcha_limit(benchmark, engine):
+    benchmark.group = "parse:captcha_limit"
+    parser = ENGINES[engine]()
+    html = load_page("captcha_limit")
+
+    def parse() -> None:
+        with pytest.raises(CaptchaLimitExceeded):
+            parser.parse_cases(html)
+
+    benchmark(parse)
+
+
+@pytest.mark.parametrize("page", ["multi_region", "rows_1k"])
+def test_engines_parity(page):
+    html = load_page(page)
+    assert LxmlHtmlParser().parse_cases(html) == FsspHtmlParser().parse_cases(html)
@@ -1,13 +1,15 @@
 """Точка входа для MCP Server поиска исполнительных производств в ФССП."""
+import asyncio
+from contextlib import suppress
 import logging
 import sys
 
-from src.infrastructure.config import create_settings
-from src.infrastructure.logging import setup_logging
-from src.infrastructure.captcha import CaptchaSolver
-from src.infrastructure.fssp_client import FsspClient
-from src.infrastructure.parser import FsspHtmlParser
+from mcp.server.fastmcp import FastMCP
+
 from src.application.fssp_service import FsspService
+from src.infrastructure.config import Settings, create_settings
+from src.infrastructure.logging import setup_logging
+from src.infrastructure.factory import build_fssp_service
 from src.infrastructure.mcp.server import create_mcp_server
 
 
@@ -32,31 +34,33 @@ def main():
         sys.exit(1)
 
     # Инициализация зависимостей
-    solver = CaptchaSolver(settings.captcha.api_key)
-    client = FsspClient(solver)
-    parser = FsspHtmlParser()
-    service = FsspService(settings, client, parser)
+    service = build_fssp_service(settings)
 
     # Создание MCP server
     mcp = create_mcp_server(service)
 
-    # Определение транспорта
-    transport = settings.MCP_TRANSPORT.lower()
-    
-    if transport == "http":
-        # Запуск через HTTP транспорт
-        import uvicorn
-        
-        app = mcp.http_app()
-        host = settings.MCP_HOST
-        port = settings.MCP_PORT
-        
-        print(f"Запуск MCP server через HTTP на {host}:{port}", file=sys.stderr)
-        uvicorn.run(app, host=host, port=port)
-    else:
-        # Запуск через stdio (стандартный режим)
-        print("Запуск MCP server через stdio", file=sys.stderr)
-        mcp.run()
+    # Ctrl+C: uvicorn и stdio-транспорт завершаются штатно, сервис закрывается в serve
+    with suppress(KeyboardInterrupt):
+        asyncio.run(serve(mcp, service, settings))
+
+
+async def serve(mcp: FastMCP, service: FsspService, settings: Settings) -> None:
+    """Запускает MCP server выбранного транспорта; сервис запускается и закрывается один раз на процесс."""
+    await service.start()
+    try:
+        if settings.MCP_TRANSPORT.lower() == "http":
+            # Запуск через HTTP транспорт
+            import uvicorn
+
+            print(f"Запуск MCP server через HTTP на {settings.MCP_HOST}:{settings.MCP_PORT}", file=sys.stderr)
+            config = uvicorn.Config(mcp.streamable_http_app(), host=settings.MCP_HOST, port=settings.MCP_PORT)
+            await uvicorn.Server(config).serve()
+        else:
+            # Запуск через stdio (стандартный режим)
+            print("Запуск MCP server через stdio", file=sys.stderr)
+            await mcp.run_stdio_async()
+    finally:
+        await service.close()
 
 
 if __name__ == "__main__":
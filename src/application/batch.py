@@ -0,0 +1,73 @@
+import asyncio
+from dataclasses import dataclass
+from collections.abc import AsyncIterable, AsyncIterator, Iterable
+
+from src.application.fssp_service import FsspService
+from src.domain import DebtorCaseList, SearchQuery
+
+
+@dataclass
+class BatchOutcome:
+    """Результат одного запроса из пакета: либо `result`, либо `error`."""
+
+    index: int
+    query: SearchQuery
+    result: DebtorCaseList | None = None
+    error: Exception | None = None
+
+
+async def run_batch(
+    service: FsspService,
+    queries: Iterable[SearchQuery] | AsyncIterable[SearchQuery],
+    concurrency: int,
+    fresh: bool = False,
+) -> AsyncIterator[BatchOutcome]:
+    """Выполняет пакет запросов с ограничением параллелизма и отдает результаты по мере готовности.
+
+    Запросы читаются из `queries` лениво: одновременно в памяти находится не больше
+    `concurrency` задач, поэтому размер пакета не влияет на потребление памяти.
+    Ошибка отдельного запроса не прерывает пакет, а возвращается в `BatchOutcome.error`.
+    """
+    source = _aiter(queries)
+    pending: set[asyncio.Task[BatchOutcome]] = set()
+    exhausted = False
+    index = 0
+
+    try:
+        while True:
+            while not exhausted and len(pending) < concurrency:
+                try:
+                    query = await anext(source)
+                except StopAsyncIteration:
+                    exhausted = True
+                    break
+                pending.add(asyncio.create_task(_run_one(service, index, query, fresh)))
+                index += 1
+
+            if not pending:
+                return
+
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        # Потребитель ушел (например, клиент разорвал соединение) — незачем тратить капчи
+        for task in pending:
+            task.cancel()
+
+
+async def _run_one(service: FsspService, index: int, query: SearchQuery, fresh: bool) -> BatchOutcome:
+    try:
+        result = await service.search(query, fresh=fresh)
+    except Exception as exc:  # noqa: BLE001
+        return BatchOutcome(index=index, query=query, error=exc)
+    return BatchOutcome(index=index, query=query, result=result)
+
+
+async def _aiter(queries: Iterable[SearchQuery] | AsyncIterable[SearchQuery]) -> AsyncIterator[SearchQuery]:
+    if isinstance(queries, AsyncIterable):
+        async for query in queries:
+            yield query
+    else:
+        for query in queries:
+            yield query
@@ -1,27 +1,97 @@
+from contextlib import aclosing
+import time
+
+from src.application.ports import FsspFetcher
+from src.application.singleflight import SingleFlight
+from src.infrastructure.cache import ResultCache
 from src.infrastructure.config import Settings
-from src.domain import DebtorCaseList, Inn, IpNumber, Person
-from src.domain.errors import FsspUnavailable
-from src.infrastructure.fssp_client import FsspClient
+from src.domain import DebtorCaseList, Inn, IpNumber, Person, SearchQuery
+from src.domain.errors import EmptyResult, FsspUnavailable
+from src.infrastructure.metrics import INFLIGHT_LOOKUPS, LOOKUP_SECONDS, LOOKUPS_TOTAL, RESULTS_TRUNCATED_TOTAL
+from src.infrastructure.pagination import find_page_links
 from src.infrastructure.parser import FsspHtmlParser
 
 
+def _normalize(value: str | None) -> str:
+    return " ".join((value or "").split()).lower().replace("ё", "е")
+
+
+def ip_key(ip_number: IpNumber) -> str:
+    return f"ip:{ip_number.ip.strip().upper()}"
+
+
+def person_key(person: Person) -> str:
+    parts = (person.last_name, person.first_name, person.patronymic, person.birthday)
+    return "person:" + "|".join(_normalize(part) for part in parts)
+
+
+def inn_key(inn: Inn) -> str:
+    return f"inn:{inn.inn}"
+
+
 class FsspService:
     """Оркестрация запросов к ФССП: формирование URL, получение HTML, парсинг."""
 
-    def __init__(self, settings: Settings, client: FsspClient, parser: FsspHtmlParser):
+    def __init__(
+        self,
+        settings: Settings,
+        client: FsspFetcher,
+        parser: FsspHtmlParser,
+        cache: ResultCache | None = None,
+    ):
         self._settings = settings
         self._client = client
         self._parser = parser
+        self._cache = cache
+        self._inflight: SingleFlight[DebtorCaseList] = SingleFlight()
+        self._lookups = 0
+        self._multi_page_lookups = 0
+        self._pages = 0
+        self._rows = 0
+        self._truncated = 0
+
+    async def start(self) -> None:
+        await self._client.start()
+
+    async def close(self) -> None:
+        await self._client.close()
+        if self._cache is not None:
+            await self._cache.close()
+
+    async def health_check(self) -> bool:
+        return await self._client.health_check()
 
-    async def by_ip(self, ip_number: IpNumber) -> DebtorCaseList:
+    def stats(self) -> dict:
+        stats = {
+            "client": self._client.stats(),
+            "inflight": self._inflight.stats(),
+            "results": {
+                "lookups": self._lookups,
+                "multi_page_lookups": self._multi_page_lookups,
+                "pages_fetched": self._pages,
+                "rows_total": self._rows,
+                "truncated_lookups": self._truncated,
+            },
+        }
+        if self._cache is not None:
+            stats["cache"] = self._cache.stats()
+        return stats
+
+    async def search(self, query: SearchQuery, fresh: bool = False) -> DebtorCaseList:
+        """Выполняет поиск по запросу любого поддерживаемого вида."""
+        if isinstance(query, IpNumber):
+            return await self.by_ip(query, fresh=fresh)
+        if isinstance(query, Person):
+            return await self.by_person(query, fresh=fresh)
+        if isinstance(query, Inn):
+            return await self.by_inn(query, fresh=fresh)
+        raise TypeError(f"Неизвестный тип запроса: {type(query).__name__}")
+
+    async def by_ip(self, ip_number: IpNumber, fresh: bool = False) -> DebtorCaseList:
         url = self._settings.urls.ip.format(ip_number=ip_number.ip)
-        html = await self._client.fetch(url, self._settings)
-        cases = self._parser.parse_cases(html)
-        if not cases:
-            raise FsspUnavailable("ФССП вернул пустой ответ по номеру ИП")
-        return DebtorCaseList.from_rows(cases)
+        return await self._search("ip", ip_key(ip_number), url, "ФССП вернул пустой ответ по номеру ИП", fresh)
 
-    async def by_person(self, person: Person) -> DebtorCaseList:
+    async def by_person(self, person: Person, fresh: bool = False) -> DebtorCaseList:
         url = self._settings.urls.person.format(
             last_name=person.last_name,
             first_name=person.first_name,
@@ -29,16 +99,69 @@ class FsspService:
             birthday=person.birthday,
             region_id=-1,
         )
-        html = await self._client.fetch(url, self._settings)
-        cases = self._parser.parse_cases(html)
-        if not cases:
-            raise FsspUnavailable("ФССП вернул пустой ответ по человеку")
-        return DebtorCaseList.from_rows(cases)
+        return await self._search("person", person_key(person), url, "ФССП вернул пустой ответ по человеку", fresh)
 
-    async def by_inn(self, inn: Inn) -> DebtorCaseList:
+    async def by_inn(self, inn: Inn, fresh: bool = False) -> DebtorCaseList:
         url = self._settings.urls.inn.format(inn=inn.inn)
-        html = await self._client.fetch(url, self._settings)
-        cases = self._parser.parse_cases(html)
+        return await self._search("inn", inn_key(inn), url, "ФССП вернул пустой ответ по ИНН", fresh)
+
+    async def _search(self, kind: str, key: str, url: str, empty_message: str, fresh: bool) -> DebtorCaseList:
+        started = time.perf_counter()
+        outcome = "success"
+        INFLIGHT_LOOKUPS.inc()
+        try:
+            if self._cache is not None and not fresh:
+                rows = await self._cache.get(key)
+                if rows is not None:
+                    outcome = "cache_hit"
+                    return DebtorCaseList.from_trusted_rows(rows)
+
+            # Одинаковые одновременные запросы (из API, MCP или пакетной обработки) выполняются один раз
+            return await self._inflight.do(key, lambda: self._fetch(kind, key, url, empty_message))
+        except BaseException as exc:
+            outcome = type(exc).__name__
+            raise
+        finally:
+            INFLIGHT_LOOKUPS.dec()
+            LOOKUPS_TOTAL.labels(kind=kind, outcome=outcome).inc()
+            LOOKUP_SECONDS.labels(kind=kind, outcome=outcome).observe(time.perf_counter() - started)
+
+    async def _fetch(self, kind: str, key: str, url: str, empty_message: str) -> DebtorCaseList:
+        pages: dict[int, str] = {}
+        async with aclosing(self._client.fetch_pages(url, self._settings)) as stream:
+            async for number, html in stream:
+                pages[number] = html
+
+        # Страницы склеиваются по порядку: регион последней строки переходит на следующую страницу
+        cases: list[dict] = []
+        for number in sorted(pages):
+            region = cases[-1]["region"] if cases else None
+            cases.extend(self._parser.parse_cases(pages[number], region=region))
+
+        self._lookups += 1
+        self._pages += len(pages)
+        self._rows += len(cases)
+        if len(pages) > 1:
+            self._multi_page_lookups += 1
         if not cases:
-            raise FsspUnavailable("ФССП вернул пустой ответ по ИНН")
-        return DebtorCaseList.from_rows(cases)
+            # «Ничего не найдено» — окончательный ответ, а страница без таблицы и без этого блока — сбой
+            if self._parser.is_empty(pages.get(1, "")):
+                raise EmptyResult(empty_message)
+            raise FsspUnavailable(empty_message)
+        result = DebtorCaseList.from_rows(cases, truncated=self._is_truncated(pages))
+        if result.truncated:
+            self._truncated += 1
+            RESULTS_TRUNCATED_TOTAL.labels(kind=kind).inc()
+            # Неполный список не кэшируется: следующий запрос должен снова сообщить об обрезке
+            return result
+
+        if self._cache is not None:
+            await self._cache.set(kind, key, [item.model_dump() for item in result.items])
+        return result
+
+    def _is_truncated(self, pages: dict[int, str]) -> bool:
+        """Загружены страницы до лимита, а пагинация последней из них ссылается дальше."""
+        max_pages = self._settings.pagination.max_pages
+        if max_pages not in pages:
+            return False
+        return any(number > max_pages for number in find_page_links(pages[max_pages], ""))
@@ -0,0 +1,132 @@
+import asyncio
+from contextlib import suppress
+import time
+
+import structlog
+
+from src.application.fssp_service import FsspService
+from src.domain import SearchQuery, build_query, query_type
+from src.domain.errors import CaptchaError, CaptchaLimitExceeded, EmptyResult, FsspUnavailable, Overloaded
+from src.infrastructure.config import JobsConfig
+from src.infrastructure.job_store import FAILED, QUEUED, SUCCEEDED, JobRecord, SqliteJobStore
+from src.infrastructure.metrics import collect_request_timings, stage_totals
+
+
+logger = structlog.get_logger()
+
+# Ошибки, после которых повторная попытка имеет смысл; остальные (валидация, парсинг) — окончательные
+RETRYABLE_ERRORS: tuple[type[Exception], ...] = (CaptchaError, CaptchaLimitExceeded, FsspUnavailable, Overloaded)
+# Окончательные ответы сайта среди повторяемых типов: «ничего не найдено» не изменится от повтора
+FINAL_ERRORS: tuple[type[Exception], ...] = (EmptyResult,)
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 2)
+
+
+def _stages_ms(timings: list[tuple[str, float]]) -> dict[str, float]:
+    return {name: _ms(total) for name, (total, _) in stage_totals(timings).items()}
+
+
+class JobRunner:
+    """Асинхронные задания на поиск: прием, пул воркеров и повторы по типу ошибки."""
+
+    def __init__(self, service: FsspService, store: SqliteJobStore, config: JobsConfig):
+        self._service = service
+        self._store = store
+        self._config = config
+        self._wakeup = asyncio.Event()
+        self._workers: list[asyncio.Task] = []
+        self._busy = 0
+
+    async def start(self) -> None:
+        if self._store.recovered:
+            logger.info("Возвращены в очередь незавершенные задания", count=self._store.recovered)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self._config.workers)]
+
+    async def close(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        for worker in self._workers:
+            with suppress(asyncio.CancelledError):
+                await worker
+        self._workers = []
+        await self._store.close()
+
+    async def submit(self, query: SearchQuery) -> JobRecord:
+        job = await self._store.create(query_type(query), query.model_dump())
+        self._wakeup.set()
+        return job
+
+    async def get(self, job_id: str) -> JobRecord | None:
+        return await self._store.get(job_id)
+
+    async def stats(self) -> dict:
+        return {"workers": len(self._workers), "busy": self._busy, "jobs": await self._store.counts()}
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._store.claim_next()
+            if job is None:
+                self._wakeup.clear()
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self._config.poll_interval_s)
+                continue
+            self._busy += 1
+            try:
+                await self._execute(job)
+            finally:
+                self._busy -= 1
+
+    async def _execute(self, job: JobRecord) -> None:
+        started_at = time.time()
+        if job.started_at is None:
+            job.started_at = started_at
+            job.timings["queue_wait_ms"] = _ms(started_at - job.created_at)
+        attempt = {"attempt": job.attempts, "started_at": started_at}
+
+        timings: list[tuple[str, float]] = []
+        try:
+            # Этапы поиска (браузер, капча, загрузка и разбор страниц) этой попытки
+            with collect_request_timings() as timings:
+                result = await self._service.search(build_query(job.query_type, job.query))
+        except asyncio.CancelledError:
+            # Остановка процесса: задание останется в статусе running и вернется в очередь при старте
+            raise
+        except Exception as exc:  # noqa: BLE001
+            attempt.update(
+                duration_ms=_ms(time.time() - started_at), stages_ms=_stages_ms(timings), error_type=type(exc).__name__
+            )
+            self._record_failure(job, exc, attempt)
+        else:
+            finished_at = time.time()
+            attempt["duration_ms"] = _ms(finished_at - started_at)
+            attempt["stages_ms"] = _stages_ms(timings)
+            job.status = SUCCEEDED
+            job.result = [item.model_dump() for item in result.items]
+            job.error = job.error_type = None
+            job.finished_at = finished_at
+            job.timings["total_ms"] = _ms(finished_at - job.created_at)
+            logger.info("Задание выполнено", job_id=job.id, attempts=job.attempts)
+
+        job.timings.setdefault("attempts", []).append(attempt)
+        await self._store.save(job)
+
+    def _record_failure(self, job: JobRecord, exc: Exception, attempt: dict) -> None:
+        job.error = str(exc)
+        job.error_type = type(exc).__name__
+        retryable = isinstance(exc, RETRYABLE_ERRORS) and not isinstance(exc, FINAL_ERRORS)
+        if retryable and job.attempts < self._config.max_attempts:
+            delay = self._config.retry_delay_s * 2 ** (job.attempts - 1)
+            if isinstance(exc, CaptchaLimitExceeded):
+                delay = max(delay, self._config.captcha_limit_delay_s)
+            job.status = QUEUED
+            job.next_run_at = time.time() + delay
+            attempt["retry_in_s"] = delay
+            logger.warning("Задание будет повторено", job_id=job.id, attempts=job.attempts, error_type=job.error_type, delay_s=delay)
+            return
+
+        job.status = FAILED
+        job.finished_at = time.time()
+        job.timings["total_ms"] = _ms(job.finished_at - job.created_at)
+        logger.error("Задание завершилось ошибкой", job_id=job.id, attempts=job.attempts, error_type=job.error_type)
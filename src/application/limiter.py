@@ -0,0 +1,165 @@
+"""Адаптивное ограничение параллелизма запросов к ФССП (AIMD) по сигналам перегрузки сайта."""
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import aclosing
+import time
+
+import structlog
+
+from src.application.ports import FsspFetcher
+from src.domain.errors import FsspUnavailable, Overloaded
+from src.infrastructure.config import LimiterConfig, Settings
+from src.infrastructure.parser import CAPTCHA_LIMIT_MESSAGE
+
+
+logger = structlog.get_logger()
+
+
+class AdaptiveLimiter:
+    """Лимит одновременных поисков, который подстраивается под ответы сайта.
+
+    Успешный поиск, пока лимит занят полностью, увеличивает его на `1 / limit` (примерно
+    +1 за «круг» из `limit` поисков): без очереди успех ничего не говорит о запасе сайта.
+    Лимит не растет выше `max_limit` (и размера пула движка, см. `ceiling`). Ошибка или
+    таймаут умножают его на `decrease_factor`, а страница
+    превышения лимита попыток капчи сбрасывает до `min_limit`. Снижения чаще раза
+    в `backoff_cooldown_s` игнорируются: пачка одновременных ошибок — это одна перегрузка.
+
+    Сверх лимита запросы ждут в очереди не дольше `queue_timeout_s`; если в очереди уже
+    `max_queue` запросов или время вышло, поднимается `Overloaded`.
+    """
+
+    def __init__(self, config: LimiterConfig, ceiling: int | None = None):
+        self._config = config
+        # Больше поисков, чем слотов у движка, одновременно все равно не выполняется
+        self._max_limit = min(config.max_limit, ceiling) if ceiling is not None else config.max_limit
+        self._min_limit = min(config.min_limit, self._max_limit)
+        self._limit = float(min(max(config.initial_limit, self._min_limit), self._max_limit))
+        self._in_flight = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self._last_backoff = float("-inf")
+        self._successes = 0
+        self._backoffs = 0
+        self._rejected = 0
+        self._queue_timeouts = 0
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "max_limit": self._max_limit,
+            "in_flight": self._in_flight,
+            "queued": len(self._waiters),
+            "max_queue": self._config.max_queue,
+            "successes": self._successes,
+            "backoffs": self._backoffs,
+            "rejected": self._rejected,
+            "queue_timeouts": self._queue_timeouts,
+        }
+
+    async def acquire(self) -> None:
+        if self._in_flight < self.limit and not self._waiters:
+            self._in_flight += 1
+            return
+        if len(self._waiters) >= self._config.max_queue:
+            self._rejected += 1
+            raise Overloaded("Слишком много запросов к ФССП в очереди, повторите позже")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self._config.queue_timeout_s)
+        except TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # Слот выдан в последний момент — отдаем его следующему
+                self._in_flight -= 1
+                self._wake()
+            self._queue_timeouts += 1
+            raise Overloaded("Не дождались очереди к ФССП, повторите позже") from None
+        except BaseException:
+            if waiter.done() and not waiter.cancelled():
+                self._in_flight -= 1
+                self._wake()
+            raise
+        finally:
+            if not waiter.done():
+                waiter.cancel()
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def release(self) -> None:
+        self._in_flight -= 1
+        self._wake()
+
+    def on_success(self) -> None:
+        self._successes += 1
+        # Вызывается до `release`, поэтому сам поиск еще учтен в `in_flight`
+        if self._in_flight >= self.limit:
+            self._limit = min(float(self._max_limit), self._limit + 1 / self._limit)
+            self._wake()
+
+    def on_overload(self, reason: str, hard: bool = False) -> None:
+        """Снижает лимит: `hard` — сразу до минимума (лимит попыток капчи)."""
+        now = time.monotonic()
+        if now - self._last_backoff < self._config.backoff_cooldown_s:
+            return
+        self._last_backoff = now
+        self._backoffs += 1
+        previous = self.limit
+        if hard:
+            self._limit = float(self._min_limit)
+        else:
+            self._limit = max(float(self._min_limit), self._limit * self._config.decrease_factor)
+        logger.warning("Снижаем параллелизм запросов к ФССП", reason=reason, previous=previous, limit=self.limit)
+
+    def _wake(self) -> None:
+        while self._waiters and self._in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self._in_flight += 1
+            waiter.set_result(None)
+
+
+class LimitedFetcher:
+    """Движок получения страниц за `AdaptiveLimiter`: слот держится, пока загружаются все страницы поиска."""
+
+    def __init__(self, client: FsspFetcher, limiter: AdaptiveLimiter):
+        self._client = client
+        self._limiter = limiter
+
+    async def start(self) -> None:
+        await self._client.start()
+
+    async def close(self) -> None:
+        await self._client.close()
+
+    async def health_check(self) -> bool:
+        return await self._client.health_check()
+
+    def stats(self) -> dict:
+        return {**self._client.stats(), "limiter": self._limiter.stats()}
+
+    async def fetch_pages(self, url: str, settings: Settings) -> AsyncIterator[tuple[int, str]]:
+        await self._limiter.acquire()
+        try:
+            async with aclosing(self._client.fetch_pages(url, settings)) as pages:
+                captcha_limit = False
+                async for number, html in pages:
+                    if number == 1 and CAPTCHA_LIMIT_MESSAGE in html:
+                        captcha_limit = True
+                    yield number, html
+            if captcha_limit:
+                self._limiter.on_overload("captcha_limit", hard=True)
+            else:
+                self._limiter.on_success()
+        except FsspUnavailable as exc:
+            # Таймауты, ошибки 4xx/5xx и недоступность браузера клиенты сводят к FsspUnavailable
+            self._limiter.on_overload(type(exc.__cause__ or exc).__name__)
+            raise
+        finally:
+            self._limiter.release()
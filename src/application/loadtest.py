@@ -0,0 +1,204 @@
+"""Генератор нагрузки: запросы с заданным параллелизмом или темпом и сводка по задержкам и ошибкам."""
+import asyncio
+import math
+from collections import Counter, defaultdict
+from collections.abc import Awaitable, Callable, Iterator
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+import random
+import time
+
+from src.domain import Inn, IpNumber, Person, SearchQuery, query_type
+
+
+Probe = Callable[[SearchQuery], Awaitable[str | None]]
+"""Выполняет один запрос и возвращает имя типа ошибки или None при успехе."""
+
+_LAST_NAMES = ("Иванов", "Петров", "Сидоров", "Кузнецов", "Смирнов", "Попов", "Васильев", "Соколов")
+_FIRST_NAMES = ("Иван", "Петр", "Алексей", "Сергей", "Андрей", "Дмитрий", "Михаил", "Николай")
+_PATRONYMICS = ("Иванович", "Петрович", "Алексеевич", "Сергеевич", "Андреевич", None)
+
+
+def parse_mix(value: str) -> dict[str, float]:
+    """Разбирает смесь запросов вида `ip=1,person=1,inn=2` в нормированные веса."""
+    weights: dict[str, float] = {}
+    for part in value.split(","):
+        kind, _, weight = part.strip().partition("=")
+        if kind not in ("ip", "person", "inn"):
+            raise ValueError(f"Неизвестный тип запроса в смеси: {kind!r}")
+        try:
+            weights[kind] = float(weight or 1)
+        except ValueError as exc:
+            raise ValueError(f"Некорректный вес для {kind}: {weight!r}") from exc
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError("Сумма весов смеси должна быть больше нуля")
+    return {kind: weight / total for kind, weight in weights.items()}
+
+
+def synthetic_queries(mix: dict[str, float], seed: int = 0) -> Iterator[SearchQuery]:
+    """Бесконечный поток валидных запросов заданной смеси (воспроизводим при одном `seed`)."""
+    rng = random.Random(seed)
+    kinds = list(mix)
+    weights = [mix[kind] for kind in kinds]
+    while True:
+        kind = rng.choices(kinds, weights)[0]
+        if kind == "ip":
+            yield IpNumber(ip=f"{rng.randint(1, 9_999_999)}/{rng.randint(18, 25)}/{rng.randint(10_000, 99_999)}-ИП")
+        elif kind == "inn":
+            yield Inn(inn="".join(rng.choice("0123456789") for _ in range(10)))
+        else:
+            birthday = date(1950, 1, 1) + timedelta(days=rng.randint(0, 50 * 365))
+            yield Person(
+                last_name=rng.choice(_LAST_NAMES),
+                first_name=rng.choice(_FIRST_NAMES),
+                patronymic=rng.choice(_PATRONYMICS),
+                birthday=birthday.strftime("%d.%m.%Y"),
+            )
+
+
+def percentile(sorted_values: list[float], q: float) -> float | None:
+    """Перцентиль методом ближайшего ранга по отсортированному списку."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def latency_summary(latencies_ms: list[float]) -> dict:
+    values = sorted(latencies_ms)
+    return {
+        "count": len(values),
+        "mean_ms": round(sum(values) / len(values), 1) if values else None,
+        "p50_ms": _round(percentile(values, 50)),
+        "p95_ms": _round(percentile(values, 95)),
+        "p99_ms": _round(percentile(values, 99)),
+        "max_ms": _round(values[-1] if values else None),
+    }
+
+
+def _round(value: float | None) -> float | None:
+    return None if value is None else round(value, 1)
+
+
+@dataclass
+class LoadReport:
+    """Итоги прогона: задержки успешных и неуспешных запросов, ошибки по типам."""
+
+    mode: str
+    target: str
+    duration_s: float = 0.0
+    latencies_ms: list[float] = field(default_factory=list)
+    latencies_by_type: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: Counter = field(default_factory=Counter)
+    captchas_solved: int | None = None
+
+    @property
+    def requests(self) -> int:
+        return len(self.latencies_ms)
+
+    @property
+    def failed(self) -> int:
+        return sum(self.errors.values())
+
+    def record(self, kind: str, latency_ms: float, error: str | None) -> None:
+        self.latencies_ms.append(latency_ms)
+        self.latencies_by_type[kind].append(latency_ms)
+        if error is not None:
+            self.errors[error] += 1
+
+    def to_dict(self) -> dict:
+        succeeded = self.requests - self.failed
+        duration = max(self.duration_s, 1e-9)
+        return {
+            "mode": self.mode,
+            "target": self.target,
+            "duration_s": round(self.duration_s, 3),
+            "requests": self.requests,
+            "succeeded": succeeded,
+            "failed": self.failed,
+            "throughput_rps": round(self.requests / duration, 3),
+            "lookups_per_minute": round(succeeded / duration * 60, 1),
+            "latency": latency_summary(self.latencies_ms),
+            "latency_by_type": {kind: latency_summary(values) for kind, values in sorted(self.latencies_by_type.items())},
+            "errors": dict(self.errors.most_common()),
+            "captcha": {
+                "solved": self.captchas_solved,
+                "per_lookup": round(self.captchas_solved / succeeded, 4) if self.captchas_solved is not None and succeeded else None,
+            },
+        }
+
+
+async def run_load(
+    probe: Probe,
+    queries: Iterator[SearchQuery],
+    report: LoadReport,
+    *,
+    concurrency: int,
+    rate: float | None = None,
+    duration_s: float | None = None,
+    max_requests: int | None = None,
+    on_result: Callable[[], None] | None = None,
+) -> LoadReport:
+    """Гоняет `probe` по потоку запросов до истечения `duration_s` или `max_requests`.
+
+    Без `rate` — замкнутая модель: `concurrency` воркеров отправляют следующий запрос сразу
+    после ответа. С `rate` — открытая модель: запросы стартуют по расписанию (запр/с), не
+    больше `concurrency` одновременно; задержка считается от запланированного момента старта,
+    поэтому ожидание свободного слота тоже попадает в перцентили.
+    """
+    if duration_s is None and max_requests is None:
+        raise ValueError("Нужно задать длительность или количество запросов")
+    started = time.monotonic()
+    deadline = started + duration_s if duration_s is not None else None
+    issued = 0
+
+    def take() -> SearchQuery | None:
+        nonlocal issued
+        if max_requests is not None and issued >= max_requests:
+            return None
+        if deadline is not None and time.monotonic() >= deadline:
+            return None
+        issued += 1
+        return next(queries)
+
+    async def measure(query: SearchQuery, scheduled_at: float) -> None:
+        try:
+            error = await probe(query)
+        except Exception as exc:  # noqa: BLE001
+            error = type(exc).__name__
+        report.record(query_type(query), (time.monotonic() - scheduled_at) * 1000, error)
+        if on_result is not None:
+            on_result()
+
+    if rate is None:
+        async def worker() -> None:
+            while (query := take()) is not None:
+                await measure(query, time.monotonic())
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    else:
+        slots = asyncio.Semaphore(concurrency)
+        tasks: set[asyncio.Task] = set()
+
+        async def scheduled(query: SearchQuery, scheduled_at: float) -> None:
+            async with slots:
+                await measure(query, scheduled_at)
+
+        interval = 1 / rate
+        next_at = started
+        while (query := take()) is not None:
+            delay = next_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            task = asyncio.create_task(scheduled(query, next_at))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            next_at += interval
+            if deadline is not None and next_at >= deadline:
+                break
+        if tasks:
+            await asyncio.gather(*tasks)
+
+    report.duration_s = time.monotonic() - started
+    return report
@@ -0,0 +1,23 @@
+"""Интерфейсы инфраструктуры, которые использует сервисный слой."""
+from collections.abc import AsyncIterator
+from typing import Protocol
+
+from src.infrastructure.config import Settings
+
+
+class FsspFetcher(Protocol):
+    """Движок получения HTML страниц результатов поиска ФССП по URL запроса."""
+
+    async def start(self) -> None: ...
+
+    async def close(self) -> None: ...
+
+    def stats(self) -> dict: ...
+
+    async def health_check(self) -> bool:
+        """Готов ли движок выполнять поиски (например, жив ли браузер)."""
+        ...
+
+    def fetch_pages(self, url: str, settings: Settings) -> AsyncIterator[tuple[int, str]]:
+        """Страницы результатов `(номер, html)`: первая, затем остальные в порядке загрузки."""
+        ...
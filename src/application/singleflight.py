@@ -0,0 +1,57 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Generic, TypeVar
+
+
+T = TypeVar("T")
+
+
+@dataclass
+class _Call(Generic[T]):
+    task: asyncio.Task[T]
+    waiters: int = 0
+
+
+class SingleFlight(Generic[T]):
+    """Реестр выполняющихся запросов: одновременные вызовы с одинаковым ключом ждут одну общую задачу.
+
+    Все ожидающие получают один и тот же результат или одно и то же исключение.
+    Отмена одного ожидающего не затрагивает остальных; общая задача отменяется,
+    только когда ее перестали ждать все.
+    """
+
+    def __init__(self):
+        self._calls: dict[str, _Call[T]] = {}
+        self._started = 0
+        self._coalesced = 0
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[T]]) -> T:
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(task=asyncio.ensure_future(factory()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+            self._started += 1
+        else:
+            self._coalesced += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Результат больше никому не нужен — не тратим браузер и капчу
+                self._forget(key, call)
+                call.task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._calls),
+            "started": self._started,
+            "coalesced": self._coalesced,
+        }
+
+    def _forget(self, key: str, call: _Call[T]) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
@@ -1,5 +1,14 @@
 """Доменные модели и ошибки сервисов ФССП."""
-from src.domain.models import DebtorCase, DebtorCaseList, Inn, IpNumber, Person
+from src.domain.models import (
+    DebtorCase,
+    DebtorCaseList,
+    Inn,
+    IpNumber,
+    Person,
+    SearchQuery,
+    build_query,
+    query_type,
+)
 from src.domain.errors import FsspUnavailable
 
 __all__ = [
@@ -8,5 +17,8 @@ __all__ = [
     "Inn",
     "IpNumber",
     "Person",
+    "SearchQuery",
+    "build_query",
+    "query_type",
     "FsspUnavailable",
 ]
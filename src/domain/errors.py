@@ -16,3 +16,11 @@ class ParsingError(DomainError):
 
 class FsspUnavailable(DomainError):
     """Сервис ФССП недоступен или вернул пустой ответ."""
+
+
+class EmptyResult(FsspUnavailable):
+    """ФССП ответил «ничего не найдено»: повторять запрос бессмысленно."""
+
+
+class Overloaded(DomainError):
+    """Очередь запросов к ФССП переполнена или ожидание в ней превысило лимит."""
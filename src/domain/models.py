@@ -79,6 +79,29 @@ class IpNumber(BaseModel):
         return validate_ip_number(v)
 
 
+SearchQuery = IpNumber | Person | Inn
+"""Любой из поддерживаемых видов поискового запроса."""
+
+
+def query_type(query: SearchQuery) -> str:
+    """Короткое имя вида запроса: ip, person или inn."""
+    if isinstance(query, IpNumber):
+        return "ip"
+    if isinstance(query, Person):
+        return "person"
+    if isinstance(query, Inn):
+        return "inn"
+    raise TypeError(f"Неизвестный тип запроса: {type(query).__name__}")
+
+
+def build_query(kind: str, data: dict) -> SearchQuery:
+    """Создает и валидирует запрос указанного вида из словаря полей."""
+    models: dict[str, type[BaseModel]] = {"ip": IpNumber, "person": Person, "inn": Inn}
+    if kind not in models:
+        raise ValueError(f"Неизвестный тип запроса: {kind}")
+    return models[kind].model_validate(data)
+
+
 # Доменные модели результатов
 class DebtorCase(BaseModel):
     """Доменная модель исполнительного производства."""
@@ -97,7 +120,13 @@ class DebtorCaseList(BaseModel):
     """Список доменных моделей производств."""
 
     items: list[DebtorCase]
+    truncated: bool = False  # Поиск уперся в лимит страниц, и в списке есть не все производства
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[dict], truncated: bool = False) -> "DebtorCaseList":
+        return cls(items=[DebtorCase(**row) for row in rows], truncated=truncated)
 
     @classmethod
-    def from_rows(cls, rows: Iterable[dict]) -> "DebtorCaseList":
-        return cls(items=[DebtorCase(**row) for row in rows])
+    def from_trusted_rows(cls, rows: Iterable[dict]) -> "DebtorCaseList":
+        """Собирает список без валидации — только для строк, уже прошедших `from_rows` (например, из кэша)."""
+        return cls.model_construct(items=[DebtorCase.model_construct(**row) for row in rows])
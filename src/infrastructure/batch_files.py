@@ -0,0 +1,136 @@
+"""Чтение входных файлов пакетного поиска CLI и контрольные точки для возобновления."""
+from collections.abc import Iterator
+import csv
+from dataclasses import dataclass, field
+import json
+from pathlib import Path
+
+from src.domain import SearchQuery, build_query
+
+
+@dataclass
+class InputRow:
+    """Строка входного файла с номером (с нуля, без учета заголовка CSV)."""
+
+    index: int
+    data: dict
+
+
+def read_rows(path: Path) -> Iterator[InputRow]:
+    """Лениво читает CSV (с заголовком) или JSONL построчно."""
+    suffix = path.suffix.lower()
+    with path.open(encoding="utf-8", newline="") as f:
+        if suffix == ".csv":
+            for index, data in enumerate(csv.DictReader(f)):
+                yield InputRow(index=index, data=data)
+        elif suffix in (".jsonl", ".ndjson"):
+            index = 0
+            for line in f:
+                if not line.strip():
+                    continue
+                yield InputRow(index=index, data=json.loads(line))
+                index += 1
+        else:
+            raise ValueError(f"Неподдерживаемый формат входного файла: {path.suffix} (ожидается .csv или .jsonl)")
+
+
+def count_rows(path: Path) -> int:
+    if path.suffix.lower() == ".csv":
+        with path.open(encoding="utf-8", newline="") as f:
+            return sum(1 for _ in csv.DictReader(f))
+    with path.open(encoding="utf-8") as f:
+        return sum(1 for line in f if line.strip())
+
+
+def row_to_query(data: dict) -> SearchQuery:
+    """Строит запрос из строки файла; тип берется из колонки `type` или определяется по заполненным полям."""
+    values = {key: (value.strip() if isinstance(value, str) else value) for key, value in data.items() if key}
+    values = {key: value for key, value in values.items() if value not in (None, "")}
+    query_type = values.pop("type", None)
+    if query_type is None:
+        if "ip" in values:
+            query_type = "ip"
+        elif "inn" in values:
+            query_type = "inn"
+        else:
+            query_type = "person"
+
+    return build_query(query_type, values)
+
+
+@dataclass
+class Checkpoint:
+    """Контрольная точка пакетной обработки.
+
+    Хранит «водяной знак» (все строки с меньшим номером обработаны) и номера
+    обработанных строк выше него, а также смещение в выходном файле на момент
+    сохранения: строки, дописанные после последнего сохранения, восстанавливаются
+    при возобновлении чтением хвоста выходного файла.
+    """
+
+    path: Path
+    input: str
+    watermark: int = 0
+    done: set[int] = field(default_factory=set)
+
+    @classmethod
+    def for_output(cls, output: Path) -> Path:
+        return output.with_name(output.name + ".checkpoint.json")
+
+    @classmethod
+    def load(cls, output: Path, input_path: Path) -> "Checkpoint":
+        path = cls.for_output(output)
+        checkpoint = cls(path=path, input=str(input_path.resolve()))
+        offset = 0
+        if path.exists():
+            data = json.loads(path.read_text(encoding="utf-8"))
+            if data["input"] != checkpoint.input:
+                raise ValueError(
+                    f"Контрольная точка {path} относится к другому входному файлу ({data['input']})"
+                )
+            checkpoint.watermark = data["watermark"]
+            checkpoint.done = set(data["done"])
+            offset = data["output_offset"]
+        if output.exists():
+            checkpoint._recover_tail(output, offset)
+        return checkpoint
+
+    def is_done(self, index: int) -> bool:
+        return index < self.watermark or index in self.done
+
+    @property
+    def completed(self) -> int:
+        return self.watermark + len(self.done)
+
+    def mark(self, index: int) -> None:
+        self.done.add(index)
+        while self.watermark in self.done:
+            self.done.remove(self.watermark)
+            self.watermark += 1
+
+    def save(self, output_offset: int) -> None:
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(
+            json.dumps(
+                {
+                    "input": self.input,
+                    "watermark": self.watermark,
+                    "done": sorted(self.done),
+                    "output_offset": output_offset,
+                }
+            ),
+            encoding="utf-8",
+        )
+        tmp.replace(self.path)
+
+    def _recover_tail(self, output: Path, offset: int) -> None:
+        with output.open("rb+") as f:
+            f.seek(offset)
+            tail = f.read()
+            # Обрезаем недописанную строку, оставшуюся после аварийного завершения
+            complete = tail[: tail.rfind(b"\n") + 1]
+            if len(complete) != len(tail):
+                f.truncate(offset + len(complete))
+        for line in complete.decode("utf-8").splitlines():
+            if line.strip():
+                self.mark(json.loads(line)["index"])
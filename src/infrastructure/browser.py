@@ -0,0 +1,191 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from typing import AsyncIterator
+
+from playwright.async_api import Browser, BrowserContext, Playwright, async_playwright
+import structlog
+
+from src.domain.errors import FsspUnavailable
+from src.infrastructure.config import BrowserConfig
+from src.infrastructure.metrics import stage
+from src.infrastructure.proxy_pool import Proxy, ProxyPool
+from src.infrastructure.routing import RequestPolicy
+
+
+logger = structlog.get_logger()
+
+
+class BrowserManager:
+    """Долгоживущий Chromium с ограниченным пулом изолированных контекстов.
+
+    Браузер запускается один раз (лениво или через `start`) и переиспользуется
+    всеми запросами. Каждый запрос получает собственный `BrowserContext`,
+    количество одновременно открытых контекстов ограничено `pool_size`.
+    Упавший браузер перезапускается при следующем обращении.
+    """
+
+    def __init__(self, config: BrowserConfig):
+        self._config = config
+        self._playwright: Playwright | None = None
+        self._browser: Browser | None = None
+        self._lock = asyncio.Lock()
+        self._slots = asyncio.Semaphore(config.pool_size)
+        self._in_use = 0
+        self._launches = 0
+        self._restarts = 0
+        self._policy = RequestPolicy(config) if config.block_resources else None
+        self._proxies = ProxyPool(config) if config.proxies else None
+        self._context_proxies: dict[BrowserContext, Proxy] = {}
+
+    async def start(self) -> None:
+        async with self._lock:
+            await self._ensure_browser()
+
+    async def close(self) -> None:
+        async with self._lock:
+            await self._close_browser()
+            if self._playwright is not None:
+                with suppress(Exception):
+                    await self._playwright.stop()
+                self._playwright = None
+        logger.info("Браузер остановлен")
+
+    async def health_check(self) -> bool:
+        """Проверяет, что браузер жив; упавший браузер перезапускается."""
+        try:
+            async with self._lock:
+                browser = await self._ensure_browser()
+            return browser.is_connected()
+        except Exception as exc:  # noqa: BLE001
+            logger.error("Браузер не прошел проверку", error=str(exc))
+            return False
+
+    @asynccontextmanager
+    async def context(self) -> AsyncIterator[BrowserContext]:
+        """Выдает изолированный контекст из пула и закрывает его после использования."""
+        context = await self.acquire()
+        try:
+            yield context
+        finally:
+            await self.release(context)
+
+    async def acquire(self) -> BrowserContext:
+        """Занимает слот пула и создает новый контекст.
+
+        Контекст обязательно возвращается через `release`, иначе слот пула не освободится.
+        """
+        with stage("browser_slot_wait"):
+            await self._slots.acquire()
+        try:
+            with stage("browser_context"):
+                context = await self._new_context()
+        except BaseException as exc:
+            # Слот возвращается и при отмене (ожидающих поиска не осталось, пул закрывается)
+            self._slots.release()
+            if not isinstance(exc, Exception):
+                raise
+            logger.error("Не удалось создать контекст браузера", error=str(exc))
+            raise FsspUnavailable("Не удалось запустить браузер") from exc
+        self._in_use += 1
+        return context
+
+    async def release(self, context: BrowserContext) -> None:
+        self._in_use -= 1
+        self._slots.release()
+        proxy = self._context_proxies.pop(context, None)
+        if proxy is not None:
+            self._proxies.release(proxy)
+        with suppress(Exception):
+            await context.close()
+
+    def stats(self) -> dict:
+        stats = {
+            "pool_size": self._config.pool_size,
+            "contexts_in_use": self._in_use,
+            "connected": self._browser is not None and self._browser.is_connected(),
+            "launches": self._launches,
+            "restarts": self._restarts,
+        }
+        if self._policy is not None:
+            stats["routing"] = self._policy.stats()
+        if self._proxies is not None:
+            stats["proxies"] = self._proxies.stats()
+        return stats
+
+    def report(self, context: BrowserContext, outcome: str, latency_s: float) -> None:
+        """Учитывает результат поиска в здоровье прокси, через который работает контекст."""
+        proxy = self._context_proxies.get(context)
+        if proxy is not None:
+            self._proxies.report(proxy, outcome, latency_s)
+
+    def is_healthy(self, context: BrowserContext) -> bool:
+        """Можно ли продолжать работать в контексте: его прокси не в карантине."""
+        proxy = self._context_proxies.get(context)
+        return proxy is None or not proxy.quarantined()
+
+    async def _new_context(self) -> BrowserContext:
+        proxy = self._proxies.acquire() if self._proxies is not None else None
+        try:
+            context = await self._open_context(proxy)
+        except BaseException:
+            if proxy is not None:
+                self._proxies.release(proxy)
+            raise
+        if proxy is not None:
+            self._context_proxies[context] = proxy
+        return context
+
+    async def _open_context(self, proxy: Proxy | None) -> BrowserContext:
+        options = {"user_agent": self._config.user_agent}
+        if proxy is not None:
+            options["proxy"] = proxy.playwright_settings()
+        async with self._lock:
+            browser = await self._ensure_browser()
+        try:
+            context = await browser.new_context(**options)
+        except Exception:  # noqa: BLE001
+            # Браузер мог упасть между проверкой и созданием контекста — пробуем еще раз
+            if browser.is_connected():
+                raise
+            async with self._lock:
+                browser = await self._ensure_browser()
+            context = await browser.new_context(**options)
+        if self._policy is not None:
+            try:
+                await self._policy.install(context)
+            except BaseException:
+                # Контекст без политики никому не выдан — закрываем, слот и прокси освобождает вызывающий
+                with suppress(Exception):
+                    await context.close()
+                raise
+        return context
+
+    async def _ensure_browser(self) -> Browser:
+        if self._browser is not None and self._browser.is_connected():
+            return self._browser
+        if self._browser is not None:
+            logger.warning("Браузер недоступен, перезапускаем")
+            self._restarts += 1
+            await self._close_browser()
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+
+        logger.debug("Запускаем браузер")
+        self._browser = await self._playwright.chromium.launch(
+            headless=self._config.headless,
+            args=["--disable-blink-features=AutomationControlled"],
+            # Прокси задается каждому контексту (`new_context(proxy=...)`). Chromium под Windows применяет
+            # прокси контекста, только если браузер запущен с прокси; по документации Playwright для этого
+            # подходит любая строка, ведь все контексты задают свой прокси и общий не используется.
+            proxy={"server": "http://per-context"} if self._proxies is not None else None,
+        )
+        self._browser.on("disconnected", lambda _: logger.warning("Браузер отключился"))
+        self._launches += 1
+        return self._browser
+
+    async def _close_browser(self) -> None:
+        if self._browser is None:
+            return
+        with suppress(Exception):
+            await self._browser.close()
+        self._browser = None
@@ -0,0 +1,142 @@
+import asyncio
+from collections import OrderedDict
+import json
+from pathlib import Path
+import sqlite3
+import time
+
+import structlog
+
+from src.infrastructure.config import CacheConfig
+
+
+logger = structlog.get_logger()
+
+
+class ResultCache:
+    """Кэш результатов поиска: LRU в памяти и опциональный персистентный уровень в SQLite.
+
+    Хранит уже провалидированные строки `DebtorCase` (list[dict]) с TTL,
+    зависящим от типа запроса. Записи SQLite переживают перезапуск процесса.
+    """
+
+    def __init__(self, config: CacheConfig):
+        self._config = config
+        self._memory: OrderedDict[str, tuple[float, list[dict]]] = OrderedDict()
+        self._db: sqlite3.Connection | None = None
+        self._db_lock = asyncio.Lock()
+        self._hits = 0
+        self._sqlite_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expired = 0
+        if config.sqlite_path is not None:
+            self._db = self._open_db(config.sqlite_path)
+
+    async def get(self, key: str) -> list[dict] | None:
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry is not None:
+            expires_at, rows = entry
+            if expires_at > now:
+                self._memory.move_to_end(key)
+                self._hits += 1
+                return rows
+            del self._memory[key]
+            self._expired += 1
+
+        if self._db is not None:
+            stored = await self._db_call(self._db_get, key, now)
+            if stored is not None:
+                expires_at, rows = stored
+                self._put_memory(key, expires_at, rows)
+                self._sqlite_hits += 1
+                return rows
+
+        self._misses += 1
+        return None
+
+    async def set(self, kind: str, key: str, rows: list[dict]) -> None:
+        ttl = self._ttl(kind)
+        if ttl <= 0:
+            return
+        expires_at = time.time() + ttl
+        self._put_memory(key, expires_at, rows)
+        if self._db is not None:
+            await self._db_call(self._db_set, key, expires_at, json.dumps(rows, ensure_ascii=False))
+
+    async def close(self) -> None:
+        if self._db is not None:
+            async with self._db_lock:
+                self._db.close()
+            self._db = None
+
+    def stats(self) -> dict:
+        lookups = self._hits + self._sqlite_hits + self._misses
+        return {
+            "entries": len(self._memory),
+            "max_entries": self._config.max_entries,
+            "hits": self._hits,
+            "sqlite_hits": self._sqlite_hits,
+            "misses": self._misses,
+            "hit_rate": round((self._hits + self._sqlite_hits) / lookups, 4) if lookups else None,
+            "evictions": self._evictions,
+            "expired": self._expired,
+            "persistent": self._db is not None,
+        }
+
+    def _ttl(self, kind: str) -> float:
+        return {
+            "ip": self._config.ttl_ip_s,
+            "person": self._config.ttl_person_s,
+            "inn": self._config.ttl_inn_s,
+        }.get(kind, 0)
+
+    def _put_memory(self, key: str, expires_at: float, rows: list[dict]) -> None:
+        self._memory[key] = (expires_at, rows)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._config.max_entries:
+            self._memory.popitem(last=False)
+            self._evictions += 1
+
+    async def _db_call(self, func, *args):
+        async with self._db_lock:
+            try:
+                return await asyncio.to_thread(func, *args)
+            except sqlite3.Error as exc:
+                # Кэш не должен ронять поиск: при сбое SQLite работаем только с памятью
+                logger.warning("Ошибка SQLite-кэша", error=str(exc))
+                return None
+
+    @staticmethod
+    def _open_db(path: Path) -> sqlite3.Connection:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, expires_at REAL NOT NULL, payload TEXT NOT NULL)"
+        )
+        db.execute("DELETE FROM results WHERE expires_at <= ?", (time.time(),))
+        db.commit()
+        return db
+
+    def _db_get(self, key: str, now: float) -> tuple[float, list[dict]] | None:
+        assert self._db is not None
+        row = self._db.execute("SELECT expires_at, payload FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        expires_at, payload = row
+        if expires_at <= now:
+            self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+            self._db.commit()
+            return None
+        return expires_at, json.loads(payload)
+
+    def _db_set(self, key: str, expires_at: float, payload: str) -> None:
+        assert self._db is not None
+        self._db.execute(
+            "INSERT OR REPLACE INTO results (key, expires_at, payload) VALUES (?, ?, ?)",
+            (key, expires_at, payload),
+        )
+        self._db.commit()
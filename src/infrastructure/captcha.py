@@ -1,24 +1,662 @@
+from abc import ABC, abstractmethod
+import asyncio
+import base64
+from collections import deque
+from contextlib import suppress
+from dataclasses import dataclass
+import time
+
+import httpx
 import structlog
-from twocaptcha import AsyncTwoCaptcha
 from src.domain.errors import CaptchaError
+from src.infrastructure.captcha_cache import CaptchaAnswerCache, ImageKey, image_key
+from src.infrastructure.captcha_ocr import DigitModel
+from src.infrastructure.config import CaptchaConfig
+from src.infrastructure.metrics import (
+    CAPTCHA_COST_TOTAL,
+    CAPTCHA_RACE_ENTRIES,
+    CAPTCHA_RACE_WINS,
+    CAPTCHA_SOLVE_SECONDS,
+    CAPTCHAS_TOTAL,
+    stage,
+)
 
 
 logger = structlog.get_logger()
 
 
-class CaptchaSolver:
-    """Решатель капчи через внешний провайдер."""
+@dataclass
+class CaptchaAnswer:
+    """Распознанный код и идентификатор задачи у провайдера (нужен, чтобы пожаловаться на неверный ответ).
+
+    `backend` — какой решатель дал ответ, `confidence` — уверенность локального распознавания,
+    `image_key` — отпечатки картинки, чтобы запомнить код, если сайт его примет.
+    """
+
+    code: str
+    task_id: str | None = None
+    backend: str = "rucaptcha"
+    confidence: float | None = None
+    image_key: ImageKey | None = None
+
+
+_NOT_READY = "CAPCHA_NOT_READY"
+# Столько задач опрашивается одним запросом res.php?action=get&ids=…
+_MAX_POLL_IDS = 100
+# Сколько последних времен решения учитывается и сколько нужно, чтобы им доверять
+_DURATION_WINDOW = 200
+_MIN_DURATION_SAMPLES = 10
+# Интервал опроса — такая доля разброса времени решения (p90 - p10)
+_POLL_SPREAD_FRACTION = 1 / 8
+
+
+@dataclass(eq=False)
+class _SolveTask:
+    task_id: str
+    submitted_at: float
+    next_poll_at: float
+    result: asyncio.Future[str]
+    # Последний опрос, на котором задача еще не была готова (или момент отправки)
+    not_ready_at: float = 0.0
+
+
+class SolveScheduler:
+    """Задачи распознавания у провайдера с API RuCaptcha/2captcha (`in.php` / `res.php`).
+
+    Готовность всех ожидающих задач проверяется одним запросом `res.php?action=get&ids=…`,
+    поэтому число запросов к провайдеру не растет с числом одновременных капч. Первый опрос
+    задачи — около 10-го перцентиля наблюдаемого времени решения, дальше — с интервалом в
+    `1/8` разброса p10–p90 (в пределах `poll_min_interval_s`–`poll_max_interval_s`): ответ
+    забирается вскоре после готовности, а не через целый фиксированный период. Одновременно
+    решается не больше `max_concurrent_solves` капч; `solve_timeout_s` ограничивает и ожидание
+    своей очереди, и само решение.
+    """
+
+    def __init__(self, base_url: str, api_key: str, config: CaptchaConfig, transport: httpx.AsyncBaseTransport | None = None):
+        self._base_url = base_url.rstrip("/")
+        self._api_key = api_key
+        self._config = config
+        self._transport = transport
+        self._http: httpx.AsyncClient | None = None
+        self._semaphore = asyncio.Semaphore(config.max_concurrent_solves)
+        self._tasks: dict[str, _SolveTask] = {}
+        self._durations: deque[float] = deque(maxlen=_DURATION_WINDOW)
+        self._poller: asyncio.Task | None = None
+        self._wakeup = asyncio.Event()
+        self._polls = 0
+        self._polled_tasks = 0
+        self._timeouts = 0
+
+    def stats(self) -> dict:
+        return {
+            "outstanding": len(self._tasks),
+            "polls": self._polls,
+            "tasks_per_poll": round(self._polled_tasks / self._polls, 2) if self._polls else None,
+            "first_poll_s": round(self._first_poll_delay(), 2),
+            "poll_interval_s": round(self._poll_interval(), 2),
+            "solve_p50_s": round(self._quantile(0.5), 2) if self._durations else None,
+            "timeouts": self._timeouts,
+        }
+
+    async def solve(self, image: bytes) -> tuple[str, str]:
+        """Отправляет капчу и ждет ответа; возвращает `(id задачи, код)`."""
+        try:
+            async with asyncio.timeout(self._config.solve_timeout_s):
+                async with self._semaphore:
+                    task_id = await self._submit(image)
+                    now = time.monotonic()
+                    task = _SolveTask(
+                        task_id, now, now + self._first_poll_delay(), asyncio.get_running_loop().create_future(), not_ready_at=now
+                    )
+                    self._tasks[task_id] = task
+                    self._ensure_poller()
+                    try:
+                        return task_id, await task.result
+                    finally:
+                        self._tasks.pop(task_id, None)
+        except TimeoutError:
+            self._timeouts += 1
+            raise CaptchaError(f"Провайдер не решил капчу за {self._config.solve_timeout_s} с") from None
+
+    async def report_incorrect(self, task_id: str) -> None:
+        response = await self._client().get(
+            f"{self._base_url}/res.php", params={"key": self._api_key, "action": "reportbad", "id": task_id, "json": 1}
+        )
+        response.raise_for_status()
+
+    async def close(self) -> None:
+        if self._poller is not None:
+            self._poller.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._poller
+            self._poller = None
+        for task in self._tasks.values():
+            if not task.result.done():
+                task.result.set_exception(CaptchaError("Решатель капчи остановлен"))
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    def _client(self) -> httpx.AsyncClient:
+        if self._http is None:
+            # Соединение не держится дольше, чем его держат типичные серверы (иначе ответ обрывается на переиспользовании)
+            limits = httpx.Limits(keepalive_expiry=2)
+            self._http = httpx.AsyncClient(timeout=30, limits=limits, transport=self._transport)
+        return self._http
+
+    async def _submit(self, image: bytes) -> str:
+        response = await self._client().post(
+            f"{self._base_url}/in.php",
+            data={
+                "key": self._api_key,
+                "method": "base64",
+                "body": base64.b64encode(image).decode("ascii"),
+                "numeric": 1,
+                "json": 1,
+            },
+        )
+        response.raise_for_status()
+        payload = response.json()
+        if payload.get("status") != 1:
+            raise CaptchaError(f"Провайдер не принял капчу: {payload.get('request')}")
+        return str(payload["request"])
+
+    def _ensure_poller(self) -> None:
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.create_task(self._poll_loop())
+        else:
+            # Новая задача может ждать меньше, чем спит опросчик
+            self._wakeup.set()
+
+    async def _poll_loop(self) -> None:
+        while self._tasks:
+            now = time.monotonic()
+            due_at = min(task.next_poll_at for task in self._tasks.values())
+            if due_at > now:
+                self._wakeup.clear()
+                with suppress(TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=due_at - now)
+                continue
+            interval = self._poll_interval()
+            # Вместе с задачами, которым пора, опрашиваются и те, чья очередь подойдет в ближайшие полинтервала
+            batch = [task for task in self._tasks.values() if task.next_poll_at <= now + interval / 2][:_MAX_POLL_IDS]
+            try:
+                statuses = await self._poll([task.task_id for task in batch])
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Не удалось опросить провайдера капчи", error=str(exc), tasks=len(batch))
+                statuses = [_NOT_READY] * len(batch)
+            now = time.monotonic()
+            for task, status in zip(batch, statuses):
+                if task.result.done():
+                    continue
+                if status == _NOT_READY:
+                    task.not_ready_at = now
+                    task.next_poll_at = now + interval
+                    continue
+                self._tasks.pop(task.task_id, None)
+                if status.startswith("ERROR"):
+                    task.result.set_exception(CaptchaError(f"Провайдер не решил капчу: {status}"))
+                else:
+                    # Ответ появился где-то между двумя опросами: берем середину, иначе поздний
+                    # первый опрос навсегда завысил бы оценку времени решения
+                    self._durations.append((task.not_ready_at + now) / 2 - task.submitted_at)
+                    task.result.set_result(status)
+
+    async def _poll(self, task_ids: list[str]) -> list[str]:
+        self._polls += 1
+        self._polled_tasks += len(task_ids)
+        response = await self._client().get(
+            f"{self._base_url}/res.php", params={"key": self._api_key, "action": "get", "ids": ",".join(task_ids)}
+        )
+        response.raise_for_status()
+        statuses = response.text.strip().split("|")
+        if len(statuses) != len(task_ids):
+            # Общая ошибка вместо списка статусов (например, ERROR_KEY_DOES_NOT_EXIST) относится ко всем задачам
+            return [statuses[0] if statuses[0].startswith("ERROR") else f"ERROR_BAD_RESPONSE {response.text[:100]}"] * len(task_ids)
+        return statuses
+
+    def _first_poll_delay(self) -> float:
+        if len(self._durations) < _MIN_DURATION_SAMPLES:
+            return self._config.poll_first_delay_s
+        return max(self._config.poll_min_interval_s, self._quantile(0.1))
+
+    def _poll_interval(self) -> float:
+        if len(self._durations) < _MIN_DURATION_SAMPLES:
+            return self._config.poll_max_interval_s
+        spread = self._quantile(0.9) - self._quantile(0.1)
+        return min(self._config.poll_max_interval_s, max(self._config.poll_min_interval_s, spread * _POLL_SPREAD_FRACTION))
+
+    def _quantile(self, q: float) -> float:
+        ordered = sorted(self._durations)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class CaptchaSolver(ABC):
+    """Решатель капчи: распознает изображение и узнает от клиента, принял ли сайт код.
 
-    def __init__(self, api_key: str):
-        self._solver = AsyncTwoCaptcha(api_key)
+    `report_correct` / `report_incorrect` вызываются после ответа сайта на отправленный код;
+    `stats` отдает как минимум счетчики `solved`, `failed` и `reported_incorrect`.
+    """
 
-    async def solve(self, captcha_path) -> str:
+    name: str = ""
+    # Цена одной решенной капчи (для учета расхода)
+    cost_per_solve: float = 0.0
+
+    @abstractmethod
+    async def solve(self, image: bytes) -> CaptchaAnswer:
+        """Распознает капчу по содержимому изображения (PNG/JPEG); при неудаче — `CaptchaError`."""
+
+    async def report_correct(self, answer: CaptchaAnswer) -> None:
+        """Сайт принял код и показал результаты."""
+        return None
+
+    @abstractmethod
+    async def report_incorrect(self, answer: CaptchaAnswer) -> None:
+        """Сайт не принял код."""
+
+    @abstractmethod
+    def stats(self) -> dict: ...
+
+    async def close(self) -> None:
+        return None
+
+
+class BackendCaptchaSolver(CaptchaSolver):
+    """Решатель с одним источником ответов: учет решенных, неудачных и неверных капч и метрики."""
+
+    def __init__(self):
+        self._solved = 0
+        self._failed = 0
+        self._reported = 0
+
+    def stats(self) -> dict:
+        """Расход капч: сколько распознано (оплачено), сколько попыток завершились ошибкой и сколько ответов оказались неверными."""
+        return {"solved": self._solved, "failed": self._failed, "reported_incorrect": self._reported}
+
+    async def solve(self, image: bytes) -> CaptchaAnswer:
+        started = time.perf_counter()
         try:
-            result = await self._solver.normal(str(captcha_path), numeric=1)
-            code = result.get("code")
-            if not code:
-                raise CaptchaError("Провайдер капчи вернул пустой код")
-            return str(code)
+            with stage("captcha_solve"):
+                answer = await self._recognize(image)
         except Exception as exc:  # noqa: BLE001
+            self._failed += 1
+            CAPTCHAS_TOTAL.labels(backend=self.name, result="failed").inc()
             logger.error("Ошибка распознавания капчи", error=exc)
             raise CaptchaError("Не удалось распознать капчу") from exc
+        self._solved += 1
+        CAPTCHAS_TOTAL.labels(backend=self.name, result="solved").inc()
+        CAPTCHA_SOLVE_SECONDS.labels(backend=self.name).observe(time.perf_counter() - started)
+        if self.cost_per_solve:
+            CAPTCHA_COST_TOTAL.labels(backend=self.name).inc(self.cost_per_solve)
+        return answer
+
+    async def report_incorrect(self, answer: CaptchaAnswer) -> None:
+        self._reported += 1
+        CAPTCHAS_TOTAL.labels(backend=self.name, result="rejected").inc()
+        try:
+            await self._report_incorrect(answer)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Не удалось сообщить провайдеру о неверном коде капчи", error=str(exc))
+
+    @abstractmethod
+    async def _recognize(self, image: bytes) -> CaptchaAnswer: ...
+
+    async def _report_incorrect(self, answer: CaptchaAnswer) -> None:
+        return None
+
+
+class RuCaptchaSolver(BackendCaptchaSolver):
+    """Решатель капчи через внешний провайдер с API RuCaptcha/2captcha."""
+
+    def __init__(
+        self,
+        api_key: str,
+        config: CaptchaConfig,
+        server: str = "2captcha.com",
+        name: str = "rucaptcha",
+        cost_per_solve: float = 0.0,
+    ):
+        super().__init__()
+        self._scheduler = SolveScheduler(server if "://" in server else f"https://{server}", api_key, config)
+        self.name = name
+        self.cost_per_solve = cost_per_solve
+
+    def stats(self) -> dict:
+        return {**super().stats(), "scheduler": self._scheduler.stats()}
+
+    async def close(self) -> None:
+        await self._scheduler.close()
+
+    async def _recognize(self, image: bytes) -> CaptchaAnswer:
+        task_id, code = await self._scheduler.solve(image)
+        if not code:
+            raise CaptchaError("Провайдер капчи вернул пустой код")
+        return CaptchaAnswer(code=code, task_id=task_id, backend=self.name)
+
+    async def _report_incorrect(self, answer: CaptchaAnswer) -> None:
+        """Провайдер не берет плату за неверный ответ и учитывает ошибку."""
+        if answer.task_id is not None:
+            await self._scheduler.report_incorrect(answer.task_id)
+
+
+class SimulatorCaptchaSolver(BackendCaptchaSolver):
+    """Фейковый решатель: отправляет изображение в локальный симулятор ФССП вместо RuCaptcha."""
+
+    name = "simulator"
+
+    def __init__(self, base_url: str, timeout_s: float = 30):
+        super().__init__()
+        self._url = base_url.rstrip("/") + "/simulator/solver"
+        self._timeout_s = timeout_s
+
+    async def _recognize(self, image: bytes) -> CaptchaAnswer:
+        async with httpx.AsyncClient(timeout=self._timeout_s) as client:
+            response = await client.post(self._url, content=image, headers={"Content-Type": "image/png"})
+        code = response.json().get("code")
+        if not code:
+            raise CaptchaError("Симулятор не распознал капчу")
+        return CaptchaAnswer(code=str(code), backend=self.name)
+
+
+class LocalCaptchaSolver(BackendCaptchaSolver):
+    """Распознавание на CPU без сети: сегментация цифр и шаблонный классификатор (`captcha_ocr`)."""
+
+    name = "local"
+
+    def __init__(self, model: DigitModel, length: int | None = None):
+        super().__init__()
+        self._model = model
+        self._length = length
+
+    async def _recognize(self, image: bytes) -> CaptchaAnswer:
+        # Распознавание синхронное и занимает миллисекунды, но не должно задерживать event loop
+        result = await asyncio.to_thread(self._model.recognize, image, self._length)
+        if not result.code:
+            raise CaptchaError("Не удалось выделить символы капчи")
+        return CaptchaAnswer(code=result.code, backend=self.name, confidence=result.confidence)
+
+
+class FallbackCaptchaSolver(CaptchaSolver):
+    """Сначала локальное распознавание; при уверенности ниже `min_confidence` — внешний решатель.
+
+    Неуверенный локальный ответ не отправляется на сайт, поэтому не тратит попытку капчи.
+    Без внешнего решателя (`fallback`=None) используется лучший локальный ответ.
+    """
+
+    def __init__(self, local: LocalCaptchaSolver, fallback: CaptchaSolver | None, min_confidence: float):
+        self._local = local
+        self._fallback = fallback
+        self._min_confidence = min_confidence
+        self._fallbacks = 0
+        self._solved = 0
+        self._failed = 0
+        self._reported = 0
+
+    @property
+    def name(self) -> str:
+        return self._local.name if self._fallback is None else f"{self._local.name}+{self._fallback.name}"
+
+    def stats(self) -> dict:
+        backends = [self._local, *([self._fallback] if self._fallback else [])]
+        return {
+            "solved": self._solved,
+            "failed": self._failed,
+            "reported_incorrect": self._reported,
+            "fallbacks": self._fallbacks,
+            "backends": {solver.name: solver.stats() for solver in backends},
+        }
+
+    async def close(self) -> None:
+        await self._local.close()
+        if self._fallback is not None:
+            await self._fallback.close()
+
+    async def solve(self, image: bytes) -> CaptchaAnswer:
+        try:
+            answer = await self._solve(image)
+        except CaptchaError:
+            self._failed += 1
+            raise
+        self._solved += 1
+        return answer
+
+    async def report_correct(self, answer: CaptchaAnswer) -> None:
+        await self._author(answer).report_correct(answer)
+
+    async def report_incorrect(self, answer: CaptchaAnswer) -> None:
+        self._reported += 1
+        await self._author(answer).report_incorrect(answer)
+
+    async def _solve(self, image: bytes) -> CaptchaAnswer:
+        answer = None
+        try:
+            answer = await self._local.solve(image)
+        except CaptchaError:
+            if self._fallback is None:
+                raise
+        if self._fallback is None or (answer is not None and (answer.confidence or 0.0) >= self._min_confidence):
+            return answer
+        self._fallbacks += 1
+        logger.debug(
+            "Локальное распознавание не уверено, капча отправлена внешнему решателю",
+            confidence=answer.confidence if answer else None,
+            fallback=self._fallback.name,
+        )
+        return await self._fallback.solve(image)
+
+    def _author(self, answer: CaptchaAnswer) -> CaptchaSolver:
+        return self._local if answer.backend == self._local.name or self._fallback is None else self._fallback
+
+
+@dataclass
+class _BackendStats:
+    """Что гонка узнала о решателе: задержка, надежность и точность его ответов."""
+
+    entries: int = 0
+    solved: int = 0
+    failed: int = 0
+    unconfident: int = 0
+    cancelled: int = 0
+    wins: int = 0
+    rejected: int = 0
+    latency_s: float | None = None
+
+    @property
+    def accuracy(self) -> float:
+        # Сглаживание: решатель без истории не считается ни идеальным, ни безнадежным
+        return (self.wins - self.rejected + 1) / (self.wins + 2)
+
+
+# Вес нового замера в скользящей средней задержки решателя
+_LATENCY_ALPHA = 0.2
+
+
+class RacingCaptchaSolver(CaptchaSolver):
+    """Капча отправляется нескольким решателям сразу, используется первый уверенный ответ.
+
+    Ответ с уверенностью ниже `local_min_confidence` не участвует в гонке: он не отправляется
+    на сайт и не идет в статистику задержки. Как только есть победитель, остальные решатели
+    отменяются. Неверные коды возвращаются решателю-автору.
+    Когда у одного решателя набралось `race_min_samples` отправленных ответов, средняя задержка
+    не больше `race_single_max_latency_s` и точность не ниже `race_single_min_accuracy`, он
+    зовется один (из подходящих — с наименьшим ожидаемым временем до принятого кода
+    `latency / accuracy`); каждый `race_explore_every`-й поиск — снова гонка. Если единственный
+    решатель не справился, капча отправляется в гонку остальных.
+    """
+
+    def __init__(self, backends: list[CaptchaSolver], config: CaptchaConfig):
+        if not backends:
+            raise ValueError("Для гонки решателей капчи нужен хотя бы один решатель")
+        self._backends = {backend.name: backend for backend in backends}
+        self._config = config
+        self._backend_stats = {name: _BackendStats() for name in self._backends}
+        self._since_race = 0
+        self._modes = {"race": 0, "single": 0}
+        self._solved = 0
+        self._failed = 0
+        self._reported = 0
+
+    @property
+    def name(self) -> str:
+        return "race"
+
+    def stats(self) -> dict:
+        backends = {}
+        for name, solver in self._backends.items():
+            learned = self._backend_stats[name]
+            own = solver.stats()
+            backends[name] = {
+                **own,
+                "entries": learned.entries,
+                "wins": learned.wins,
+                "unconfident": learned.unconfident,
+                "cancelled": learned.cancelled,
+                "win_rate": round(learned.wins / learned.entries, 4) if learned.entries else None,
+                "latency_ms": round(learned.latency_s * 1000, 1) if learned.latency_s is not None else None,
+                "accuracy": round(learned.accuracy, 4),
+                "cost": round(own["solved"] * solver.cost_per_solve, 4),
+            }
+        return {
+            "solved": self._solved,
+            "failed": self._failed,
+            "reported_incorrect": self._reported,
+            "modes": dict(self._modes),
+            "preferred": self._preferred(),
+            "backends": backends,
+        }
+
+    async def close(self) -> None:
+        for backend in self._backends.values():
+            await backend.close()
+
+    async def solve(self, image: bytes) -> CaptchaAnswer:
+        preferred = self._preferred()
+        answer = None
+        if preferred is not None and self._since_race + 1 < self._config.race_explore_every:
+            self._since_race += 1
+            self._modes["single"] += 1
+            answer = await self._race(image, [preferred], mode="single")
+            others = [name for name in self._backends if name != preferred]
+            if answer is None and others:
+                answer = await self._race(image, others, mode="race")
+        else:
+            self._since_race = 0
+            self._modes["race"] += 1
+            answer = await self._race(image, list(self._backends), mode="race")
+        if answer is None:
+            self._failed += 1
+            raise CaptchaError("Ни один решатель не распознал капчу")
+        self._solved += 1
+        return answer
+
+    async def report_correct(self, answer: CaptchaAnswer) -> None:
+        solver = self._backends.get(answer.backend)
+        if solver is not None:
+            await solver.report_correct(answer)
+
+    async def report_incorrect(self, answer: CaptchaAnswer) -> None:
+        self._reported += 1
+        solver = self._backends.get(answer.backend)
+        if solver is None:
+            return
+        self._backend_stats[answer.backend].rejected += 1
+        await solver.report_incorrect(answer)
+
+    def _preferred(self) -> str | None:
+        candidates = [
+            (learned.latency_s / learned.accuracy, name)
+            for name, learned in self._backend_stats.items()
+            if learned.wins >= self._config.race_min_samples
+            and learned.latency_s is not None
+            and learned.latency_s <= self._config.race_single_max_latency_s
+            and learned.accuracy >= self._config.race_single_min_accuracy
+        ]
+        return min(candidates)[1] if candidates else None
+
+    async def _race(self, image: bytes, names: list[str], mode: str) -> CaptchaAnswer | None:
+        pending = {asyncio.create_task(self._attempt(name, image, mode)) for name in names}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                answers = [task.result() for task in done if task.result() is not None]
+                if answers:
+                    answer = answers[0]
+                    self._backend_stats[answer.backend].wins += 1
+                    CAPTCHA_RACE_WINS.labels(backend=answer.backend, mode=mode).inc()
+                    return answer
+            return None
+        finally:
+            # Проигравшие не нужны: отмена освобождает слот провайдера и не ждет его ответа
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _attempt(self, name: str, image: bytes, mode: str) -> CaptchaAnswer | None:
+        learned = self._backend_stats[name]
+        learned.entries += 1
+        CAPTCHA_RACE_ENTRIES.labels(backend=name, mode=mode).inc()
+        started = time.perf_counter()
+        try:
+            answer = await self._backends[name].solve(image)
+        except CaptchaError:
+            learned.failed += 1
+            return None
+        except asyncio.CancelledError:
+            learned.cancelled += 1
+            raise
+        if answer.confidence is not None and answer.confidence < self._config.local_min_confidence:
+            # Неуверенный ответ не отправляется на сайт и не считается решением — ждем остальных
+            learned.unconfident += 1
+            return None
+        elapsed = time.perf_counter() - started
+        learned.solved += 1
+        learned.latency_s = elapsed if learned.latency_s is None else learned.latency_s + _LATENCY_ALPHA * (elapsed - learned.latency_s)
+        return answer
+
+
+class CachingCaptchaSolver(CaptchaSolver):
+    """Решатель за кэшем проверенных ответов: повторная картинка не отправляется провайдеру.
+
+    В кэш попадают только коды, после которых сайт показал результаты (`report_correct`);
+    если сайт не принял код из кэша, запись удаляется.
+    """
+
+    def __init__(self, solver: CaptchaSolver, cache: CaptchaAnswerCache):
+        self._solver = solver
+        self._cache = cache
+
+    @property
+    def name(self) -> str:
+        return self._solver.name
+
+    def stats(self) -> dict:
+        return {**self._solver.stats(), "answer_cache": self._cache.stats()}
+
+    async def close(self) -> None:
+        await self._solver.close()
+        await self._cache.close()
+
+    async def solve(self, image: bytes) -> CaptchaAnswer:
+        key = await asyncio.to_thread(image_key, image)
+        code = self._cache.get(key)
+        if code is not None:
+            CAPTCHAS_TOTAL.labels(backend="cache", result="solved").inc()
+            return CaptchaAnswer(code=code, backend="cache", image_key=key)
+        answer = await self._solver.solve(image)
+        answer.image_key = key
+        return answer
+
+    async def report_correct(self, answer: CaptchaAnswer) -> None:
+        if answer.image_key is not None:
+            await self._cache.put(answer.image_key, answer.code)
+        if answer.backend != "cache":
+            await self._solver.report_correct(answer)
+
+    async def report_incorrect(self, answer: CaptchaAnswer) -> None:
+        if answer.backend != "cache":
+            await self._solver.report_incorrect(answer)
+            return
+        CAPTCHAS_TOTAL.labels(backend="cache", result="rejected").inc()
+        if answer.image_key is not None:
+            await self._cache.discard(answer.image_key)
@@ -0,0 +1,201 @@
+"""Кэш проверенных ответов капчи: точный (sha256) и перцептивный (dHash) поиск, LRU в памяти и SQLite."""
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+import hashlib
+from pathlib import Path
+import sqlite3
+import time
+
+import structlog
+
+from src.infrastructure.config import CaptchaCacheConfig
+from src.infrastructure.metrics import CAPTCHA_CACHE_LOOKUPS_TOTAL
+from src.infrastructure.png import GrayImage, PngError, decode_gray
+
+
+logger = structlog.get_logger()
+
+# Сетка dHash: 17x8 ячеек, сравнение соседних по горизонтали дает 16x8 = 128 бит.
+# 64-битный dHash 9x8 слишком груб для строки из нескольких цифр: разные коды различаются на единицы бит
+_DHASH_W, _DHASH_H = 16, 8
+
+
+@dataclass(frozen=True)
+class ImageKey:
+    """Отпечатки картинки капчи: sha256 байтов и dHash (None, если картинку не удалось декодировать)."""
+
+    sha256: str
+    dhash: int | None
+
+
+def image_key(image: bytes) -> ImageKey:
+    try:
+        perceptual = dhash(decode_gray(image))
+    except PngError:
+        perceptual = None
+    return ImageKey(sha256=hashlib.sha256(image).hexdigest(), dhash=perceptual)
+
+
+def dhash(image: GrayImage) -> int:
+    """Разностный хэш: знак перепада яркости между соседними ячейками уменьшенной картинки."""
+    columns, rows = _DHASH_W + 1, _DHASH_H
+    value = 0
+    for row in range(rows):
+        y0 = row * image.height // rows
+        y1 = max(y0 + 1, (row + 1) * image.height // rows)
+        previous = None
+        for col in range(columns):
+            x0 = col * image.width // columns
+            x1 = max(x0 + 1, (col + 1) * image.width // columns)
+            mean = sum(image.pixels[y * image.width + x] for y in range(y0, y1) for x in range(x0, x1)) / ((y1 - y0) * (x1 - x0))
+            if previous is not None:
+                value = (value << 1) | (previous > mean)
+            previous = mean
+    return value
+
+
+class CaptchaAnswerCache:
+    """Ответы, которые сайт принял: повторная капча решается без провайдера.
+
+    Сначала ищется точное совпадение байтов, затем картинка с dHash не дальше `max_distance`
+    бит (то же изображение после перекодирования или с другим шумом сжатия). В памяти — LRU
+    на `max_entries` ответов; SQLite хранит их между перезапусками и читается целиком при старте.
+    """
+
+    def __init__(self, config: CaptchaCacheConfig):
+        self._config = config
+        self._entries: OrderedDict[str, tuple[str, int | None]] = OrderedDict()
+        self._db: sqlite3.Connection | None = None
+        self._db_lock = asyncio.Lock()
+        self._exact_hits = 0
+        self._perceptual_hits = 0
+        self._misses = 0
+        self._stored = 0
+        self._discarded = 0
+        if config.sqlite_path is not None:
+            self._db = self._open_db(config.sqlite_path)
+            self._load()
+
+    def get(self, key: ImageKey) -> str | None:
+        entry = self._entries.get(key.sha256)
+        if entry is not None:
+            self._entries.move_to_end(key.sha256)
+            self._exact_hits += 1
+            CAPTCHA_CACHE_LOOKUPS_TOTAL.labels(result="exact").inc()
+            return entry[0]
+        if key.dhash is not None:
+            # Полный перебор: десятки тысяч XOR и popcount занимают доли миллисекунды
+            best = min(
+                (
+                    ((key.dhash ^ perceptual).bit_count(), sha256)
+                    for sha256, (_, perceptual) in self._entries.items()
+                    if perceptual is not None
+                ),
+                default=None,
+            )
+            if best is not None and best[0] <= self._config.max_distance:
+                self._entries.move_to_end(best[1])
+                self._perceptual_hits += 1
+                CAPTCHA_CACHE_LOOKUPS_TOTAL.labels(result="perceptual").inc()
+                return self._entries[best[1]][0]
+        self._misses += 1
+        CAPTCHA_CACHE_LOOKUPS_TOTAL.labels(result="miss").inc()
+        return None
+
+    async def put(self, key: ImageKey, code: str) -> None:
+        """Запоминает код, который сайт принял для этой картинки."""
+        self._entries[key.sha256] = (code, key.dhash)
+        self._entries.move_to_end(key.sha256)
+        self._stored += 1
+        evicted = []
+        while len(self._entries) > self._config.max_entries:
+            evicted.append(self._entries.popitem(last=False)[0])
+        if self._db is not None:
+            await self._db_call(self._db_put, key, code, evicted)
+
+    async def discard(self, key: ImageKey) -> None:
+        """Удаляет ответ, который сайт не принял (картинка совпала по dHash, но код другой)."""
+        matched = [
+            sha256
+            for sha256, (_, perceptual) in self._entries.items()
+            if sha256 == key.sha256 or self._similar(key.dhash, perceptual)
+        ]
+        for sha256 in matched:
+            del self._entries[sha256]
+        self._discarded += len(matched)
+        if self._db is not None and matched:
+            await self._db_call(self._db_delete, matched)
+
+    async def close(self) -> None:
+        if self._db is not None:
+            async with self._db_lock:
+                self._db.close()
+            self._db = None
+
+    def stats(self) -> dict:
+        lookups = self._exact_hits + self._perceptual_hits + self._misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self._config.max_entries,
+            "exact_hits": self._exact_hits,
+            "perceptual_hits": self._perceptual_hits,
+            "misses": self._misses,
+            "hit_rate": round((self._exact_hits + self._perceptual_hits) / lookups, 4) if lookups else None,
+            "stored": self._stored,
+            "discarded": self._discarded,
+            "persistent": self._db is not None,
+        }
+
+    def _similar(self, a: int | None, b: int | None) -> bool:
+        return a is not None and b is not None and (a ^ b).bit_count() <= self._config.max_distance
+
+    async def _db_call(self, func, *args):
+        async with self._db_lock:
+            try:
+                return await asyncio.to_thread(func, *args)
+            except sqlite3.Error as exc:
+                # Кэш не должен ронять поиск: при сбое SQLite работаем только с памятью
+                logger.warning("Ошибка SQLite-кэша ответов капчи", error=str(exc))
+                return None
+
+    @staticmethod
+    def _open_db(path: Path) -> sqlite3.Connection:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS captcha_answers ("
+            "sha256 TEXT PRIMARY KEY, dhash TEXT, code TEXT NOT NULL, verified_at REAL NOT NULL)"
+        )
+        db.commit()
+        return db
+
+    def _load(self) -> None:
+        assert self._db is not None
+        rows = self._db.execute(
+            "SELECT sha256, dhash, code FROM captcha_answers ORDER BY verified_at DESC LIMIT ?", (self._config.max_entries,)
+        ).fetchall()
+        # Самые свежие — в конце LRU
+        for sha256, perceptual, code in reversed(rows):
+            self._entries[sha256] = (code, int(perceptual, 16) if perceptual else None)
+        self._db.execute(
+            "DELETE FROM captcha_answers WHERE sha256 NOT IN "
+            "(SELECT sha256 FROM captcha_answers ORDER BY verified_at DESC LIMIT ?)",
+            (self._config.max_entries,),
+        )
+        self._db.commit()
+
+    def _db_put(self, key: ImageKey, code: str, evicted: list[str]) -> None:
+        assert self._db is not None
+        self._db.execute(
+            "INSERT OR REPLACE INTO captcha_answers (sha256, dhash, code, verified_at) VALUES (?, ?, ?, ?)",
+            (key.sha256, f"{key.dhash:032x}" if key.dhash is not None else None, code, time.time()),
+        )
+        self._db.executemany("DELETE FROM captcha_answers WHERE sha256 = ?", [(sha256,) for sha256 in evicted])
+        self._db.commit()
+
+    def _db_delete(self, keys: list[str]) -> None:
+        assert self._db is not None
+        self._db.executemany("DELETE FROM captcha_answers WHERE sha256 = ?", [(sha256,) for sha256 in keys])
+        self._db.commit()
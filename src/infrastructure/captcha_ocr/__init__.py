@@ -0,0 +1,9 @@
+"""Локальное распознавание цифровой капчи: сегментация и классификатор цифр по шаблонам.
+
+Поставляемый `model.json` — заготовка: шаблоны сняты с капч симулятора (`ocr-corpus`), и его
+точность на настоящем сайте не измерена. Для ФССП модель обучается на размеченных снимках
+(`ocr-train`) и подключается через `CAPTCHA__LOCAL_MODEL_PATH`.
+"""
+from src.infrastructure.captcha_ocr.ocr import DigitModel, Recognition, default_model, evaluate, load_corpus
+
+__all__ = ["DigitModel", "Recognition", "default_model", "evaluate", "load_corpus"]
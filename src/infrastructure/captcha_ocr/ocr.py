@@ -0,0 +1,248 @@
+"""Распознавание цифровой капчи без внешних сервисов.
+
+Классический конвейер: перевод в оттенки серого, бинаризация порогом Оцу, удаление
+одиночных точек, сегментация символов по проекции на ось X, нормализация каждой цифры
+в сетку `FEATURE_W x FEATURE_H` и классификатор ближайшего шаблона (косинусная близость).
+Шаблоны цифр лежат рядом в `model.json` и переобучаются командой `ocr-train` по
+размеченным картинкам.
+"""
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from functools import cache
+import json
+import math
+from pathlib import Path
+import time
+
+from src.infrastructure.png import GrayImage, decode_gray
+
+
+FEATURE_W, FEATURE_H = 8, 12
+DEFAULT_MODEL_PATH = Path(__file__).with_name("model.json")
+
+# Столбец считается пустым, если в нем меньше двух пикселей символа: так тонкие
+# горизонтальные линии шума не склеивают соседние цифры
+_MIN_COLUMN_INK = 2
+_MIN_SEGMENT_WIDTH = 2
+# Мягкость перевода близости шаблонов в уверенность: чем меньше, тем резче
+_TEMPERATURE = 0.03
+
+
+@dataclass(frozen=True)
+class Recognition:
+    """Результат распознавания: код, общая уверенность (минимум по цифрам) и уверенность по каждой цифре."""
+
+    code: str
+    confidence: float
+    digit_confidences: tuple[float, ...]
+
+
+class DigitModel:
+    """Шаблоны цифр: по одному усредненному нормированному вектору признаков на цифру."""
+
+    def __init__(self, templates: dict[str, list[float]], source: str = ""):
+        self.templates = {digit: _normalize(vector) for digit, vector in templates.items()}
+        self.source = source
+
+    @classmethod
+    def load(cls, path: Path = DEFAULT_MODEL_PATH) -> "DigitModel":
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if (data.get("width"), data.get("height")) != (FEATURE_W, FEATURE_H):
+            raise ValueError(f"Модель {path} обучена для другой сетки признаков")
+        return cls(data["templates"], source=data.get("source", ""))
+
+    def save(self, path: Path) -> None:
+        payload = {
+            "width": FEATURE_W,
+            "height": FEATURE_H,
+            "source": self.source,
+            "templates": {digit: [round(value, 4) for value in vector] for digit, vector in sorted(self.templates.items())},
+        }
+        path.write_text(json.dumps(payload, ensure_ascii=False, indent=1) + "\n", encoding="utf-8")
+
+    @classmethod
+    def train(cls, samples: Iterable[tuple[str, bytes]], source: str = "") -> tuple["DigitModel", int]:
+        """Обучает шаблоны по парам `(код, png)`; картинки, где число символов не совпало с кодом, пропускаются.
+
+        Возвращает модель и количество использованных картинок.
+        """
+        sums: dict[str, list[float]] = {}
+        counts: dict[str, int] = {}
+        used = 0
+        for code, png in samples:
+            glyphs = list(iter_glyph_features(decode_gray(png), expected=len(code)))
+            if len(glyphs) != len(code):
+                continue
+            used += 1
+            for digit, features in zip(code, glyphs):
+                total = sums.setdefault(digit, [0.0] * len(features))
+                for index, value in enumerate(features):
+                    total[index] += value
+                counts[digit] = counts.get(digit, 0) + 1
+        if not sums:
+            raise ValueError("Нет ни одной пригодной размеченной картинки")
+        templates = {digit: [value / counts[digit] for value in total] for digit, total in sums.items()}
+        return cls(templates, source=source), used
+
+    def classify(self, features: list[float]) -> tuple[str, float]:
+        vector = _normalize(features)
+        scores = {digit: _dot(vector, template) for digit, template in self.templates.items()}
+        best = max(scores, key=scores.__getitem__)
+        # Softmax по близости: уверенность высокая, только если остальные шаблоны заметно дальше
+        weight = sum(math.exp((score - scores[best]) / _TEMPERATURE) for score in scores.values())
+        return best, 1 / weight
+
+    def recognize(self, png: bytes, length: int | None = None) -> Recognition:
+        """Распознает код; при несовпадении числа символов с `length` уверенность нулевая."""
+        glyphs = list(iter_glyph_features(decode_gray(png), expected=length))
+        if not glyphs or (length is not None and len(glyphs) != length):
+            return Recognition(code="", confidence=0.0, digit_confidences=())
+        digits, confidences = zip(*(self.classify(features) for features in glyphs))
+        return Recognition(code="".join(digits), confidence=min(confidences), digit_confidences=tuple(confidences))
+
+
+@cache
+def default_model() -> DigitModel:
+    return DigitModel.load()
+
+
+def load_corpus(directory: Path) -> list[tuple[str, bytes]]:
+    """Размеченные картинки `<код>_<что угодно>.png`: код берется из имени файла."""
+    return [(path.name.split("_", 1)[0], path.read_bytes()) for path in sorted(directory.glob("*.png"))]
+
+
+def evaluate(model: DigitModel, samples: list[tuple[str, bytes]], min_confidence: float, length: int | None = None) -> dict:
+    """Точность и скорость на размеченном наборе, в том числе с учетом порога уверенности.
+
+    `coverage` — доля капч, ответ по которым принимается локально (уверенность не ниже порога),
+    `accepted_accuracy` — доля верных среди них; остальные ушли бы на внешний провайдер.
+    """
+    correct = accepted = accepted_correct = 0
+    latencies = []
+    for code, png in samples:
+        started = time.perf_counter()
+        result = model.recognize(png, length=length if length is not None else len(code))
+        latencies.append(time.perf_counter() - started)
+        correct += result.code == code
+        if result.confidence >= min_confidence:
+            accepted += 1
+            accepted_correct += result.code == code
+    latencies.sort()
+    total = len(samples)
+    return {
+        "samples": total,
+        "accuracy": round(correct / total, 4) if total else None,
+        "coverage": round(accepted / total, 4) if total else None,
+        "accepted_accuracy": round(accepted_correct / accepted, 4) if accepted else None,
+        "latency_ms_p50": round(latencies[total // 2] * 1000, 2) if total else None,
+        "latency_ms_max": round(latencies[-1] * 1000, 2) if total else None,
+    }
+
+
+def iter_glyph_features(image: GrayImage, expected: int | None = None) -> Iterator[list[float]]:
+    """Векторы признаков символов слева направо."""
+    ink = _binarize(image)
+    for left, right in _segments(ink, image.width, image.height, expected):
+        rows = [y for y in range(image.height) if any(ink[y * image.width + x] for x in range(left, right))]
+        if rows:
+            yield _features(ink, image.width, left, right, rows[0], rows[-1] + 1)
+
+
+def _binarize(image: GrayImage) -> bytearray:
+    threshold = _otsu(image.pixels)
+    width, height = image.width, image.height
+    ink = bytearray(1 if value <= threshold else 0 for value in image.pixels)
+    # Одиночные точки шума без соседей по 4-связности
+    cleaned = bytearray(ink)
+    for y in range(height):
+        for x in range(width):
+            index = y * width + x
+            if ink[index] and not (
+                (x > 0 and ink[index - 1])
+                or (x + 1 < width and ink[index + 1])
+                or (y > 0 and ink[index - width])
+                or (y + 1 < height and ink[index + width])
+            ):
+                cleaned[index] = 0
+    return cleaned
+
+
+def _otsu(pixels: bytes) -> int:
+    histogram = [0] * 256
+    for value in pixels:
+        histogram[value] += 1
+    total = len(pixels)
+    weighted_total = sum(value * count for value, count in enumerate(histogram))
+    background = weighted_background = 0
+    best_threshold, best_variance = 127, -1.0
+    for value, count in enumerate(histogram):
+        background += count
+        if background == 0:
+            continue
+        foreground = total - background
+        if foreground == 0:
+            break
+        weighted_background += value * count
+        mean_background = weighted_background / background
+        mean_foreground = (weighted_total - weighted_background) / foreground
+        variance = background * foreground * (mean_background - mean_foreground) ** 2
+        if variance > best_variance:
+            best_threshold, best_variance = value, variance
+    return best_threshold
+
+
+def _segments(ink: bytearray, width: int, height: int, expected: int | None) -> list[tuple[int, int]]:
+    columns = [sum(ink[y * width + x] for y in range(height)) for x in range(width)]
+    segments: list[tuple[int, int]] = []
+    start = None
+    for x, count in enumerate([*columns, 0]):
+        if count >= _MIN_COLUMN_INK and start is None:
+            start = x
+        elif count < _MIN_COLUMN_INK and start is not None:
+            if x - start >= _MIN_SEGMENT_WIDTH:
+                segments.append((start, x))
+            start = None
+    if not segments:
+        return segments
+
+    # Слипшиеся цифры: сегмент заметно шире типичного делится на равные части
+    widths = sorted(right - left for left, right in segments)
+    typical = widths[len(widths) // 2]
+    split: list[tuple[int, int]] = []
+    for left, right in segments:
+        parts = max(1, round((right - left) / typical)) if right - left > typical * 1.6 else 1
+        step = (right - left) / parts
+        split.extend((left + round(step * i), left + round(step * (i + 1))) for i in range(parts))
+
+    if expected is not None:
+        while len(split) > expected:
+            # Лишние сегменты — обрывки шума: выбрасываем самый бедный пикселями
+            masses = [sum(columns[left:right]) for left, right in split]
+            del split[masses.index(min(masses))]
+    return split
+
+
+def _features(ink: bytearray, width: int, left: int, right: int, top: int, bottom: int) -> list[float]:
+    """Доля пикселей символа в каждой ячейке сетки `FEATURE_W x FEATURE_H` поверх рамки символа."""
+    features = []
+    box_w, box_h = right - left, bottom - top
+    for row in range(FEATURE_H):
+        y0 = top + row * box_h // FEATURE_H
+        y1 = max(y0 + 1, top + (row + 1) * box_h // FEATURE_H)
+        for col in range(FEATURE_W):
+            x0 = left + col * box_w // FEATURE_W
+            x1 = max(x0 + 1, left + (col + 1) * box_w // FEATURE_W)
+            filled = sum(ink[y * width + x] for y in range(y0, y1) for x in range(x0, x1))
+            features.append(filled / ((y1 - y0) * (x1 - x0)))
+    return features
+
+
+def _normalize(vector: list[float]) -> list[float]:
+    mean = sum(vector) / len(vector)
+    centered = [value - mean for value in vector]
+    norm = math.sqrt(sum(value * value for value in centered)) or 1.0
+    return [value / norm for value in centered]
+
+
+def _dot(a: list[float], b: list[float]) -> float:
+    return sum(x * y for x, y in zip(a, b))
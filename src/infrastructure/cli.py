@@ -2,19 +2,34 @@
 from __future__ import annotations
 
 import asyncio
+import itertools
 import json
 import logging
+from pathlib import Path
+import random
+import time
 from typing import Annotated, Any
 
+import httpx
 import typer
 from pydantic import ValidationError
 from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn
+from rich.progress import (
+    BarColumn,
+    MofNCompleteColumn,
+    Progress,
+    SpinnerColumn,
+    TextColumn,
+    TimeElapsedColumn,
+    TimeRemainingColumn,
+)
 from rich.table import Table
 from rich.panel import Panel
 
+from src.application.batch import run_batch
+from src.application.loadtest import LoadReport, parse_mix, run_load, synthetic_queries
 from src.application.fssp_service import FsspService
-from src.domain import DebtorCaseList, Inn, IpNumber, Person
+from src.domain import DebtorCaseList, Inn, IpNumber, Person, SearchQuery, query_type
 from src.domain.errors import (
     CaptchaError,
     CaptchaLimitExceeded,
@@ -22,11 +37,12 @@ from src.domain.errors import (
     FsspUnavailable,
     ParsingError,
 )
-from src.infrastructure.captcha import CaptchaSolver
-from src.infrastructure.config import create_settings
-from src.infrastructure.fssp_client import FsspClient
+from src.infrastructure.batch_files import Checkpoint, InputRow, count_rows, read_rows, row_to_query
+from src.infrastructure.captcha_ocr import DigitModel, default_model, evaluate, load_corpus
+from src.infrastructure.config import Settings, create_settings
+from src.infrastructure.factory import build_fssp_service
 from src.infrastructure.logging import setup_logging
-from src.infrastructure.parser import FsspHtmlParser
+from src.infrastructure.simulator.captcha_image import random_code, render_code
 
 app = typer.Typer(
     name="fssp",
@@ -145,8 +161,8 @@ def inn(
     asyncio.run(_run_search("inn", format=format, inn=inn))
 
 
-async def _run_search(search_type: str, format: str, **kwargs: Any) -> None:
-    """Внутренняя функция для выполнения поиска."""
+def _bootstrap() -> Settings:
+    """Загружает настройки, настраивает логирование и проверяет наличие ключа капчи."""
     settings = create_settings()
     setup_logging(
         log_path=settings.LOG_PATH,
@@ -164,11 +180,13 @@ async def _run_search(search_type: str, format: str, **kwargs: Any) -> None:
             )
         )
         raise typer.Exit(1)
+    return settings
 
-    solver = CaptchaSolver(settings.captcha.api_key)
-    client = FsspClient(solver)
-    parser = FsspHtmlParser()
-    service = FsspService(settings, client, parser)
+
+async def _run_search(search_type: str, format: str, **kwargs: Any) -> None:
+    """Внутренняя функция для выполнения поиска."""
+    settings = _bootstrap()
+    service = build_fssp_service(settings)
 
     try:
         result = await execute_search(service, search_type, **kwargs)
@@ -220,6 +238,8 @@ async def _run_search(search_type: str, format: str, **kwargs: Any) -> None:
             )
         )
         raise typer.Exit(6)
+    finally:
+        await service.close()
 
     if format.lower() == "json":
         render_json(result)
@@ -227,6 +247,343 @@ async def _run_search(search_type: str, format: str, **kwargs: Any) -> None:
         render_human_table(result)
 
 
+@app.command()
+def batch(
+    input: Annotated[Path, typer.Option("--input", "-i", help="Файл запросов .csv (с заголовком) или .jsonl", exists=True, dir_okay=False)],
+    output: Annotated[Path, typer.Option("--output", "-o", help="Файл результатов .jsonl (дописывается)", dir_okay=False)],
+    concurrency: Annotated[int, typer.Option("--concurrency", "-c", help="Сколько запросов выполняется одновременно", min=1)] = 4,
+    fresh: Annotated[bool, typer.Option("--fresh", help="Игнорировать кэш результатов")] = False,
+    restart: Annotated[bool, typer.Option("--restart", help="Начать заново, удалив результаты и контрольную точку")] = False,
+) -> None:
+    """Пакетный поиск: читает запросы из файла и дописывает результаты в JSONL с возможностью возобновления.
+
+    Колонки/ключи: type (ip/person/inn, необязательно), ip, inn, last_name, first_name, patronymic, birthday.
+    """
+    asyncio.run(_run_batch(input, output, concurrency, fresh, restart))
+
+
+def _batch_line(row: InputRow, query: SearchQuery | None, result: DebtorCaseList | None, error: Exception | None) -> str:
+    line: dict[str, Any] = {
+        "index": row.index,
+        "query": {"type": query_type(query), **query.model_dump()} if query is not None else row.data,
+        "success": error is None,
+    }
+    if result is not None:
+        line["count"] = len(result.items)
+        line["truncated"] = result.truncated
+        line["items"] = [item.model_dump() for item in result.items]
+    if error is not None:
+        line["error"] = str(error)
+        line["error_type"] = type(error).__name__
+    return json.dumps(line, ensure_ascii=False) + "\n"
+
+
+async def _run_batch(input: Path, output: Path, concurrency: int, fresh: bool, restart: bool) -> None:
+    """Внутренняя функция пакетного поиска."""
+    settings = _bootstrap()
+
+    if restart:
+        output.unlink(missing_ok=True)
+        Checkpoint.for_output(output).unlink(missing_ok=True)
+    try:
+        checkpoint = Checkpoint.load(output, input)
+        total = count_rows(input)
+    except ValueError as exc:
+        console.print(f"[red]Ошибка:[/red] {exc}")
+        raise typer.Exit(1)
+
+    if checkpoint.completed:
+        console.print(f"[cyan]Возобновление:[/cyan] уже обработано {checkpoint.completed} из {total}")
+    if checkpoint.completed >= total:
+        return
+
+    service = build_fssp_service(settings)
+    # Номер строки входного файла для каждой позиции потока запросов, отданного run_batch
+    rows_by_position: dict[int, InputRow] = {}
+    errors = 0
+    processed = 0
+    started_at = time.monotonic()
+    last_saved_at = started_at
+
+    progress = Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        MofNCompleteColumn(),
+        TextColumn("[cyan]{task.fields[rate]:.2f} запр/с[/cyan]"),
+        TextColumn("[red]ошибок: {task.fields[errors]}[/red]"),
+        TimeElapsedColumn(),
+        TimeRemainingColumn(),
+        console=console,
+    )
+
+    with output.open("a", encoding="utf-8") as out, progress:
+        task = progress.add_task("[cyan]Пакетный поиск", total=total, completed=checkpoint.completed, rate=0.0, errors=0)
+
+        def record(row: InputRow, query: SearchQuery | None, result: DebtorCaseList | None, error: Exception | None) -> None:
+            nonlocal errors, processed, last_saved_at
+            out.write(_batch_line(row, query, result, error))
+            out.flush()
+            checkpoint.mark(row.index)
+            processed += 1
+            errors += error is not None
+            now = time.monotonic()
+            if now - last_saved_at >= 1:
+                checkpoint.save(out.tell())
+                last_saved_at = now
+            progress.update(task, advance=1, rate=processed / max(now - started_at, 1e-6), errors=errors)
+
+        def queries():
+            position = 0
+            for row in read_rows(input):
+                if checkpoint.is_done(row.index):
+                    continue
+                try:
+                    query = row_to_query(row.data)
+                except (ValidationError, ValueError) as exc:
+                    record(row, None, None, exc)
+                    continue
+                rows_by_position[position] = row
+                position += 1
+                yield query
+
+        try:
+            async for outcome in run_batch(service, queries(), concurrency=concurrency, fresh=fresh):
+                record(rows_by_position.pop(outcome.index), outcome.query, outcome.result, outcome.error)
+        finally:
+            checkpoint.save(out.tell())
+            await service.close()
+
+    console.print(f"[green]Готово:[/green] обработано {processed}, ошибок {errors}. Результаты: {output}")
+
+
+@app.command()
+def loadtest(
+    target: Annotated[str, typer.Option("--target", "-t", help="service — FsspService в процессе, api — REST API по --url")] = "service",
+    url: Annotated[str, typer.Option("--url", help="Базовый URL REST API для --target api")] = "http://127.0.0.1:8000",
+    mix: Annotated[str, typer.Option("--mix", help="Смесь запросов, например ip=1,person=1,inn=2")] = "ip=1,person=1,inn=1",
+    input: Annotated[Path | None, typer.Option("--input", "-i", help="Брать запросы из файла .csv/.jsonl (по кругу) вместо --mix", exists=True, dir_okay=False)] = None,
+    concurrency: Annotated[int, typer.Option("--concurrency", "-c", help="Одновременных запросов (без --rate — замкнутая модель)", min=1)] = 4,
+    rate: Annotated[float | None, typer.Option("--rate", "-r", help="Целевой темп, запр/с (открытая модель)", min=0.001)] = None,
+    duration: Annotated[float | None, typer.Option("--duration", "-d", help="Длительность прогона, сек", min=0.1)] = 60,
+    requests: Annotated[int | None, typer.Option("--requests", "-n", help="Количество запросов вместо --duration", min=1)] = None,
+    cached: Annotated[bool, typer.Option("--cached", help="Разрешить ответы из кэша (по умолчанию кэш обходится)")] = False,
+    seed: Annotated[int, typer.Option("--seed", help="Зерно генератора запросов")] = 0,
+    json_output: Annotated[Path | None, typer.Option("--json", help="Сохранить отчет в JSON", dir_okay=False)] = None,
+) -> None:
+    """Нагрузочный прогон: пропускная способность, перцентили задержки, ошибки по типам и расход капч.
+
+    Рассчитан на работу с локальным симулятором ФССП — не запускайте его против настоящего сайта.
+    """
+    if target not in ("service", "api"):
+        console.print("[red]Ошибка:[/red] --target должен быть service или api")
+        raise typer.Exit(1)
+    try:
+        queries = _loadtest_queries(input) if input is not None else synthetic_queries(parse_mix(mix), seed)
+    except ValueError as exc:
+        console.print(f"[red]Ошибка:[/red] {exc}")
+        raise typer.Exit(1)
+    report = asyncio.run(
+        _run_loadtest(target, url, queries, concurrency, rate, duration if requests is None else None, requests, not cached)
+    )
+    data = report.to_dict()
+    render_loadtest_report(data)
+    if json_output is not None:
+        json_output.write_text(json.dumps(data, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        console.print(f"Отчет сохранен: {json_output}")
+
+
+def _loadtest_queries(input: Path):
+    queries = []
+    for row in read_rows(input):
+        try:
+            queries.append(row_to_query(row.data))
+        except (ValidationError, ValueError):
+            continue
+    if not queries:
+        raise ValueError(f"В файле {input} нет корректных запросов")
+    return itertools.cycle(queries)
+
+
+async def _run_loadtest(
+    target: str,
+    url: str,
+    queries,
+    concurrency: int,
+    rate: float | None,
+    duration: float | None,
+    requests: int | None,
+    fresh: bool,
+) -> LoadReport:
+    report = LoadReport(mode=f"rate={rate}/s" if rate else f"concurrency={concurrency}", target=target if target == "service" else url)
+    progress = Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        TextColumn("[cyan]{task.completed} запросов[/cyan]"),
+        TextColumn("[red]ошибок: {task.fields[errors]}[/red]"),
+        TimeElapsedColumn(),
+        console=console,
+    )
+
+    def on_result() -> None:
+        progress.update(task, completed=report.requests, errors=report.failed)
+
+    if target == "service":
+        settings = _bootstrap()
+        service = build_fssp_service(settings)
+
+        async def probe(query: SearchQuery) -> str | None:
+            await service.search(query, fresh=fresh)
+            return None
+
+        try:
+            await service.start()
+            before = _captchas_solved(service.stats())
+            with progress:
+                task = progress.add_task("[cyan]Нагрузка", total=None, errors=0)
+                await run_load(
+                    probe,
+                    queries,
+                    report,
+                    concurrency=concurrency,
+                    rate=rate,
+                    duration_s=duration,
+                    max_requests=requests,
+                    on_result=on_result,
+                )
+            after = _captchas_solved(service.stats())
+        finally:
+            await service.close()
+    else:
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=url.rstrip("/"), timeout=None, limits=limits) as client:
+
+            async def probe(query: SearchQuery) -> str | None:
+                response = await client.post(f"/api/{query_type(query)}", json=query.model_dump(), params={"fresh": fresh})
+                if response.status_code < 400:
+                    return None
+                try:
+                    return response.json().get("error_type") or f"HTTP {response.status_code}"
+                except ValueError:
+                    return f"HTTP {response.status_code}"
+
+            before = await _api_captchas_solved(client)
+            with progress:
+                task = progress.add_task("[cyan]Нагрузка", total=None, errors=0)
+                await run_load(
+                    probe,
+                    queries,
+                    report,
+                    concurrency=concurrency,
+                    rate=rate,
+                    duration_s=duration,
+                    max_requests=requests,
+                    on_result=on_result,
+                )
+            after = await _api_captchas_solved(client)
+
+    if before is not None and after is not None:
+        report.captchas_solved = after - before
+    return report
+
+
+def _captchas_solved(stats: dict) -> int | None:
+    return stats.get("client", {}).get("captcha", {}).get("solved")
+
+
+async def _api_captchas_solved(client: httpx.AsyncClient) -> int | None:
+    try:
+        response = await client.get("/api/stats")
+        response.raise_for_status()
+        return _captchas_solved(response.json())
+    except (httpx.HTTPError, ValueError):
+        return None
+
+
+def render_loadtest_report(data: dict) -> None:
+    """Вывод отчета нагрузочного прогона."""
+    summary = Table(title=f"Нагрузка: {data['target']} ({data['mode']})", show_header=False)
+    summary.add_column(style="cyan")
+    summary.add_column()
+    summary.add_row("Длительность", f"{data['duration_s']} с")
+    summary.add_row("Запросов / успешно / ошибок", f"{data['requests']} / {data['succeeded']} / {data['failed']}")
+    summary.add_row("Пропускная способность", f"{data['throughput_rps']} запр/с, {data['lookups_per_minute']} успешных поисков/мин")
+    captcha = data["captcha"]
+    if captcha["solved"] is not None:
+        summary.add_row("Капчи", f"{captcha['solved']} (на поиск: {captcha['per_lookup']})")
+    console.print(summary)
+
+    latency = Table(title="Задержка, мс", header_style="bold magenta")
+    for column in ("Тип", "Запросов", "p50", "p95", "p99", "max"):
+        latency.add_column(column)
+    rows = [("все", data["latency"]), *data["latency_by_type"].items()]
+    for name, stats in rows:
+        latency.add_row(name, str(stats["count"]), *(str(stats[key]) for key in ("p50_ms", "p95_ms", "p99_ms", "max_ms")))
+    console.print(latency)
+
+    if data["errors"]:
+        errors = Table(title="Ошибки", header_style="bold red")
+        errors.add_column("Тип")
+        errors.add_column("Количество")
+        for name, count in data["errors"].items():
+            errors.add_row(name, str(count))
+        console.print(errors)
+
+
+@app.command("ocr-corpus")
+def ocr_corpus(
+    output: Annotated[Path, typer.Argument(help="Каталог для картинок", file_okay=False)],
+    count: Annotated[int, typer.Option("--count", "-n", help="Количество картинок", min=1)] = 500,
+    length: Annotated[int, typer.Option("--length", help="Цифр в коде", min=1)] = 5,
+    seed: Annotated[int, typer.Option("--seed", help="Зерно генератора")] = 0,
+) -> None:
+    """Размеченный набор капч симулятора (`<код>_<номер>.png`) для обучения и проверки локального распознавания."""
+    output.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    for index in range(count):
+        code = random_code(rng, length)
+        (output / f"{code}_{index:05d}.png").write_bytes(render_code(code, rng))
+    console.print(f"[green]Готово:[/green] {count} картинок в {output}")
+
+
+@app.command("ocr-train")
+def ocr_train(
+    corpus: Annotated[Path, typer.Argument(help="Каталог размеченных картинок <код>_*.png", exists=True, file_okay=False)],
+    output: Annotated[Path, typer.Option("--output", "-o", help="Куда сохранить шаблоны", dir_okay=False)] = Path(
+        "src/infrastructure/captcha_ocr/model.json"
+    ),
+) -> None:
+    """Обучение шаблонов цифр локального распознавания капчи."""
+    samples = load_corpus(corpus)
+    try:
+        model, used = DigitModel.train(samples, source=f"{corpus.name}: {len(samples)} картинок")
+    except ValueError as exc:
+        console.print(f"[red]Ошибка:[/red] {exc}")
+        raise typer.Exit(1)
+    model.save(output)
+    console.print(f"[green]Готово:[/green] обучено на {used} из {len(samples)} картинок, цифр: {len(model.templates)}. Модель: {output}")
+
+
+@app.command("ocr-eval")
+def ocr_eval(
+    corpus: Annotated[Path, typer.Argument(help="Каталог размеченных картинок <код>_*.png", exists=True, file_okay=False)],
+    model_path: Annotated[Path | None, typer.Option("--model", "-m", help="Файл шаблонов (по умолчанию поставляемый)", exists=True, dir_okay=False)] = None,
+    min_confidence: Annotated[float, typer.Option("--min-confidence", help="Порог уверенности, ниже — внешний решатель", min=0, max=1)] = 0.8,
+) -> None:
+    """Офлайн-проверка локального распознавания: точность, доля капч без внешнего решателя и задержка."""
+    samples = load_corpus(corpus)
+    if not samples:
+        console.print(f"[red]Ошибка:[/red] в {corpus} нет картинок <код>_*.png")
+        raise typer.Exit(1)
+    report = evaluate(DigitModel.load(model_path) if model_path else default_model(), samples, min_confidence)
+    table = Table(title=f"Локальное распознавание: {corpus}", show_header=False)
+    table.add_column(style="cyan")
+    table.add_column()
+    for key, value in report.items():
+        table.add_row(key, str(value))
+    console.print(table)
+
+
 def main() -> None:
     """Точка входа в CLI."""
     app()
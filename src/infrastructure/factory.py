@@ -0,0 +1,106 @@
+"""Сборка зависимостей сервиса, общая для HTTP API, MCP server и CLI."""
+import structlog
+
+from src.application.fssp_service import FsspService
+from src.application.limiter import AdaptiveLimiter, LimitedFetcher
+from src.application.ports import FsspFetcher
+from src.application.jobs import JobRunner
+from src.infrastructure.browser import BrowserManager
+from src.infrastructure.cache import ResultCache
+from src.infrastructure.captcha import (
+    CachingCaptchaSolver,
+    CaptchaSolver,
+    FallbackCaptchaSolver,
+    LocalCaptchaSolver,
+    RacingCaptchaSolver,
+    RuCaptchaSolver,
+    SimulatorCaptchaSolver,
+)
+from src.infrastructure.captcha_cache import CaptchaAnswerCache
+from src.infrastructure.captcha_ocr import DigitModel, default_model
+from src.infrastructure.config import CaptchaConfig, Settings
+from src.infrastructure.fssp_client import FsspClient
+from src.infrastructure.fssp_http_client import HttpFsspClient
+from src.infrastructure.job_store import SqliteJobStore
+from src.infrastructure.parser import FsspHtmlParser, LxmlHtmlParser
+from src.infrastructure.session import SessionPool
+from src.infrastructure.warm_pool import CaptchaPagePool
+
+
+logger = structlog.get_logger()
+
+def _build_browser_client(settings: Settings, captcha_solver: CaptchaSolver, fallback: bool) -> FsspClient:
+    browser = BrowserManager(settings.browser)
+    # Браузер как запасной путь HTTP-движка страницы не прогревает, решатель капчи закрывает HTTP-движок
+    warm_pool = CaptchaPagePool(browser, captcha_solver, settings) if not fallback and settings.warm_pool.enabled else None
+    sessions = SessionPool(browser, settings.session)
+    return FsspClient(
+        captcha_solver=captcha_solver, browser=browser, sessions=sessions, warm_pool=warm_pool, close_solver=not fallback
+    )
+
+
+def build_captcha_solver(settings: Settings) -> CaptchaSolver:
+    config = settings.captcha or CaptchaConfig(api_key=settings.RUCAPTCH_API_KEY)
+    solver: CaptchaSolver
+    if config.backend == "local":
+        fallback = None if config.local_fallback == "none" else _named_captcha_solver(config, config.local_fallback)
+        solver = FallbackCaptchaSolver(_local_captcha_solver(config), fallback, config.local_min_confidence)
+    elif config.backend == "race":
+        names = config.race_backends or ["rucaptcha", *(provider.name for provider in config.providers)]
+        solver = RacingCaptchaSolver([_named_captcha_solver(config, name) for name in names], config)
+    else:
+        solver = _named_captcha_solver(config, config.backend)
+    if settings.captcha_cache.enabled:
+        solver = CachingCaptchaSolver(solver, CaptchaAnswerCache(settings.captcha_cache))
+    return solver
+
+
+def _named_captcha_solver(config: CaptchaConfig, name: str) -> CaptchaSolver:
+    if name == "rucaptcha":
+        return RuCaptchaSolver(config.api_key, config, server=config.server, cost_per_solve=config.cost_per_solve)
+    if name == "simulator":
+        return SimulatorCaptchaSolver(config.simulator_url)
+    if name == "local":
+        return _local_captcha_solver(config)
+    for provider in config.providers:
+        if provider.name == name:
+            return RuCaptchaSolver(
+                provider.api_key, config, server=provider.server, name=provider.name, cost_per_solve=provider.cost_per_solve
+            )
+    raise ValueError(f"Неизвестный решатель капчи: {name!r}")
+
+
+def _local_captcha_solver(config: CaptchaConfig) -> LocalCaptchaSolver:
+    if config.local_model_path is None:
+        logger.warning(
+            "Локальное распознавание капчи использует поставляемую заготовку модели, обученную только на капчах "
+            "симулятора; для сайта ФССП обучите модель на размеченных снимках (ocr-train, CAPTCHA__LOCAL_MODEL_PATH)"
+        )
+    model = DigitModel.load(config.local_model_path) if config.local_model_path else default_model()
+    return LocalCaptchaSolver(model, length=config.code_length)
+
+
+def build_fssp_service(settings: Settings) -> FsspService:
+    captcha_solver = build_captcha_solver(settings)
+    client: FsspFetcher
+    if settings.FETCH_ENGINE == "http":
+        fallback = _build_browser_client(settings, captcha_solver, fallback=True) if settings.http_engine.fallback_to_browser else None
+        client = HttpFsspClient(
+            captcha_solver=captcha_solver,
+            config=settings.http_engine,
+            fallback=fallback,
+            health_url=settings.urls.form,
+        )
+        engine_slots = settings.http_engine.pool_size
+    else:
+        client = _build_browser_client(settings, captcha_solver, fallback=False)
+        engine_slots = settings.browser.pool_size
+    if settings.limiter.enabled:
+        client = LimitedFetcher(client, AdaptiveLimiter(settings.limiter, ceiling=engine_slots))
+    parser = LxmlHtmlParser() if settings.PARSER_ENGINE == "lxml" else FsspHtmlParser()
+    cache = ResultCache(settings.cache) if settings.cache.enabled else None
+    return FsspService(settings=settings, client=client, parser=parser, cache=cache)
+
+
+def build_job_runner(settings: Settings, service: FsspService) -> JobRunner:
+    return JobRunner(service=service, store=SqliteJobStore(settings.jobs.sqlite_path), config=settings.jobs)
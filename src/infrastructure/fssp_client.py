@@ -1,97 +1,150 @@
-from pathlib import Path
-from playwright.async_api import TimeoutError, async_playwright
+from collections.abc import AsyncIterator
+from contextlib import aclosing, asynccontextmanager
+import time
+
+from playwright.async_api import Page, TimeoutError
 import structlog
 
+from src.infrastructure.browser import BrowserManager
 from src.infrastructure.config import Settings
 from src.domain.errors import CaptchaError, FsspUnavailable
-from src.infrastructure.captcha import CaptchaSolver
+from src.infrastructure.captcha import CaptchaAnswer, CaptchaSolver
+from src.infrastructure.fssp_page import (
+    apply_query,
+    extract_results_html,
+    run_search,
+    save_debug_artifacts,
+    submit_with_captcha,
+)
+from src.infrastructure.pagination import fetch_remaining_pages
+from src.infrastructure.parser import CAPTCHA_LIMIT_MESSAGE
+from src.infrastructure.proxy_pool import CAPTCHA_LIMIT, SUCCESS, UNAVAILABLE
+from src.infrastructure.session import Session, SessionPool
+from src.infrastructure.warm_pool import CaptchaPagePool
 
 
 logger = structlog.get_logger()
 
 
 class FsspClient:
-    """Адаптер к веб-форме ФССП на Playwright."""
+    """Адаптер к веб-форме ФССП на Playwright.
+
+    `close_solver` — закрывать ли решатель капчи в `close`; False, если решатель
+    принадлежит другому клиенту (браузер как запасной путь HTTP-движка).
+    """
 
-    def __init__(self, captcha_solver: CaptchaSolver):
+    def __init__(
+        self,
+        captcha_solver: CaptchaSolver,
+        browser: BrowserManager,
+        sessions: SessionPool,
+        warm_pool: CaptchaPagePool | None = None,
+        close_solver: bool = True,
+    ):
         self._captcha_solver = captcha_solver
+        self._browser = browser
+        self._sessions = sessions
+        self._warm_pool = warm_pool
+        self._close_solver = close_solver
+
+    async def start(self) -> None:
+        await self._browser.start()
+        if self._warm_pool is not None:
+            await self._warm_pool.start()
+
+    async def close(self) -> None:
+        if self._warm_pool is not None:
+            await self._warm_pool.close()
+        await self._sessions.close()
+        await self._browser.close()
+        if self._close_solver:
+            await self._captcha_solver.close()
+
+    async def health_check(self) -> bool:
+        return await self._browser.health_check()
+
+    def stats(self) -> dict:
+        stats = {
+            "browser": self._browser.stats(),
+            "sessions": self._sessions.stats(),
+            "captcha": self._captcha_solver.stats(),
+        }
+        if self._warm_pool is not None:
+            stats["warm_pool"] = self._warm_pool.stats()
+        return stats
+
+    async def fetch_pages(self, url: str, settings: Settings) -> AsyncIterator[tuple[int, str]]:
+        """Отдает страницы результатов `(номер, html)`: первую, затем остальные по мере загрузки.
+
+        Остальные страницы загружаются параллельно в той же сессии, пока она удерживается.
+        """
+        session, warm_answer = await self._checkout()
+        reusable = False
+        started = time.monotonic()
+        searched_at: float | None = None
+        result = "error"
+        try:
+            async with self._translate_errors(session.page, settings):
+                if warm_answer is not None:
+                    logger.debug("Используем страницу с заранее решенной капчей")
+                    await apply_query(session.page, url)
+                    # Если сайт не примет код, капча перерешивается на этой же странице
+                    outcome = await submit_with_captcha(
+                        session.page, self._captcha_solver, settings.browser, answer=warm_answer
+                    )
+                else:
+                    outcome = await run_search(session.page, url, self._captcha_solver, settings.browser)
+            self._sessions.record_lookup(session, outcome.captchas)
+            # Сессию, упершуюся в лимит попыток капчи, не переиспользуем
+            reusable = CAPTCHA_LIMIT_MESSAGE not in outcome.html
+            result = SUCCESS if reusable else CAPTCHA_LIMIT
+            searched_at = time.monotonic()
+            yield 1, outcome.html
+
+            remaining = fetch_remaining_pages(
+                outcome.html,
+                outcome.url,
+                lambda page_url: self._get_page(session, page_url),
+                settings.pagination,
+            )
+            async with self._translate_errors(session.page, settings), aclosing(remaining) as pages:
+                async for number, page_html in pages:
+                    yield number, page_html
+        except FsspUnavailable:
+            result = UNAVAILABLE
+            reusable = False
+            raise
+        finally:
+            # Задержка прокси — время основного поиска, без догрузки страниц
+            self._browser.report(session.context, result, (searched_at or time.monotonic()) - started)
+            await self._sessions.release(session, reusable)
+
+    async def _checkout(self) -> tuple[Session, CaptchaAnswer | None]:
+        """Сессия для поиска и код капчи, уже вписанный в форму (для прогретой страницы), или None."""
+        if self._warm_pool is not None:
+            warm = self._warm_pool.take()
+            if warm is not None:
+                # После поиска прогретая страница продолжает жить как обычная сессия
+                return Session(context=warm.context, page=warm.page), warm.answer
+        return await self._sessions.acquire(), None
+
+    async def _get_page(self, session: Session, url: str) -> str:
+        # Запрос идет через контекст сессии, поэтому использует ее cookie (и решенную капчу)
+        response = await session.context.request.get(url)
+        if not response.ok:
+            raise FsspUnavailable(f"ФССП вернул ошибку {response.status} при загрузке страницы результатов")
+        return extract_results_html(await response.text())
 
-    async def fetch(self, url: str, settings: Settings) -> str:
-        browser_cfg = settings.browser
-        captcha_cfg = settings.captcha
-        temp_path: Path = settings.TEMP_PATH
-        captcha_file = temp_path / (captcha_cfg.temp_filename if captcha_cfg else "captcha.png")
-        browser = None
-        context = None
-        page = None
-
-        logger.debug("Открываем браузер для ФССП")
-        async with async_playwright() as playwright:
-            try:
-                browser = await playwright.chromium.launch(
-                    headless=browser_cfg.headless,
-                    args=["--disable-blink-features=AutomationControlled"],
-                )
-                context = await browser.new_context(user_agent=browser_cfg.user_agent)
-                page = await context.new_page()
-
-                logger.debug("Переходим на страницу ФССП", url=url)
-                response = await page.goto(
-                    url,
-                    timeout=browser_cfg.navigation_timeout_ms,
-                    wait_until="domcontentloaded",
-                )
-                if response is None or (response.status is not None and response.status >= 400):
-                    raise FsspUnavailable("Страница ФССП не открылась или вернула ошибку")
-               
-                await page.screenshot(path=temp_path / "fullpage1.png", full_page=True)
-
-                logger.debug("Ждем капчу")
-                img = await page.wait_for_selector(
-                    browser_cfg.captcha_selector,
-                    timeout=browser_cfg.navigation_timeout_ms,
-                )
-                if img is None:
-                    raise CaptchaError("Капча не появилась на странице")
-
-                logger.debug("Выключаем таймеры")
-                await page.evaluate("for (let i = 1; i < 99999; i++) clearInterval(i)") # это важный код. он выключает обновление капчи его убирать нельзя
-                logger.debug("Делаем скриншот капчи")
-                await img.screenshot(path=captcha_file)
-                logger.debug("Решаем капчу с помощью RuCaptcha")
-                captcha_code = await self._captcha_solver.solve(captcha_file)
-                logger.debug("Распознанный код капчи", captcha_code=captcha_code)
-                await page.locator("#captcha-popup-code").click()
-                await page.locator("#captcha-popup-code").fill(str(captcha_code))
-                await page.screenshot(path=temp_path / "fullpage2.png", full_page=True)
-                await page.get_by_role("button", name="Отправить").click()
-
-                logger.debug("Ждем результаты")
-                results_ip = await page.wait_for_selector(browser_cfg.results_selector, timeout=browser_cfg.results_wait_ms)
-                await page.screenshot(path=temp_path / "fullpage3.png", full_page=True)
-                html = await results_ip.inner_html()
-            except CaptchaError:
-                if page:
-                    await page.screenshot(path=temp_path / "fullpage_error.png", full_page=True)
-                raise
-            except FsspUnavailable:
-                if page:
-                    await page.screenshot(path=temp_path / "fullpage_error.png", full_page=True)
-                raise
-            except TimeoutError as exc:
-                if page:
-                    await page.screenshot(path=temp_path / "fullpage_error.png", full_page=True)
-                raise FsspUnavailable("Таймаут при работе с ФССП") from exc
-            except Exception as exc:  # noqa: BLE001
-                if page:
-                    await page.screenshot(path=temp_path / "fullpage_error.png", full_page=True)
-                raise FsspUnavailable("Не удалось получить результаты из ФССП") from exc
-            finally:
-                if page:
-                    await page.close()
-                if context:
-                    await context.close()
-                if browser:
-                    await browser.close()
-
-        return html
+    @asynccontextmanager
+    async def _translate_errors(self, page: Page, settings: Settings):
+        try:
+            yield
+        except (CaptchaError, FsspUnavailable) as exc:
+            await save_debug_artifacts(page, settings.browser, settings.TEMP_PATH, type(exc).__name__)
+            raise
+        except TimeoutError as exc:
+            await save_debug_artifacts(page, settings.browser, settings.TEMP_PATH, "timeout")
+            raise FsspUnavailable("Таймаут при работе с ФССП") from exc
+        except Exception as exc:  # noqa: BLE001
+            await save_debug_artifacts(page, settings.browser, settings.TEMP_PATH, type(exc).__name__)
+            raise FsspUnavailable("Не удалось получить результаты из ФССП") from exc
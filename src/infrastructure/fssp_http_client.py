@@ -0,0 +1,246 @@
+import asyncio
+import base64
+import time
+from collections.abc import AsyncIterator
+from contextlib import aclosing, suppress
+from urllib.parse import parse_qsl, urljoin, urlsplit
+
+import httpx
+from lxml import etree, html as lxml_html
+import structlog
+
+from src.domain.errors import CaptchaError, FsspUnavailable
+from src.infrastructure.captcha import CaptchaSolver
+from src.infrastructure.config import CAPTCHA_IMAGE_ID, HttpEngineConfig, Settings
+from src.infrastructure.fssp_client import FsspClient
+from src.infrastructure.fssp_page import captcha_result, extract_results_html, has_results, unwrap_json_payload
+from src.infrastructure.metrics import CAPTCHA_ATTEMPT_SECONDS, CAPTCHA_ATTEMPTS, stage
+from src.infrastructure.pagination import fetch_remaining_pages
+from src.infrastructure.parser import CAPTCHA_LIMIT_MESSAGE
+
+
+logger = structlog.get_logger()
+
+_CAPTCHA_SRC_XPATH = etree.XPath(f"//img[@id='{CAPTCHA_IMAGE_ID}']/@src")
+
+
+class _FallbackRequired(Exception):
+    """Сайт ответил не так, как ожидает HTTP-движок (JS-проверка, новая верстка и т.п.)."""
+
+
+class HttpFsspClient:
+    """Движок без браузера: поиск и капча напрямую через `ajax_search` сайта.
+
+    Повторяет то, что делает страница ФССП: GET `urls.ajax_search` с параметрами
+    формы; если в ответе капча — скачивает ее изображение, решает и повторяет
+    запрос с параметром `code`. Cookie сайта хранятся в пуле HTTP-сессий и
+    переиспользуются между запросами. Если сайт ответил неожиданно (не JSON,
+    JS-проверка, нет ни капчи, ни результатов), запрос передается браузерному
+    `FsspClient`. Решатель капчи принадлежит этому клиенту: запасной клиент его не закрывает.
+    Проверка здоровья запрашивает `health_url` (страницу формы поиска) через тот же транспорт.
+
+    Все сессии используют один транспорт httpx, поэтому соединения с сайтом
+    общие, а cookie у каждой сессии свои. Транспорт можно передать готовым
+    (например, `httpx.ASGITransport` симулятора в тестах).
+    """
+
+    def __init__(
+        self,
+        captcha_solver: CaptchaSolver,
+        config: HttpEngineConfig,
+        fallback: FsspClient | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+        health_url: str | None = None,
+    ):
+        self._captcha_solver = captcha_solver
+        self._config = config
+        self._fallback = fallback
+        self._health_url = health_url
+        self._transport = transport or httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(max_connections=config.max_connections, max_keepalive_connections=config.max_connections),
+        )
+        self._idle: list[httpx.AsyncClient] = []
+        self._slots = asyncio.Semaphore(config.pool_size)
+        self._direct = 0
+        self._fallbacks = 0
+        self._captchas = 0
+
+    async def start(self) -> None:
+        # Браузер для запасного пути запускается лениво, только если он понадобится
+        return None
+
+    async def close(self) -> None:
+        # Сессии не закрываем по отдельности: aclose закрыл бы общий транспорт
+        self._idle.clear()
+        with suppress(Exception):
+            await self._transport.aclose()
+        if self._fallback is not None:
+            await self._fallback.close()
+        await self._captcha_solver.close()
+
+    async def health_check(self) -> bool:
+        """Сайт отвечает на запрос `health_url`; без него — здоровье запасного клиента."""
+        if self._health_url is None:
+            return await self._fallback.health_check() if self._fallback is not None else True
+        # Браузер запасного пути запускается лениво и здесь не проверяется: поиски без него работают
+        session = httpx.AsyncClient(transport=self._transport, timeout=self._config.timeout_s, follow_redirects=True)
+        try:
+            response = await session.get(self._health_url)
+        except httpx.HTTPError as exc:
+            logger.warning("ФССП не ответил на проверку здоровья", error=str(exc))
+            return False
+        if response.status_code >= 500:
+            logger.warning("ФССП не прошел проверку здоровья", status=response.status_code)
+            return False
+        return True
+
+    def stats(self) -> dict:
+        stats = {
+            "engine": "http",
+            "direct_lookups": self._direct,
+            "fallback_lookups": self._fallbacks,
+            "captchas_solved": self._captchas,
+            "idle_sessions": len(self._idle),
+            "captcha": self._captcha_solver.stats(),
+        }
+        if self._fallback is not None:
+            stats["fallback"] = self._fallback.stats()
+        return stats
+
+    async def fetch_pages(self, url: str, settings: Settings) -> AsyncIterator[tuple[int, str]]:
+        """Отдает страницы результатов `(номер, html)`; остальные страницы грузятся в той же HTTP-сессии."""
+        try:
+            async with aclosing(self._fetch_direct(url, settings)) as pages:
+                async for item in pages:
+                    yield item
+            return
+        except _FallbackRequired as exc:
+            if self._fallback is None:
+                raise FsspUnavailable(f"Неожиданный ответ ФССП: {exc}") from exc
+            logger.warning("HTTP-движок не справился, используем браузер", reason=str(exc))
+            self._fallbacks += 1
+
+        async with aclosing(self._fallback.fetch_pages(url, settings)) as pages:
+            async for item in pages:
+                yield item
+
+    async def _fetch_direct(self, url: str, settings: Settings) -> AsyncIterator[tuple[int, str]]:
+        async with self._slots:
+            session = self._idle.pop() if self._idle else self._new_session(settings)
+            reusable = False
+            try:
+                html, source_url = await self._search(session, url, settings)
+                self._direct += 1
+                # Сессию, упершуюся в лимит попыток капчи, не переиспользуем
+                reusable = CAPTCHA_LIMIT_MESSAGE not in html
+                yield 1, html
+                remaining = fetch_remaining_pages(
+                    html,
+                    source_url,
+                    lambda page_url: self._get_page(session, page_url),
+                    settings.pagination,
+                )
+                # Если потребитель бросит итерацию, недогруженные страницы отменяются сразу, а не при сборке мусора
+                async with aclosing(remaining) as pages:
+                    async for number, page_html in pages:
+                        yield number, page_html
+            except httpx.TimeoutException as exc:
+                reusable = False
+                raise FsspUnavailable("Таймаут при работе с ФССП") from exc
+            except httpx.HTTPError as exc:
+                reusable = False
+                raise FsspUnavailable("Не удалось получить результаты из ФССП") from exc
+            except FsspUnavailable:
+                reusable = False
+                raise
+            finally:
+                if reusable and len(self._idle) < self._config.pool_size:
+                    self._idle.append(session)
+
+    async def _search(self, session: httpx.AsyncClient, url: str, settings: Settings) -> tuple[str, str]:
+        params = [
+            ("system", "ip"),
+            ("is[extended]", "1"),
+            ("nocache", "1"),
+            *parse_qsl(urlsplit(url).query, keep_blank_values=True),
+        ]
+        ajax_url = settings.urls.ajax_search
+        html, source_url = await self._get_fragment(session, ajax_url, params)
+
+        attempt = 0
+        while (captcha_src := self._captcha_src(html)) is not None:
+            if attempt == self._config.captcha_attempts:
+                CAPTCHA_ATTEMPTS.labels(engine="http", outcome="rejected").observe(attempt)
+                raise CaptchaError("ФССП не принял код капчи")
+            attempt += 1
+            started = time.perf_counter()
+            image = await self._load_captcha(session, urljoin(ajax_url, captcha_src))
+            answer = await self._captcha_solver.solve(image)
+            self._captchas += 1
+            html, source_url = await self._get_fragment(session, ajax_url, [*params, ("code", answer.code)])
+            result = captcha_result(html)
+            CAPTCHA_ATTEMPT_SECONDS.labels(engine="http", result=result).observe(time.perf_counter() - started)
+            if result != "accepted":
+                logger.warning("ФССП не принял код капчи", attempt=attempt)
+                await self._captcha_solver.report_incorrect(answer)
+            elif has_results(html):
+                await self._captcha_solver.report_correct(answer)
+        if attempt:
+            CAPTCHA_ATTEMPTS.labels(engine="http", outcome=captcha_result(html)).observe(attempt)
+
+        if not has_results(html):
+            raise _FallbackRequired("в ответе нет ни капчи, ни результатов")
+        return html, source_url
+
+    async def _get_fragment(
+        self,
+        session: httpx.AsyncClient,
+        url: str,
+        params: list[tuple[str, str]],
+    ) -> tuple[str, str]:
+        with stage("ajax_search"):
+            response = await session.get(url, params=params)
+        if response.status_code >= 500:
+            raise FsspUnavailable(f"ФССП вернул ошибку {response.status_code}")
+        if response.status_code >= 400:
+            raise _FallbackRequired(f"статус {response.status_code}")
+        fragment = unwrap_json_payload(response.text)
+        if fragment is None:
+            # Вместо JSON пришла HTML-страница — скорее всего, JS-проверка
+            raise _FallbackRequired("ответ не в формате JSON")
+        return fragment, str(response.url)
+
+    async def _get_page(self, session: httpx.AsyncClient, url: str) -> str:
+        response = await session.get(url)
+        if response.status_code >= 400:
+            raise FsspUnavailable(f"ФССП вернул ошибку {response.status_code} при загрузке страницы результатов")
+        return extract_results_html(response.text)
+
+    async def _load_captcha(self, session: httpx.AsyncClient, src: str) -> bytes:
+        if src.startswith("data:"):
+            _, _, encoded = src.partition(",")
+            return base64.b64decode(encoded)
+        with stage("captcha_download"):
+            response = await session.get(src)
+        response.raise_for_status()
+        return response.content
+
+    def _captcha_src(self, html: str) -> str | None:
+        if CAPTCHA_IMAGE_ID not in html:
+            return None
+        try:
+            sources = _CAPTCHA_SRC_XPATH(lxml_html.fromstring(html))
+        except (ValueError, etree.ParserError):
+            return None
+        return str(sources[0]) if sources else None
+
+    def _new_session(self, settings: Settings) -> httpx.AsyncClient:
+        headers = {"X-Requested-With": "XMLHttpRequest", "Referer": settings.urls.form}
+        if settings.browser.user_agent:
+            headers["User-Agent"] = settings.browser.user_agent
+        return httpx.AsyncClient(
+            transport=self._transport,
+            headers=headers,
+            timeout=self._config.timeout_s,
+            follow_redirects=True,
+        )
@@ -0,0 +1,284 @@
+"""Шаги работы со страницей поиска ФССП, общие для клиента и пула прогретых страниц."""
+import asyncio
+from dataclasses import dataclass
+import json
+from pathlib import Path
+import re
+import time
+from urllib.parse import parse_qsl, urlsplit
+import uuid
+
+from playwright.async_api import Page, Response, TimeoutError
+import structlog
+
+from src.domain.errors import CaptchaError, FsspUnavailable
+from src.infrastructure.captcha import CaptchaAnswer, CaptchaSolver
+from src.infrastructure.config import CAPTCHA_IMAGE_ID, BrowserConfig
+from src.infrastructure.metrics import CAPTCHA_ATTEMPT_SECONDS, CAPTCHA_ATTEMPTS, stage
+from src.infrastructure.parser import CAPTCHA_LIMIT_MESSAGE
+
+
+logger = structlog.get_logger()
+
+CAPTCHA_INPUT_SELECTOR = "#captcha-popup-code"
+# Признаки ответа с результатами: таблица производств или сообщение «ничего не найдено»
+RESULTS_MARKERS = ("results-frame", 'class="empty"')
+
+_JSONP_RE = re.compile(r"^[\w$.]+\((.*)\)\s*;?\s*$", re.DOTALL)
+
+# Капча заменена: на месте решенной другая картинка (или другой элемент), и она уже загрузилась
+_CAPTCHA_REPLACED_JS = """
+(selector) => {
+    const img = document.querySelector(selector);
+    return img !== null && img.dataset.fsspSolvedSrc !== img.src && img.complete && img.naturalWidth > 0;
+}
+"""
+
+# Заполняет поля формы поиска значениями из query string URL
+_APPLY_QUERY_JS = """
+(params) => {
+    for (const [name, value] of params) {
+        const fields = document.querySelectorAll(`[name="${CSS.escape(name)}"]`);
+        for (const field of fields) {
+            if (field.type === "radio" || field.type === "checkbox") {
+                field.checked = field.value === value;
+            } else {
+                field.value = value;
+            }
+            field.dispatchEvent(new Event("change", { bubbles: true }));
+        }
+    }
+}
+"""
+
+
+@dataclass
+class SearchOutcome:
+    """HTML результатов, URL, с которого он получен (база для ссылок пагинации), и число решенных капч."""
+
+    html: str
+    url: str
+    captchas: int
+
+
+async def open_search_page(page: Page, url: str, browser_cfg: BrowserConfig) -> None:
+    logger.debug("Переходим на страницу ФССП", url=url)
+    with stage("goto"):
+        response = await page.goto(
+            url,
+            timeout=browser_cfg.navigation_timeout_ms,
+            wait_until="domcontentloaded",
+        )
+    if response is None or (response.status is not None and response.status >= 400):
+        raise FsspUnavailable("Страница ФССП не открылась или вернула ошибку")
+
+
+async def solve_captcha(
+    page: Page,
+    solver: CaptchaSolver,
+    browser_cfg: BrowserConfig,
+    replaced: bool = False,
+) -> CaptchaAnswer:
+    """Дожидается капчи, решает ее и вписывает код в форму (без отправки).
+
+    `replaced` — капча на странице уже решалась, и сайт ее не принял: ждем, пока появится новая.
+    """
+    logger.debug("Ждем капчу")
+    with stage("captcha_wait"):
+        if replaced:
+            await page.wait_for_function(
+                _CAPTCHA_REPLACED_JS,
+                arg=browser_cfg.captcha_selector,
+                timeout=browser_cfg.navigation_timeout_ms,
+            )
+        img = await page.wait_for_selector(
+            browser_cfg.captcha_selector,
+            timeout=browser_cfg.navigation_timeout_ms,
+        )
+        if img is None:
+            raise CaptchaError("Капча не появилась на странице")
+
+        logger.debug("Выключаем таймеры")
+        await page.evaluate("for (let i = 1; i < 99999; i++) clearInterval(i)") # это важный код. он выключает обновление капчи его убирать нельзя
+        logger.debug("Делаем скриншот капчи")
+        image = await img.screenshot()
+        await img.evaluate("(img) => { img.dataset.fsspSolvedSrc = img.src; }")
+    logger.debug("Решаем капчу с помощью RuCaptcha")
+    answer = await solver.solve(image)
+    logger.debug("Распознанный код капчи", captcha_code=answer.code)
+    await page.locator(CAPTCHA_INPUT_SELECTOR).click()
+    await page.locator(CAPTCHA_INPUT_SELECTOR).fill(answer.code)
+    return answer
+
+
+def has_results(html: str) -> bool:
+    return any(marker in html for marker in RESULTS_MARKERS)
+
+
+def captcha_result(html: str) -> str:
+    """Ответ сайта на отправленный код: `accepted`, `rejected` (снова капча) или `limit` (лимит попыток)."""
+    if CAPTCHA_IMAGE_ID in html:
+        return "rejected"
+    if CAPTCHA_LIMIT_MESSAGE in html:
+        return "limit"
+    return "accepted"
+
+
+async def submit_with_captcha(
+    page: Page,
+    solver: CaptchaSolver,
+    browser_cfg: BrowserConfig,
+    answer: CaptchaAnswer | None = None,
+) -> SearchOutcome:
+    """Решает капчу, отправляет форму и, если сайт не принял код, повторяет на той же странице.
+
+    Не больше `captcha_attempts` попыток, без повторной навигации; неверный код
+    возвращается провайдеру. `answer` — код уже вписан в форму (прогретая страница).
+    """
+    for attempt in range(1, browser_cfg.captcha_attempts + 1):
+        started = time.perf_counter()
+        if answer is None:
+            answer = await solve_captcha(page, solver, browser_cfg, replaced=attempt > 1)
+        html, source_url = await submit_and_read(page, browser_cfg)
+        result = captcha_result(html)
+        CAPTCHA_ATTEMPT_SECONDS.labels(engine="browser", result=result).observe(time.perf_counter() - started)
+        if result != "rejected":
+            if result == "limit":
+                # Последний код тоже был неверным; ошибку лимита поднимет парсер
+                await solver.report_incorrect(answer)
+            elif has_results(html):
+                # Код запоминается, только если сайт показал результаты, а не ошибку или неожиданную страницу
+                await solver.report_correct(answer)
+            CAPTCHA_ATTEMPTS.labels(engine="browser", outcome=result).observe(attempt)
+            return SearchOutcome(html=html, url=source_url, captchas=attempt)
+        logger.warning("ФССП не принял код капчи", attempt=attempt)
+        await solver.report_incorrect(answer)
+        answer = None
+    CAPTCHA_ATTEMPTS.labels(engine="browser", outcome="rejected").observe(browser_cfg.captcha_attempts)
+    raise CaptchaError("ФССП не принял код капчи")
+
+
+async def run_search(page: Page, url: str, solver: CaptchaSolver, browser_cfg: BrowserConfig) -> SearchOutcome:
+    """Полный поиск на странице: переход по URL, капча (если сайт ее требует), результаты.
+
+    В переиспользуемой сессии сайт может отдать результаты без капчи — тогда
+    капча не решается и не оплачивается.
+    """
+    await open_search_page(page, url, browser_cfg)
+    with stage("captcha_wait"):
+        captcha_required = await _captcha_required(page, browser_cfg)
+    if captcha_required:
+        return await submit_with_captcha(page, solver, browser_cfg)
+    logger.debug("Капча не потребовалась, сессия переиспользована")
+    return SearchOutcome(html=await _read_results_dom(page, browser_cfg), url=page.url, captchas=0)
+
+
+async def _captcha_required(page: Page, browser_cfg: BrowserConfig) -> bool:
+    """Ждет, что появится раньше: капча или готовые результаты."""
+    captcha = asyncio.ensure_future(
+        page.wait_for_selector(browser_cfg.captcha_selector, timeout=browser_cfg.navigation_timeout_ms)
+    )
+    results = asyncio.ensure_future(
+        page.wait_for_selector(
+            browser_cfg.results_ready_selector,
+            state="attached",
+            timeout=browser_cfg.navigation_timeout_ms,
+        )
+    )
+    try:
+        done, _ = await asyncio.wait({captcha, results}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in (captcha, results):
+            task.cancel()
+        await asyncio.gather(captcha, results, return_exceptions=True)
+
+    winner = captcha if captcha in done else results
+    winner.result()  # пробрасываем таймаут, если ничего не появилось
+    return winner is captcha
+
+
+async def apply_query(page: Page, url: str) -> None:
+    """Переносит параметры поиска из URL в поля уже открытой формы."""
+    params = parse_qsl(urlsplit(url).query, keep_blank_values=True)
+    await page.evaluate(_APPLY_QUERY_JS, params)
+
+
+async def submit_and_read(page: Page, browser_cfg: BrowserConfig) -> tuple[str, str]:
+    """Отправляет форму и возвращает HTML результатов и URL, с которого он получен.
+
+    Основной путь — перехват сетевого ответа с результатами (`results_response_pattern`):
+    возвращаемся сразу, как только ответ пришел, без ожидания DOM и `inner_html`.
+    Если ответ не перехвачен, читаем `results_selector` из DOM как раньше.
+    """
+    with stage("submit"):
+        return await _submit_and_read(page, browser_cfg)
+
+
+async def _submit_and_read(page: Page, browser_cfg: BrowserConfig) -> tuple[str, str]:
+    submit = page.get_by_role("button", name="Отправить")
+    if not browser_cfg.capture_results_response:
+        await submit.click()
+        return await _read_results_dom(page, browser_cfg), page.url
+
+    pattern = re.compile(browser_cfg.results_response_pattern)
+
+    def is_results(response: Response) -> bool:
+        return response.request.resource_type in ("xhr", "fetch", "document") and bool(pattern.search(response.url))
+
+    try:
+        async with page.expect_response(is_results, timeout=browser_cfg.navigation_timeout_ms) as response_info:
+            await submit.click()
+        response = await response_info.value
+    except TimeoutError:
+        logger.warning("Ответ с результатами не перехвачен, читаем DOM")
+        return await _read_results_dom(page, browser_cfg), page.url
+
+    if response.status >= 400:
+        raise FsspUnavailable(f"ФССП вернул ошибку {response.status} на запрос результатов")
+    logger.debug("Получен ответ с результатами", url=response.url, status=response.status)
+    return extract_results_html(await response.text()), response.url
+
+
+def extract_results_html(body: str) -> str:
+    """Достает HTML результатов из тела ответа: JSON/JSONP вида `{"data": "<html>"}` или сам HTML."""
+    data = unwrap_json_payload(body)
+    return body if data is None else data
+
+
+def unwrap_json_payload(body: str) -> str | None:
+    """Поле `data` из JSON/JSONP-ответа сайта или None, если ответ в другом формате."""
+    text = body.strip()
+    match = _JSONP_RE.match(text)
+    if match:
+        text = match.group(1).strip()
+    if not text.startswith("{"):
+        return None
+    try:
+        payload = json.loads(text)
+    except ValueError:
+        return None
+    if isinstance(payload, dict) and isinstance(payload.get("data"), str):
+        return payload["data"]
+    return None
+
+
+async def _read_results_dom(page: Page, browser_cfg: BrowserConfig) -> str:
+    logger.debug("Ждем результаты")
+    with stage("results_wait"):
+        results_ip = await page.wait_for_selector(browser_cfg.results_selector, timeout=browser_cfg.results_wait_ms)
+        return await results_ip.inner_html()
+
+
+async def save_debug_artifacts(page: Page | None, browser_cfg: BrowserConfig, temp_path: Path, reason: str) -> None:
+    """Сохраняет скриншот страницы при ошибке, если включен режим отладочных артефактов.
+
+    Имя файла уникально для каждого запроса, поэтому параллельные запросы не затирают друг друга.
+    """
+    if page is None or not browser_cfg.debug_artifacts:
+        return
+    path = temp_path / f"error_{time.strftime('%Y%m%d-%H%M%S')}_{uuid.uuid4().hex[:8]}.png"
+    try:
+        await page.screenshot(path=path, full_page=True)
+        logger.info("Сохранен скриншот ошибки", path=str(path), reason=reason)
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Не удалось сохранить скриншот ошибки", error=str(exc))
@@ -1,32 +1,113 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic_core import to_json
 
+from src.application.batch import run_batch
 from src.application.fssp_service import FsspService
-from src.domain import Inn, IpNumber, Person
+from src.domain import DebtorCaseList, Inn, IpNumber, Person
+from src.infrastructure.config import Settings
 
-from .dependencies import get_fssp_service
-from .schemas import DebItemList, HealthcheckResponse
+from .dependencies import get_fresh, get_fssp_service, get_settings
+from .errors import describe_error
+from .schemas import BatchRequest, BatchResultLine, DebItemList, HealthcheckResponse
 
 router = APIRouter()
 
 
-@router.get("/healthcheck", description="Проверяет работоспособность сервиса", response_model=HealthcheckResponse)
-def healthcheck():
+def _cases_response(cases: DebtorCaseList) -> Response:
+    """JSON списка производств без повторной валидации через `DebItemList`.
+
+    Строки уже проверены при разборе страницы (или взяты из кэша проверенных строк),
+    а `response_model` у маршрутов остается для схемы OpenAPI. Если поиск уперся
+    в лимит страниц, ответ помечается заголовком `X-Results-Truncated: true`.
+    """
+    headers = {"X-Results-Truncated": "true"} if cases.truncated else None
+    return Response(content=to_json(cases.items), media_type="application/json", headers=headers)
+
+
+@router.get(
+    "/healthcheck",
+    description="Проверяет работоспособность сервиса и движка поиска (браузер перезапускается, если упал)",
+    response_model=HealthcheckResponse,
+    responses={503: {"model": HealthcheckResponse}},
+)
+async def healthcheck(service: FsspService = Depends(get_fssp_service)):
+    if not await service.health_check():
+        return JSONResponse(status_code=503, content={"status": "unavailable"})
     return {"status": "ok"}
 
 
+@router.get("/stats", description="Возвращает внутреннюю статистику сервиса (пулы, счетчики)")
+async def get_stats(request: Request, service: FsspService = Depends(get_fssp_service)):
+    stats = service.stats()
+    runner = getattr(request.app.state, "job_runner", None)
+    if runner is not None:
+        stats["jobs"] = await runner.stats()
+    return stats
+
+
 @router.post("/ip", description="Получает данные по номеру ИП из ФССП", response_model=DebItemList)
-async def get_fssp_data_by_ip(ip_number: IpNumber, service: FsspService = Depends(get_fssp_service)):
-    cases = await service.by_ip(ip_number)
-    return DebItemList(root=[case.model_dump() for case in cases.items])
+async def get_fssp_data_by_ip(
+    ip_number: IpNumber,
+    service: FsspService = Depends(get_fssp_service),
+    fresh: bool = Depends(get_fresh),
+):
+    cases = await service.by_ip(ip_number, fresh=fresh)
+    return _cases_response(cases)
 
 
 @router.post("/person", description="Получает данные по человеку из ФССП", response_model=DebItemList)
-async def get_fssp_data_by_person(person: Person, service: FsspService = Depends(get_fssp_service)):
-    cases = await service.by_person(person)
-    return DebItemList(root=[case.model_dump() for case in cases.items])
+async def get_fssp_data_by_person(
+    person: Person,
+    service: FsspService = Depends(get_fssp_service),
+    fresh: bool = Depends(get_fresh),
+):
+    cases = await service.by_person(person, fresh=fresh)
+    return _cases_response(cases)
 
 
 @router.post("/inn", description="Получает данные по ИНН (юридического лица) из ФССП", response_model=DebItemList)
-async def get_fssp_data_by_inn(inn: Inn, service: FsspService = Depends(get_fssp_service)):
-    cases = await service.by_inn(inn)
-    return DebItemList(root=[case.model_dump() for case in cases.items])
+async def get_fssp_data_by_inn(
+    inn: Inn,
+    service: FsspService = Depends(get_fssp_service),
+    fresh: bool = Depends(get_fresh),
+):
+    cases = await service.by_inn(inn, fresh=fresh)
+    return _cases_response(cases)
+
+
+@router.post(
+    "/batch",
+    description=(
+        "Пакетный поиск: принимает список запросов разных видов и отдает результаты "
+        "в формате NDJSON (одна строка `BatchResultLine` на запрос) по мере готовности"
+    ),
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+)
+async def batch_search(
+    batch: BatchRequest,
+    service: FsspService = Depends(get_fssp_service),
+    settings: Settings = Depends(get_settings),
+    fresh: bool = Depends(get_fresh),
+):
+    if len(batch.queries) > settings.batch.max_queries:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Слишком большой пакет: максимум {settings.batch.max_queries} запросов",
+        )
+    concurrency = min(batch.concurrency or settings.batch.concurrency, settings.batch.concurrency)
+
+    async def lines():
+        async for outcome in run_batch(service, batch.queries, concurrency=concurrency, fresh=fresh):
+            if outcome.error is None:
+                # Та же форма, что у `BatchResultLine`, без повторной валидации строк
+                result = outcome.result
+                line = {"index": outcome.index, "status": 200, "items": result.items, "truncated": result.truncated, "error": None}
+                yield to_json(line) + b"\n"
+                continue
+            status_code, content = describe_error(outcome.error)
+            line = BatchResultLine(index=outcome.index, status=status_code, error=content)
+            yield line.model_dump_json().encode() + b"\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
@@ -1,28 +1,61 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from src.infrastructure.config import Settings
+from src.infrastructure.factory import build_fssp_service, build_job_runner
 from src.domain.errors import DomainError, CaptchaLimitExceeded
+from src.infrastructure.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, render_metrics
 
 from .api import router as api_router
+from .errors import describe_error
+from .jobs import router as jobs_router
 from .middleware import add_request_context
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    service = build_fssp_service(app.settings)
+    app.state.fssp_service = service
+    await service.start()
+    runner = None
+    if app.settings.jobs.enabled:
+        runner = build_job_runner(app.settings, service)
+        app.state.job_runner = runner
+        await runner.start()
+    try:
+        yield
+    finally:
+        if runner is not None:
+            await runner.close()
+        await service.close()
+
+
 def create_app(settings: Settings):
-    app = FastAPI(title=settings.PROJECT_NAME, debug=settings.DEBUG)
+    app = FastAPI(title=settings.PROJECT_NAME, debug=settings.DEBUG, lifespan=lifespan)
     app.middleware("http")(add_request_context)
     app.include_router(api_router, prefix="/api")
+    app.include_router(jobs_router, prefix="/api/jobs")
     app.settings = settings
 
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics(request: Request):  # noqa: WPS430
+        service = getattr(request.app.state, "fssp_service", None)
+        stats = service.stats() if service is not None else {}
+        runner = getattr(request.app.state, "job_runner", None)
+        if runner is not None:
+            stats["jobs"] = await runner.stats()
+        return PlainTextResponse(render_metrics(stats), media_type=METRICS_CONTENT_TYPE)
+
     @app.exception_handler(CaptchaLimitExceeded)
     async def captcha_limit_handler(request: Request, exc: CaptchaLimitExceeded):  # noqa: WPS430
-        return JSONResponse(
-            status_code=429,
-            content={"detail": str(exc), "error_code": "CAPTCHA_LIMIT_EXCEEDED"}
-        )
+        status_code, content = describe_error(exc)
+        return JSONResponse(status_code=status_code, content=content)
 
     @app.exception_handler(DomainError)
     async def domain_error_handler(request: Request, exc: DomainError):  # noqa: WPS430
-        return JSONResponse(status_code=502, content={"detail": str(exc)})
+        status_code, content = describe_error(exc)
+        return JSONResponse(status_code=status_code, content=content)
 
     return app
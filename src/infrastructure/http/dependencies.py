@@ -1,28 +1,36 @@
-from fastapi import Request
+from fastapi import HTTPException, Query, Request
 
 from src.application.fssp_service import FsspService
+from src.application.jobs import JobRunner
 from src.infrastructure.config import Settings
-from src.infrastructure.captcha import CaptchaSolver
-from src.infrastructure.fssp_client import FsspClient
-from src.infrastructure.parser import FsspHtmlParser
+from src.infrastructure.factory import build_fssp_service
 
 
 def get_settings(request: Request) -> Settings:
     return request.app.settings
 
 
-def _build_fssp_service(settings: Settings) -> FsspService:
-    captcha_solver = CaptchaSolver(api_key=settings.captcha.api_key if settings.captcha else settings.RUCAPTCH_API_KEY)
-    client = FsspClient(captcha_solver=captcha_solver)
-    parser = FsspHtmlParser()
-    return FsspService(settings=settings, client=client, parser=parser)
-
-
 def get_fssp_service(request: Request) -> FsspService:
     service = getattr(request.app.state, "fssp_service", None)
     if service:
         return service
     settings = get_settings(request)
-    service = _build_fssp_service(settings)
+    service = build_fssp_service(settings)
     request.app.state.fssp_service = service
     return service
+
+
+def get_fresh(
+    request: Request,
+    fresh: bool = Query(False, description="Игнорировать кэш и запросить данные из ФССП заново"),
+) -> bool:
+    """Обход кэша: `?fresh=true` или заголовок `Cache-Control: no-cache`."""
+    cache_control = request.headers.get("cache-control", "").lower()
+    return fresh or "no-cache" in cache_control or "no-store" in cache_control
+
+
+def get_job_runner(request: Request) -> JobRunner:
+    runner = getattr(request.app.state, "job_runner", None)
+    if runner is None:
+        raise HTTPException(status_code=503, detail="Асинхронные задания отключены")
+    return runner
@@ -0,0 +1,12 @@
+from src.domain.errors import CaptchaLimitExceeded, DomainError, Overloaded
+
+
+def describe_error(exc: Exception) -> tuple[int, dict]:
+    """HTTP-статус и тело ответа для ошибки поиска."""
+    if isinstance(exc, CaptchaLimitExceeded):
+        return 429, {"detail": str(exc), "error_code": "CAPTCHA_LIMIT_EXCEEDED", "error_type": type(exc).__name__}
+    if isinstance(exc, Overloaded):
+        return 503, {"detail": str(exc), "error_code": "OVERLOADED", "error_type": type(exc).__name__}
+    if isinstance(exc, DomainError):
+        return 502, {"detail": str(exc), "error_type": type(exc).__name__}
+    return 500, {"detail": "Внутренняя ошибка сервиса", "error_type": type(exc).__name__}
@@ -0,0 +1,53 @@
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from src.application.jobs import JobRunner
+from src.infrastructure.job_store import JobRecord
+
+from .dependencies import get_job_runner
+from .schemas import BatchQuery, JobResponse, JobSubmitted
+
+router = APIRouter()
+
+
+def _dt(timestamp: float | None) -> datetime | None:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc) if timestamp is not None else None
+
+
+def _to_response(job: JobRecord) -> JobResponse:
+    return JobResponse(
+        id=job.id,
+        status=job.status,
+        query={"type": job.query_type, **job.query},
+        attempts=job.attempts,
+        created_at=_dt(job.created_at),
+        started_at=_dt(job.started_at),
+        finished_at=_dt(job.finished_at),
+        timings=job.timings,
+        result=job.result,
+        error={"detail": job.error, "error_type": job.error_type} if job.error else None,
+    )
+
+
+@router.post(
+    "",
+    status_code=202,
+    description="Ставит поиск в очередь и сразу возвращает идентификатор задания",
+    response_model=JobSubmitted,
+)
+async def submit_job(query: BatchQuery, runner: JobRunner = Depends(get_job_runner)):
+    job = await runner.submit(query)
+    return JobSubmitted(id=job.id, status=job.status)
+
+
+@router.get(
+    "/{job_id}",
+    description="Возвращает статус задания, тайминги этапов и результат (когда готов)",
+    response_model=JobResponse,
+)
+async def get_job(job_id: str, runner: JobRunner = Depends(get_job_runner)):
+    job = await runner.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Задание не найдено")
+    return _to_response(job)
@@ -3,10 +3,24 @@ import time
 import structlog
 from fastapi import Request
 
+from src.infrastructure.metrics import (
+    HTTP_INFLIGHT,
+    HTTP_REQUEST_SECONDS,
+    HTTP_REQUESTS_TOTAL,
+    collect_request_timings,
+    server_timing_header,
+)
+
 
 logger = structlog.get_logger()
 
 
+def _route_path(request: Request) -> str:
+    # Шаблон маршрута, а не фактический путь: иначе у метрик неограниченное число меток
+    route = request.scope.get("route")
+    return getattr(route, "path", "unmatched")
+
+
 async def add_request_context(request: Request, call_next):
     structlog.contextvars.bind_contextvars(
         request_id=request.headers.get("x-request-id", "unknown"),
@@ -14,20 +28,24 @@ async def add_request_context(request: Request, call_next):
         method=request.method,
     )
     started_at = time.monotonic()
+    status_code = 500
+    HTTP_INFLIGHT.inc()
     try:
         logger.info("Запрос отправлен на обработку")
-        response = await call_next(request)
-        duration_ms = round((time.monotonic() - started_at) * 1000, 2)
-        logger.info("Запрос обработан", duration_ms=duration_ms, status_code=response.status_code)
+        with collect_request_timings() as timings:
+            response = await call_next(request)
+        elapsed = time.monotonic() - started_at
+        status_code = response.status_code
+        response.headers["Server-Timing"] = server_timing_header(timings, elapsed)
+        logger.info("Запрос обработан", duration_ms=round(elapsed * 1000, 2), status_code=status_code)
         return response
     except Exception as exc:  # noqa: BLE001
         duration_ms = round((time.monotonic() - started_at) * 1000, 2)
         logger.error("Ошибка обработки запроса", duration_ms=duration_ms, error=str(exc))
         raise
     finally:
+        HTTP_INFLIGHT.dec()
+        route = _route_path(request)
+        HTTP_REQUESTS_TOTAL.labels(method=request.method, route=route, status=str(status_code)).inc()
+        HTTP_REQUEST_SECONDS.labels(method=request.method, route=route).observe(time.monotonic() - started_at)
         structlog.contextvars.clear_contextvars()
-
-
-
-
-
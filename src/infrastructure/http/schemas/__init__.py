@@ -1,5 +1,10 @@
 """HTTP-специфичные схемы для API."""
-from pydantic import BaseModel, RootModel
+from datetime import datetime
+from typing import Annotated, Literal
+
+from pydantic import BaseModel, Field, RootModel
+
+from src.domain import Inn, IpNumber, Person
 
 
 class DebItem(BaseModel):
@@ -25,9 +30,75 @@ class ErrorResponse(BaseModel):
     """Общий формат ошибки API."""
 
     detail: str
+    error_code: str | None = None
+    error_type: str | None = None
+
+
+class IpBatchQuery(IpNumber):
+    """Запрос пакета: поиск по номеру ИП."""
+
+    type: Literal["ip"]
+
+
+class PersonBatchQuery(Person):
+    """Запрос пакета: поиск по ФИО и дате рождения."""
+
+    type: Literal["person"]
+
+
+class InnBatchQuery(Inn):
+    """Запрос пакета: поиск по ИНН."""
+
+    type: Literal["inn"]
+
+
+BatchQuery = Annotated[IpBatchQuery | PersonBatchQuery | InnBatchQuery, Field(discriminator="type")]
+
+
+class BatchRequest(BaseModel):
+    """Пакет запросов разных видов."""
+
+    queries: list[BatchQuery] = Field(min_length=1)
+    concurrency: int | None = Field(
+        default=None,
+        ge=1,
+        description="Желаемый параллелизм (не больше настроенного на сервере)",
+    )
+
+
+class BatchResultLine(BaseModel):
+    """Одна строка NDJSON-ответа пакетного поиска."""
+
+    index: int = Field(description="Порядковый номер запроса в пакете")
+    status: int = Field(description="HTTP-статус, соответствующий результату запроса")
+    items: list[DebItem] | None = None
+    truncated: bool = Field(default=False, description="Результаты обрезаны лимитом страниц, в `items` есть не все производства")
+    error: ErrorResponse | None = None
 
 
 class HealthcheckResponse(BaseModel):
     """Ответ на запрос healthcheck"""
 
     status: str
+
+
+class JobSubmitted(BaseModel):
+    """Ответ на постановку задания в очередь."""
+
+    id: str
+    status: str
+
+
+class JobResponse(BaseModel):
+    """Состояние асинхронного задания."""
+
+    id: str
+    status: str = Field(description="queued, running, succeeded или failed")
+    query: dict
+    attempts: int
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    timings: dict = Field(description="Ожидание в очереди, длительность и этапы каждой попытки и общее время, мс")
+    result: list[DebItem] | None = None
+    error: ErrorResponse | None = None
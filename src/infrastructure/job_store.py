@@ -0,0 +1,180 @@
+import asyncio
+from dataclasses import dataclass, field
+import json
+from pathlib import Path
+import sqlite3
+import time
+import uuid
+
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+@dataclass
+class JobRecord:
+    """Задание на поиск и его текущее состояние."""
+
+    id: str
+    status: str
+    query_type: str
+    query: dict
+    attempts: int = 0
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    next_run_at: float = 0
+    timings: dict = field(default_factory=dict)
+    result: list[dict] | None = None
+    error: str | None = None
+    error_type: str | None = None
+
+
+_COLUMNS = (
+    "id, status, query_type, query, attempts, created_at, started_at, finished_at, "
+    "next_run_at, timings, result, error, error_type"
+)
+
+
+class SqliteJobStore:
+    """Персистентная очередь заданий в SQLite.
+
+    Задания, которые выполнялись в момент остановки процесса, при открытии
+    хранилища возвращаются в очередь.
+    """
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._lock = asyncio.Lock()
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                query_type TEXT NOT NULL,
+                query TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                next_run_at REAL NOT NULL DEFAULT 0,
+                timings TEXT NOT NULL DEFAULT '{}',
+                result TEXT,
+                error TEXT,
+                error_type TEXT
+            )
+            """
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, next_run_at, created_at)")
+        recovered = self._db.execute(
+            "UPDATE jobs SET status = ? WHERE status = ?", (QUEUED, RUNNING)
+        ).rowcount
+        self._db.commit()
+        self.recovered = recovered
+
+    async def create(self, query_type: str, query: dict) -> JobRecord:
+        job = JobRecord(id=uuid.uuid4().hex, status=QUEUED, query_type=query_type, query=query)
+        await self._call(self._insert, job)
+        return job
+
+    async def get(self, job_id: str) -> JobRecord | None:
+        return await self._call(self._get, job_id)
+
+    async def claim_next(self) -> JobRecord | None:
+        """Атомарно забирает самое старое готовое к запуску задание и помечает его выполняющимся."""
+        return await self._call(self._claim_next, time.time())
+
+    async def save(self, job: JobRecord) -> None:
+        await self._call(self._update, job)
+
+    async def counts(self) -> dict[str, int]:
+        return await self._call(self._counts)
+
+    async def close(self) -> None:
+        async with self._lock:
+            self._db.close()
+
+    async def _call(self, func, *args):
+        async with self._lock:
+            return await asyncio.to_thread(func, *args)
+
+    def _insert(self, job: JobRecord) -> None:
+        self._db.execute(
+            f"INSERT INTO jobs ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            self._to_row(job),
+        )
+        self._db.commit()
+
+    def _update(self, job: JobRecord) -> None:
+        row = self._to_row(job)
+        self._db.execute(
+            "UPDATE jobs SET status = ?, query_type = ?, query = ?, attempts = ?, created_at = ?, "
+            "started_at = ?, finished_at = ?, next_run_at = ?, timings = ?, result = ?, error = ?, "
+            "error_type = ? WHERE id = ?",
+            (*row[1:], row[0]),
+        )
+        self._db.commit()
+
+    def _get(self, job_id: str) -> JobRecord | None:
+        row = self._db.execute(f"SELECT {_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._from_row(row) if row else None
+
+    def _claim_next(self, now: float) -> JobRecord | None:
+        row = self._db.execute(
+            f"""
+            UPDATE jobs SET status = ?, attempts = attempts + 1
+            WHERE id = (
+                SELECT id FROM jobs WHERE status = ? AND next_run_at <= ?
+                ORDER BY created_at LIMIT 1
+            )
+            RETURNING {_COLUMNS}
+            """,
+            (RUNNING, QUEUED, now),
+        ).fetchone()
+        self._db.commit()
+        return self._from_row(row) if row else None
+
+    def _counts(self) -> dict[str, int]:
+        rows = self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    @staticmethod
+    def _to_row(job: JobRecord) -> tuple:
+        return (
+            job.id,
+            job.status,
+            job.query_type,
+            json.dumps(job.query, ensure_ascii=False),
+            job.attempts,
+            job.created_at,
+            job.started_at,
+            job.finished_at,
+            job.next_run_at,
+            json.dumps(job.timings),
+            json.dumps(job.result, ensure_ascii=False) if job.result is not None else None,
+            job.error,
+            job.error_type,
+        )
+
+    @staticmethod
+    def _from_row(row: sqlite3.Row) -> JobRecord:
+        return JobRecord(
+            id=row["id"],
+            status=row["status"],
+            query_type=row["query_type"],
+            query=json.loads(row["query"]),
+            attempts=row["attempts"],
+            created_at=row["created_at"],
+            started_at=row["started_at"],
+            finished_at=row["finished_at"],
+            next_run_at=row["next_run_at"],
+            timings=json.loads(row["timings"]),
+            result=json.loads(row["result"]) if row["result"] is not None else None,
+            error=row["error"],
+            error_type=row["error_type"],
+        )
@@ -48,3 +48,5 @@ def setup_logging(
         handlers=handlers,
     )
 
+    # httpx пишет каждый запрос на INFO — для HTTP-движка и симулятора это шум
+    logging.getLogger("httpx").setLevel(max(level, logging.WARNING))
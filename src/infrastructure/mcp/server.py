@@ -1,23 +1,36 @@
 """MCP Server для поиска исполнительных производств в ФССП."""
 from mcp.server.fastmcp import FastMCP
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
 
 from src.application.fssp_service import FsspService
 from src.domain import Inn, IpNumber, Person
 from src.domain.errors import  DomainError
+from src.infrastructure.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, render_metrics
 
 
 def create_mcp_server(service: FsspService) -> FastMCP:
-    """Создает и настраивает MCP server с инструментами для поиска в ФССП."""
+    """Создает и настраивает MCP server с инструментами для поиска в ФССП.
+
+    Запуском и остановкой `service` управляет вызывающий: lifespan FastMCP выполняется
+    на каждую MCP-сессию, а браузер и кэши общие для всего процесса.
+    """
     mcp = FastMCP("FSSP Search Server")
 
+    @mcp.custom_route("/metrics", methods=["GET"])
+    async def metrics(request: Request) -> PlainTextResponse:
+        """Метрики Prometheus (доступны в HTTP-режиме)."""
+        return PlainTextResponse(render_metrics(service.stats()), media_type=METRICS_CONTENT_TYPE)
+
     @mcp.tool()
-    async def search_by_ip(ip_number: str) -> dict:
+    async def search_by_ip(ip_number: str, fresh: bool = False) -> dict:
         """
         Поиск исполнительных производств по номеру ИП/СД/СВ.
 
         Args:
             ip_number: Номер исполнительного производства в формате 1234567/12/34/56
                        или 1234567/12/34/56-ИП
+            fresh: Игнорировать кэш и запросить данные из ФССП заново
 
         Returns:
             Словарь с результатами поиска, содержащий список исполнительных производств.
@@ -26,10 +39,11 @@ def create_mcp_server(service: FsspService) -> FastMCP:
         """
         try:
             ip = IpNumber(ip=ip_number)
-            result = await service.by_ip(ip)
+            result = await service.by_ip(ip, fresh=fresh)
             return {
                 "success": True,
                 "count": len(result.items),
+                "truncated": result.truncated,
                 "items": [item.model_dump() for item in result.items],
             }
         except DomainError as e:
@@ -45,6 +59,7 @@ def create_mcp_server(service: FsspService) -> FastMCP:
         first_name: str,
         birthday: str,
         patronymic: str | None = None,
+        fresh: bool = False,
     ) -> dict:
         """
         Поиск исполнительных производств по ФИО и дате рождения.
@@ -54,6 +69,7 @@ def create_mcp_server(service: FsspService) -> FastMCP:
             first_name: Имя
             birthday: Дата рождения в формате DD.MM.YYYY (например, 16.05.1992)
             patronymic: Отчество (опционально)
+            fresh: Игнорировать кэш и запросить данные из ФССП заново
 
         Returns:
             Словарь с результатами поиска, содержащий список исполнительных производств.
@@ -67,10 +83,11 @@ def create_mcp_server(service: FsspService) -> FastMCP:
                 patronymic=patronymic,
                 birthday=birthday,
             )
-            result = await service.by_person(person)
+            result = await service.by_person(person, fresh=fresh)
             return {
                 "success": True,
                 "count": len(result.items),
+                "truncated": result.truncated,
                 "items": [item.model_dump() for item in result.items],
             }
         except DomainError as e:
@@ -81,12 +98,13 @@ def create_mcp_server(service: FsspService) -> FastMCP:
             }
 
     @mcp.tool()
-    async def search_by_inn(inn: str) -> dict:
+    async def search_by_inn(inn: str, fresh: bool = False) -> dict:
         """
         Поиск исполнительных производств по ИНН юридического лица.
 
         Args:
             inn: ИНН (10 цифр для юридических лиц или 12 цифр для физических лиц)
+            fresh: Игнорировать кэш и запросить данные из ФССП заново
 
         Returns:
             Словарь с результатами поиска, содержащий список исполнительных производств.
@@ -95,10 +113,11 @@ def create_mcp_server(service: FsspService) -> FastMCP:
         """
         try:
             inn_obj = Inn(inn=inn)
-            result = await service.by_inn(inn_obj)
+            result = await service.by_inn(inn_obj, fresh=fresh)
             return {
                 "success": True,
                 "count": len(result.items),
+                "truncated": result.truncated,
                 "items": [item.model_dump() for item in result.items],
             }
         except DomainError as e:
@@ -0,0 +1,235 @@
+"""Метрики Prometheus (`prometheus_client`) и тайминги этапов запроса.
+
+Реестр процесса общий для HTTP API, MCP и CLI. Этапы поиска (`stage`) пишутся в
+гистограмму `fssp_stage_duration_seconds` и, если запрос пришел через HTTP API,
+в список таймингов текущего запроса — из него собирается заголовок `Server-Timing`.
+"""
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+import re
+import time
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, disable_created_metrics, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.exposition import CONTENT_TYPE_PLAIN_0_0_4
+from prometheus_client.registry import Collector
+
+
+CONTENT_TYPE = CONTENT_TYPE_PLAIN_0_0_4
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+_request_timings: ContextVar[list[tuple[str, float]] | None] = ContextVar("request_timings", default=None)
+_NAME_RE = re.compile(r"[^a-zA-Z0-9_]")
+
+# Серии `*_created` в `/metrics` не нужны: время старта процесса видно и так
+disable_created_metrics()
+
+# Собственный реестр, а не глобальный `prometheus_client.REGISTRY`: без метрик процесса и платформы
+REGISTRY = CollectorRegistry()
+
+
+class _StatsCollector(Collector):
+    """Числовые поля `stats()` сервиса как gauge.
+
+    Вложенные словари дают имя метрики, элементы списков (например, прокси пула)
+    — метки: строковые поля элемента, а если их нет — номер элемента `index`.
+    """
+
+    def __init__(self, stats: dict, prefix: str):
+        self._stats = stats
+        self._prefix = prefix
+
+    def collect(self) -> Iterable[GaugeMetricFamily]:
+        # Имя метрики -> (семейство, имена меток); у элементов одного списка одинаковый набор меток
+        families: dict[str, tuple[GaugeMetricFamily, list[str]]] = {}
+        for name, field, labels, value in _flatten(self._stats, self._prefix, "", {}):
+            if name not in families:
+                help_text = f"Поле {field} статистики сервиса (GET /api/stats)"
+                families[name] = (GaugeMetricFamily(name, help_text, labels=list(labels)), list(labels))
+            family, labelnames = families[name]
+            family.add_metric([labels.get(label, "") for label in labelnames], value)
+        return [family for family, _ in families.values()]
+
+
+def render_metrics(stats: dict | None = None, stats_prefix: str = "fssp_stats") -> bytes:
+    """Текст для `/metrics`: метрики процесса и, если переданы, поля `stats` (состояние пулов и кэша)."""
+    output = generate_latest(REGISTRY)
+    if stats:
+        registry = CollectorRegistry()
+        registry.register(_StatsCollector(stats, stats_prefix))
+        output += generate_latest(registry)
+    return output
+
+
+def _flatten(stats: dict, prefix: str, path: str, labels: dict[str, str]) -> Iterator[tuple[str, str, dict[str, str], float]]:
+    for key, value in stats.items():
+        name = f"{prefix}_{_NAME_RE.sub('_', str(key))}"
+        field = f"{path}.{key}" if path else str(key)
+        if isinstance(value, dict):
+            yield from _flatten(value, name, field, labels)
+        elif isinstance(value, list):
+            for index, item in enumerate(value):
+                if isinstance(item, dict):
+                    item_labels = {_NAME_RE.sub("_", str(k)): v for k, v in item.items() if isinstance(v, str)}
+                    numbers = {k: v for k, v in item.items() if not isinstance(v, str)}
+                    yield from _flatten(numbers, name, field, {**labels, **(item_labels or {"index": str(index)})})
+                elif (number := _number(item)) is not None:
+                    yield name, field, {**labels, "index": str(index)}, number
+        elif (number := _number(value)) is not None:
+            yield name, field, labels, number
+
+
+def _number(value: object) -> float | None:
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (int, float)):
+        return value
+    return None
+
+
+STAGE_SECONDS = Histogram(
+    "fssp_stage_duration_seconds", "Длительность этапов поиска в ФССП", ("stage",), registry=REGISTRY, buckets=DEFAULT_BUCKETS
+)
+LOOKUP_SECONDS = Histogram(
+    "fssp_lookup_duration_seconds", "Полная длительность поиска", ("kind", "outcome"), registry=REGISTRY, buckets=DEFAULT_BUCKETS
+)
+LOOKUPS_TOTAL = Counter(
+    "fssp_lookups_total",
+    "Поиски по виду запроса и результату (success, cache_hit или тип ошибки)",
+    ("kind", "outcome"),
+    registry=REGISTRY,
+)
+RESULTS_TRUNCATED_TOTAL = Counter(
+    "fssp_results_truncated_total",
+    "Поиски, результаты которых обрезаны лимитом страниц (pagination.max_pages)",
+    ("kind",),
+    registry=REGISTRY,
+)
+CAPTCHAS_TOTAL = Counter(
+    "fssp_captchas_total", "Попытки распознавания капчи по решателю и результату", ("backend", "result"), registry=REGISTRY
+)
+CAPTCHA_CACHE_LOOKUPS_TOTAL = Counter(
+    "fssp_captcha_cache_lookups_total",
+    "Поиск капчи в кэше проверенных ответов: exact, perceptual или miss",
+    ("result",),
+    registry=REGISTRY,
+)
+CAPTCHA_SOLVE_SECONDS = Histogram(
+    "fssp_captcha_solve_duration_seconds",
+    "Длительность успешного распознавания капчи по решателю",
+    ("backend",),
+    registry=REGISTRY,
+    buckets=DEFAULT_BUCKETS,
+)
+CAPTCHA_COST_TOTAL = Counter(
+    "fssp_captcha_cost_total",
+    "Расход на решение капч по решателю (по настроенной цене за капчу)",
+    ("backend",),
+    registry=REGISTRY,
+)
+CAPTCHA_RACE_WINS = Counter(
+    "fssp_captcha_race_wins_total",
+    "Чей ответ использован при backend=race: mode=race — победа в гонке, single — единственный вызванный решатель",
+    ("backend", "mode"),
+    registry=REGISTRY,
+)
+CAPTCHA_RACE_ENTRIES = Counter(
+    "fssp_captcha_race_entries_total",
+    "Участие решателя в распознавании при backend=race",
+    ("backend", "mode"),
+    registry=REGISTRY,
+)
+CAPTCHA_ATTEMPTS = Histogram(
+    "fssp_captcha_attempts",
+    "Сколько капч понадобилось решить за поиск, пока сайт не принял код",
+    ("engine", "outcome"),
+    registry=REGISTRY,
+    buckets=(1, 2, 3, 4, 5),
+)
+CAPTCHA_ATTEMPT_SECONDS = Histogram(
+    "fssp_captcha_attempt_duration_seconds",
+    "Длительность одной попытки капчи (решение и отправка кода) по ответу сайта",
+    ("engine", "result"),
+    registry=REGISTRY,
+    buckets=DEFAULT_BUCKETS,
+)
+INFLIGHT_LOOKUPS = Gauge("fssp_inflight_lookups", "Поиски, выполняющиеся прямо сейчас", registry=REGISTRY)
+PROXY_LOOKUPS_TOTAL = Counter(
+    "fssp_proxy_lookups_total", "Поиски через прокси по результату", ("proxy", "outcome"), registry=REGISTRY
+)
+PROXY_LOOKUP_SECONDS = Histogram(
+    "fssp_proxy_lookup_duration_seconds",
+    "Длительность успешных поисков через прокси",
+    ("proxy",),
+    registry=REGISTRY,
+    buckets=DEFAULT_BUCKETS,
+)
+PROXY_CONTEXTS = Gauge("fssp_proxy_contexts", "Открытые контексты браузера на прокси", ("proxy",), registry=REGISTRY)
+PROXY_QUARANTINED_UNTIL = Gauge(
+    "fssp_proxy_quarantined_until_seconds",
+    "Unix-время окончания карантина прокси (0 — карантина не было)",
+    ("proxy",),
+    registry=REGISTRY,
+)
+HTTP_REQUESTS_TOTAL = Counter(
+    "fssp_http_requests_total",
+    "HTTP-запросы к API по методу, маршруту и статусу",
+    ("method", "route", "status"),
+    registry=REGISTRY,
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "fssp_http_request_duration_seconds",
+    "Длительность обработки HTTP-запросов к API",
+    ("method", "route"),
+    registry=REGISTRY,
+    buckets=DEFAULT_BUCKETS,
+)
+HTTP_INFLIGHT = Gauge("fssp_http_requests_in_flight", "HTTP-запросы к API в обработке", registry=REGISTRY)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Замеряет этап поиска: гистограмма процесса и `Server-Timing` текущего HTTP-запроса."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.labels(stage=name).observe(elapsed)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((name, elapsed))
+
+
+@contextmanager
+def collect_request_timings() -> Iterator[list[tuple[str, float]]]:
+    """Собирает этапы, выполненные в рамках текущего запроса (включая задачи, созданные из него)."""
+    timings: list[tuple[str, float]] = []
+    token = _request_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _request_timings.reset(token)
+
+
+def stage_totals(timings: list[tuple[str, float]]) -> dict[str, tuple[float, int]]:
+    """Суммарное время (сек) и число замеров каждого этапа в порядке первого появления."""
+    totals: dict[str, tuple[float, int]] = {}
+    for name, elapsed in timings:
+        total, count = totals.get(name, (0.0, 0))
+        totals[name] = (total + elapsed, count + 1)
+    return totals
+
+
+def server_timing_header(timings: list[tuple[str, float]], total_s: float) -> str:
+    """Значение `Server-Timing`: суммарное время по каждому этапу и общее время обработки."""
+    parts = []
+    for name, (elapsed, count) in stage_totals(timings).items():
+        part = f"{name};dur={elapsed * 1000:.1f}"
+        if count > 1:
+            part += f';desc="x{count}"'
+        parts.append(part)
+    parts.append(f"total;dur={total_s * 1000:.1f}")
+    return ", ".join(parts)
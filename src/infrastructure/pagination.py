@@ -0,0 +1,90 @@
+"""Догрузка остальных страниц результатов поиска ФССП."""
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable
+from urllib.parse import urljoin
+
+from lxml import etree, html as lxml_html
+import structlog
+
+from src.domain.errors import FsspUnavailable
+from src.infrastructure.config import CAPTCHA_IMAGE_ID, PaginationConfig
+from src.infrastructure.metrics import stage
+
+
+logger = structlog.get_logger()
+
+_PAGE_LINKS_XPATH = "//*[contains(concat(' ', normalize-space(@class), ' '), ' pagination ')]//a[@href]"
+
+
+def find_page_links(html: str, base_url: str) -> dict[int, str]:
+    """Номера страниц из блока пагинации и их абсолютные URL."""
+    if "pagination" not in html:
+        return {}
+    try:
+        links = lxml_html.fromstring(html).xpath(_PAGE_LINKS_XPATH)
+    except (ValueError, etree.ParserError):
+        return {}
+    pages: dict[int, str] = {}
+    for link in links:
+        text = link.text_content().strip()
+        if text.isdigit():
+            pages.setdefault(int(text), urljoin(base_url, link.get("href")))
+    return pages
+
+
+async def fetch_remaining_pages(
+    first_html: str,
+    base_url: str,
+    get_page: Callable[[str], Awaitable[str]],
+    config: PaginationConfig,
+) -> AsyncIterator[tuple[int, str]]:
+    """Параллельно загружает страницы 2..N и отдает их по мере готовности.
+
+    Сайт показывает в пагинации только окно соседних страниц, поэтому ссылки
+    на новые страницы собираются и с уже загруженных. Загружается не больше
+    `max_pages` страниц, одновременно — не больше `concurrency`.
+    """
+    pending = {number: url for number, url in find_page_links(first_html, base_url).items() if number > 1}
+    seen = {1, *pending}
+    running: dict[asyncio.Task[str], int] = {}
+    truncated = False
+
+    def discover(links: dict[int, str]) -> None:
+        nonlocal truncated
+        for number, url in links.items():
+            if number in seen:
+                continue
+            if number > config.max_pages:
+                truncated = True
+                continue
+            seen.add(number)
+            pending[number] = url
+
+    async def load(url: str) -> str:
+        with stage("page_fetch"):
+            return await get_page(url)
+
+    for number in [n for n in pending if n > config.max_pages]:
+        del pending[number]
+        truncated = True
+
+    try:
+        while pending or running:
+            while pending and len(running) < config.concurrency:
+                number = min(pending)
+                running[asyncio.ensure_future(load(pending.pop(number)))] = number
+
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                number = running.pop(task)
+                page_html = task.result()
+                if CAPTCHA_IMAGE_ID in page_html:
+                    raise FsspUnavailable(f"ФССП запросил капчу при загрузке страницы результатов {number}")
+                discover(find_page_links(page_html, base_url))
+                yield number, page_html
+    finally:
+        for task in running:
+            task.cancel()
+
+    if truncated:
+        logger.warning("Результаты обрезаны лимитом страниц", max_pages=config.max_pages)
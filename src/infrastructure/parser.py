@@ -1,15 +1,51 @@
+from collections.abc import Iterator
+
 from bs4 import BeautifulSoup
+from lxml import etree, html as lxml_html
 import structlog
 from src.domain.errors import ParsingError, CaptchaLimitExceeded
+from src.infrastructure.metrics import stage
 
 
 logger = structlog.get_logger()
 
+CAPTCHA_LIMIT_MESSAGE = "Количество неверных попыток ввода кода превышено"
+
+_CAPTCHA_LIMIT_ERROR = (
+    "Превышено количество неверных попыток ввода капчи. "
+    "Попробуйте позже или используйте другой способ получения данных."
+)
+
+
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+_EMPTY_XPATH = etree.XPath(f"//*[{_has_class('results')}]//*[{_has_class('empty')}]")
+_TABLE_XPATH = etree.XPath(f"//*[{_has_class('results-frame')}]//table[{_has_class('list')}]")
+# Текст этих тегов BeautifulSoup не включает в stripped_strings
+_SKIPPED_TAGS = frozenset({"script", "style", "template"})
+
 
 class FsspHtmlParser:
     """Парсер HTML страницы результатов ФССП."""
 
-    def parse_cases(self, html: str) -> list[dict]:
+    def is_empty(self, html: str) -> bool:
+        """Страница «ничего не найдено»: блок `.results .empty` без сообщения о лимите попыток капчи."""
+        if "empty" not in html:
+            return False
+        try:
+            errors = _EMPTY_XPATH(lxml_html.document_fromstring(html))
+        except (ValueError, etree.LxmlError):
+            return False
+        return bool(errors) and CAPTCHA_LIMIT_MESSAGE not in "".join(_strings(errors[0]))
+
+    def parse_cases(self, html: str, region: str | None = None) -> list[dict]:
+        """Строки таблицы результатов; `region` — регион, действующий до первого заголовка региона на странице."""
+        with stage("parse"):
+            return list(self.iter_cases(html, region))
+
+    def iter_cases(self, html: str, region: str | None = None) -> Iterator[dict]:
         try:
             soup = BeautifulSoup(html, "lxml")
         except Exception as exc:  # noqa: BLE001
@@ -19,20 +55,16 @@ class FsspHtmlParser:
         error_div = soup.select_one(".results .empty")
         if error_div:
             error_text = error_div.get_text(strip=True)
-            if "Количество неверных попыток ввода кода превышено" in error_text:
+            if CAPTCHA_LIMIT_MESSAGE in error_text:
                 logger.warning("Обнаружено сообщение о превышении лимита попыток капчи")
-                raise CaptchaLimitExceeded(
-                    "Превышено количество неверных попыток ввода капчи. "
-                    "Попробуйте позже или используйте другой способ получения данных."
-                )
+                raise CaptchaLimitExceeded(_CAPTCHA_LIMIT_ERROR)
 
         table = soup.select_one(".results-frame table.list")
         if not table:
             logger.warning("Таблица результатов не найдена")
-            return []
+            return
 
-        current_region: str | None = None
-        rows: list[dict] = []
+        current_region = region
         for tr in table.select("tr"):
             if tr.select("th"):
                 continue
@@ -44,17 +76,86 @@ class FsspHtmlParser:
             if len(tds) != 8:
                 continue
 
-            rows.append(
-                {
-                    "region": current_region,
-                    "debtor": " ".join(tds[0].stripped_strings),
-                    "ip": " ".join(tds[1].stripped_strings),
-                    "doc": " ".join(tds[2].stripped_strings),
-                    "end_reason": " ".join(tds[3].stripped_strings),
-                    "debt": " ".join(tds[5].stripped_strings),
-                    "office": " ".join(tds[6].stripped_strings),
-                    "bailiff": " ".join(tds[7].stripped_strings),
-                }
-            )
-
-        return rows
+            yield {
+                "region": current_region,
+                "debtor": " ".join(tds[0].stripped_strings),
+                "ip": " ".join(tds[1].stripped_strings),
+                "doc": " ".join(tds[2].stripped_strings),
+                "end_reason": " ".join(tds[3].stripped_strings),
+                "debt": " ".join(tds[5].stripped_strings),
+                "office": " ".join(tds[6].stripped_strings),
+                "bailiff": " ".join(tds[7].stripped_strings),
+            }
+
+
+class LxmlHtmlParser(FsspHtmlParser):
+    """Быстрый парсер страницы результатов на lxml, результат совпадает с `FsspHtmlParser`.
+
+    Дерево BeautifulSoup не строится: таблица `.results-frame` обходится напрямую,
+    строки отдаются генератором по мере разбора.
+    """
+
+    def iter_cases(self, html: str, region: str | None = None) -> Iterator[dict]:
+        if not html or html.isspace():
+            logger.warning("Таблица результатов не найдена")
+            return
+        try:
+            document = lxml_html.document_fromstring(html)
+        except (ValueError, etree.LxmlError) as exc:
+            raise ParsingError("Не удалось распарсить HTML") from exc
+
+        # Проверка на ошибку превышения лимита попыток капчи
+        errors = _EMPTY_XPATH(document)
+        if errors and CAPTCHA_LIMIT_MESSAGE in "".join(_strings(errors[0])):
+            logger.warning("Обнаружено сообщение о превышении лимита попыток капчи")
+            raise CaptchaLimitExceeded(_CAPTCHA_LIMIT_ERROR)
+
+        tables = _TABLE_XPATH(document)
+        if not tables:
+            logger.warning("Таблица результатов не найдена")
+            return
+
+        current_region = region
+        for tr in tables[0].iter("tr"):
+            if next(tr.iter("th"), None) is not None:
+                continue
+            if "region-title" in (tr.get("class") or "").split():
+                current_region = "".join(_strings(tr))
+                continue
+
+            tds = list(tr.iter("td"))
+            if len(tds) != 8:
+                continue
+
+            yield {
+                "region": current_region,
+                "debtor": _cell_text(tds[0]),
+                "ip": _cell_text(tds[1]),
+                "doc": _cell_text(tds[2]),
+                "end_reason": _cell_text(tds[3]),
+                "debt": _cell_text(tds[5]),
+                "office": _cell_text(tds[6]),
+                "bailiff": _cell_text(tds[7]),
+            }
+
+
+def _strings(element: etree._Element) -> Iterator[str]:
+    """Непустые обрезанные текстовые узлы элемента, как `stripped_strings` в BeautifulSoup."""
+    if element.text:
+        text = element.text.strip()
+        if text:
+            yield text
+    for child in element:
+        # У комментариев и processing instructions tag — не строка, их текст пропускается
+        if isinstance(child.tag, str) and child.tag not in _SKIPPED_TAGS:
+            yield from _strings(child)
+        if child.tail:
+            tail = child.tail.strip()
+            if tail:
+                yield tail
+
+
+def _cell_text(td: etree._Element) -> str:
+    if len(td) == 0:
+        return (td.text or "").strip()
+    return " ".join(_strings(td))
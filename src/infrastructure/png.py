@@ -0,0 +1,118 @@
+"""Минимальный кодек PNG для изображений капчи: без Pillow, только zlib.
+
+Поддерживаются 8-битные изображения без чересстрочности (grayscale, RGB, с альфой
+и без) — этого достаточно для капчи сайта и скриншотов Chromium.
+"""
+from dataclasses import dataclass
+import struct
+import zlib
+
+
+_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Цветовой тип PNG -> байт на пиксель при глубине 8 бит
+_CHANNELS = {0: 1, 2: 3, 4: 2, 6: 4}
+
+
+class PngError(ValueError):
+    """Файл не PNG или использует неподдерживаемые возможности формата."""
+
+
+@dataclass(frozen=True)
+class GrayImage:
+    """Изображение в оттенках серого: `pixels[y * width + x]`, 0 — черный."""
+
+    width: int
+    height: int
+    pixels: bytes
+
+    def at(self, x: int, y: int) -> int:
+        return self.pixels[y * self.width + x]
+
+
+def encode_gray(image: GrayImage) -> bytes:
+    raw = b"".join(
+        b"\x00" + image.pixels[y * image.width : (y + 1) * image.width] for y in range(image.height)
+    )
+    header = struct.pack(">IIBBBBB", image.width, image.height, 8, 0, 0, 0, 0)
+    return _SIGNATURE + _chunk(b"IHDR", header) + _chunk(b"IDAT", zlib.compress(raw, 9)) + _chunk(b"IEND", b"")
+
+
+def decode_gray(data: bytes) -> GrayImage:
+    """Декодирует PNG и переводит его в оттенки серого (альфа-канал игнорируется)."""
+    if not data.startswith(_SIGNATURE):
+        raise PngError("Не PNG")
+
+    offset = len(_SIGNATURE)
+    header = None
+    idat = bytearray()
+    while offset + 8 <= len(data):
+        length, kind = struct.unpack(">I4s", data[offset : offset + 8])
+        body = data[offset + 8 : offset + 8 + length]
+        offset += 12 + length
+        if kind == b"IHDR":
+            header = struct.unpack(">IIBBBBB", body)
+        elif kind == b"IDAT":
+            idat += body
+        elif kind == b"IEND":
+            break
+    if header is None:
+        raise PngError("Нет заголовка IHDR")
+
+    width, height, depth, color_type, _, _, interlace = header
+    if depth != 8 or color_type not in _CHANNELS or interlace:
+        raise PngError(f"Неподдерживаемый PNG: глубина {depth}, цвет {color_type}, interlace {interlace}")
+    try:
+        raw = zlib.decompress(bytes(idat))
+    except zlib.error as exc:
+        raise PngError("Поврежденные данные IDAT") from exc
+
+    bpp = _CHANNELS[color_type]
+    stride = width * bpp
+    if len(raw) < height * (stride + 1):
+        raise PngError("Недостаточно данных изображения")
+
+    pixels = bytearray(width * height)
+    previous = bytearray(stride)
+    for y in range(height):
+        start = y * (stride + 1)
+        row = _unfilter(raw[start], bytearray(raw[start + 1 : start + 1 + stride]), previous, bpp)
+        base = y * width
+        if bpp <= 2:
+            pixels[base : base + width] = row[::bpp]
+        else:
+            for x in range(width):
+                i = x * bpp
+                pixels[base + x] = (row[i] * 299 + row[i + 1] * 587 + row[i + 2] * 114) // 1000
+        previous = row
+    return GrayImage(width=width, height=height, pixels=bytes(pixels))
+
+
+def _unfilter(kind: int, row: bytearray, previous: bytearray, bpp: int) -> bytearray:
+    if kind == 0:
+        return row
+    if kind == 1:
+        for i in range(bpp, len(row)):
+            row[i] = (row[i] + row[i - bpp]) & 0xFF
+    elif kind == 2:
+        for i in range(len(row)):
+            row[i] = (row[i] + previous[i]) & 0xFF
+    elif kind == 3:
+        for i in range(len(row)):
+            left = row[i - bpp] if i >= bpp else 0
+            row[i] = (row[i] + ((left + previous[i]) >> 1)) & 0xFF
+    elif kind == 4:
+        for i in range(len(row)):
+            a = row[i - bpp] if i >= bpp else 0
+            b = previous[i]
+            c = previous[i - bpp] if i >= bpp else 0
+            p = a + b - c
+            pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+            predictor = a if pa <= pb and pa <= pc else b if pb <= pc else c
+            row[i] = (row[i] + predictor) & 0xFF
+    else:
+        raise PngError(f"Неизвестный фильтр строки {kind}")
+    return row
+
+
+def _chunk(kind: bytes, body: bytes) -> bytes:
+    return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body) & 0xFFFFFFFF)
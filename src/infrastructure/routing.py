@@ -0,0 +1,60 @@
+from collections import Counter
+import re
+
+from playwright.async_api import BrowserContext, Response, Route
+import structlog
+
+from src.infrastructure.config import BrowserConfig
+
+
+logger = structlog.get_logger()
+
+
+class RequestPolicy:
+    """Политика перехвата запросов браузера: пропускает только то, что нужно для поиска.
+
+    Запросы, совпадающие с `allowed_url_patterns` (капча), пропускаются всегда.
+    Остальные блокируются по типу ресурса (`blocked_resource_types`) или по URL
+    (`blocked_url_patterns` — счетчики, аналитика).
+    """
+
+    def __init__(self, config: BrowserConfig):
+        self._allowed = [re.compile(p) for p in config.allowed_url_patterns]
+        self._blocked = [re.compile(p) for p in config.blocked_url_patterns]
+        self._blocked_types = set(config.blocked_resource_types)
+        self._allowed_count = 0
+        self._blocked_count: Counter[str] = Counter()
+        self._bytes_received = 0
+
+    async def install(self, context: BrowserContext) -> None:
+        await context.route("**/*", self._handle)
+        context.on("response", self._on_response)
+
+    def is_allowed(self, resource_type: str, url: str) -> bool:
+        if any(p.search(url) for p in self._allowed):
+            return True
+        if resource_type in self._blocked_types:
+            return False
+        return not any(p.search(url) for p in self._blocked)
+
+    def stats(self) -> dict:
+        return {
+            "requests_allowed": self._allowed_count,
+            "requests_blocked": sum(self._blocked_count.values()),
+            "requests_blocked_by_type": dict(self._blocked_count),
+            "bytes_received": self._bytes_received,
+        }
+
+    async def _handle(self, route: Route) -> None:
+        request = route.request
+        if self.is_allowed(request.resource_type, request.url):
+            self._allowed_count += 1
+            await route.continue_()
+            return
+        self._blocked_count[request.resource_type] += 1
+        await route.abort("blockedbyclient")
+
+    def _on_response(self, response: Response) -> None:
+        length = response.headers.get("content-length")
+        if length and length.isdigit():
+            self._bytes_received += int(length)
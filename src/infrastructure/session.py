@@ -0,0 +1,151 @@
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+import time
+
+from playwright.async_api import BrowserContext, Page
+import structlog
+
+from src.infrastructure.browser import BrowserManager
+from src.infrastructure.config import SessionConfig
+
+
+logger = structlog.get_logger()
+
+
+@dataclass
+class Session:
+    """Контекст браузера с открытой страницей, на которой (возможно) уже решена капча."""
+
+    context: BrowserContext
+    page: Page
+    created_at: float = field(default_factory=time.monotonic)
+    uses: int = 0
+    captchas: int = 0
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.created_at
+
+
+class SessionPool:
+    """Переиспользование сессий сайта между запросами.
+
+    Сессия с решенной капчей возвращается в пул и обслуживает следующие запросы,
+    пока сайт снова не потребует капчу, не истечет `max_age_s` или не будет
+    исчерпан `max_uses`. Отношение решенных капч к поискам показывает экономию.
+
+    Простаивающая сессия держит слот пула браузера, поэтому поиск, которому не хватило
+    слота, ждет одновременно свободного слота и сессии, возвращенной другим поиском:
+    возвращенная сессия отдается ожидающему напрямую.
+    """
+
+    def __init__(self, browser: BrowserManager, config: SessionConfig):
+        self._browser = browser
+        self._config = config
+        self._idle: list[Session] = []
+        self._waiters: deque[asyncio.Future[Session]] = deque()
+        self._created = 0
+        self._reused = 0
+        self._lookups = 0
+        self._captchas = 0
+
+    async def acquire(self) -> Session:
+        while self._idle:
+            session = self._idle.pop()
+            if self._is_usable(session):
+                self._reused += 1
+                return session
+            await self._close(session)
+
+        handoff: asyncio.Future[Session] = asyncio.get_running_loop().create_future()
+        self._waiters.append(handoff)
+        opening = asyncio.ensure_future(self._browser.acquire())
+        try:
+            await asyncio.wait((handoff, opening), return_when=asyncio.FIRST_COMPLETED)
+        except BaseException:
+            handed, context = await self._settle(handoff, opening)
+            if handed is not None:
+                await self.release(handed, reusable=True)
+            if context is not None:
+                await self._browser.release(context)
+            raise
+
+        handed, context = await self._settle(handoff, opening)
+        if handed is not None:
+            if context is not None:
+                await self._browser.release(context)
+            self._reused += 1
+            return handed
+        if context is None:
+            opening.result()  # пробрасываем ошибку создания контекста
+
+        try:
+            page = await context.new_page()
+        except Exception:  # noqa: BLE001
+            await self._browser.release(context)
+            raise
+        self._created += 1
+        return Session(context=context, page=page)
+
+    async def release(self, session: Session, reusable: bool) -> None:
+        if reusable and self._config.enabled and self._is_usable(session):
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if not waiter.done():
+                    waiter.set_result(session)
+                    return
+            self._idle.append(session)
+        else:
+            await self._close(session)
+
+    def record_lookup(self, session: Session, captchas: int) -> None:
+        session.uses += 1
+        session.captchas += captchas
+        self._lookups += 1
+        self._captchas += captchas
+
+    async def close(self) -> None:
+        while self._idle:
+            await self._close(self._idle.pop())
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self._config.enabled,
+            "idle": len(self._idle),
+            "waiting": len(self._waiters),
+            "created": self._created,
+            "reused": self._reused,
+            "lookups": self._lookups,
+            "captchas_solved": self._captchas,
+            "captchas_per_lookup": round(self._captchas / self._lookups, 4) if self._lookups else None,
+        }
+
+    def _is_usable(self, session: Session) -> bool:
+        return (
+            not session.page.is_closed()
+            and session.uses < self._config.max_uses
+            and session.age < self._config.max_age_s
+            and self._browser.is_healthy(session.context)
+        )
+
+    async def _settle(
+        self,
+        handoff: asyncio.Future[Session],
+        opening: asyncio.Future[BrowserContext],
+    ) -> tuple[Session | None, BrowserContext | None]:
+        """Завершает ожидание: переданная сессия и/или созданный контекст (может оказаться и то, и другое)."""
+        if handoff in self._waiters:
+            self._waiters.remove(handoff)
+        if not opening.done():
+            opening.cancel()
+            # Отмененный acquire сам возвращает слот; ждем, чтобы не оставить контекст без владельца
+            await asyncio.wait((opening,))
+        handed = handoff.result() if handoff.done() and not handoff.cancelled() else None
+        handoff.cancel()
+        context = opening.result() if not opening.cancelled() and opening.exception() is None else None
+        return handed, context
+
+    async def _close(self, session: Session) -> None:
+        logger.debug("Закрываем сессию", uses=session.uses, captchas=session.captchas, age_s=round(session.age, 1))
+        await self._browser.release(session.context)
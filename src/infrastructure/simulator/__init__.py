@@ -0,0 +1,4 @@
+"""Локальный симулятор сайта ФССП и провайдера капчи."""
+from src.infrastructure.simulator.app import SiteSimulator, create_simulator_app
+
+__all__ = ["SiteSimulator", "create_simulator_app"]
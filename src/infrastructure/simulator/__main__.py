@@ -0,0 +1,24 @@
+"""Запуск симулятора: `python -m src.infrastructure.simulator` (настройки — переменные `SIMULATOR__*`)."""
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+import uvicorn
+
+from src.infrastructure.config import SimulatorConfig
+from src.infrastructure.simulator import create_simulator_app
+
+
+class _SimulatorSettings(BaseSettings):
+    """Только секция симулятора: ключ RuCaptcha и остальные настройки сервиса ему не нужны."""
+
+    model_config = SettingsConfigDict(env_file=".env", env_nested_delimiter="__", extra="ignore")
+
+    simulator: SimulatorConfig = Field(default_factory=SimulatorConfig)
+
+
+def main() -> None:
+    config = _SimulatorSettings().simulator
+    uvicorn.run(create_simulator_app(config), host=config.host, port=config.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""Локальный симулятор сайта ФССП и провайдера капчи для офлайн e2e- и нагрузочных тестов."""
+import asyncio
+import base64
+import binascii
+from collections import OrderedDict
+from dataclasses import dataclass
+import json
+import random
+import time
+import uuid
+
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import HTMLResponse, JSONResponse
+from src.infrastructure.config import SimulatorConfig
+from src.infrastructure.simulator.captcha_image import image_size, random_code, read_code, render_code
+from src.infrastructure.simulator.pages import (
+    query_params,
+    render_captcha_limit,
+    render_captcha_popup,
+    render_form,
+    render_results,
+    result_rows,
+)
+
+SESSION_COOKIE = "sim_sid"
+_MAX_CAPTCHAS = 10_000
+
+
+@dataclass
+class _SiteSession:
+    verified: bool = False
+    uses: int = 0
+    wrong_attempts: int = 0
+    captcha_id: str | None = None
+    code: str | None = None
+
+
+class SiteSimulator:
+    """Состояние симулятора: сессии сайта по cookie, выданные капчи и счетчики."""
+
+    def __init__(self, config: SimulatorConfig):
+        self.config = config
+        self._rng = random.Random(config.seed)
+        self._sessions: dict[str, _SiteSession] = {}
+        self._images: OrderedDict[str, bytes] = OrderedDict()
+        self._counters = {
+            "form_pages": 0,
+            "searches": 0,
+            "result_pages": 0,
+            "captchas_issued": 0,
+            "captchas_accepted": 0,
+            "captchas_rejected": 0,
+            "captcha_limit_pages": 0,
+            "failures": 0,
+            "solver_calls": 0,
+            "solver_errors": 0,
+            "provider_tasks": 0,
+            "provider_polls": 0,
+            "provider_reports": 0,
+        }
+        # Задачи фейкового провайдера с API RuCaptcha: id -> (момент готовности, код или None)
+        self._provider_tasks: OrderedDict[str, tuple[float, str | None]] = OrderedDict()
+
+    def stats(self) -> dict:
+        return {**self._counters, "sessions": len(self._sessions)}
+
+    def session(self, request: Request) -> tuple[str, _SiteSession]:
+        """Сессия сайта по cookie; неизвестная или отсутствующая cookie — новая сессия."""
+        sid = request.cookies.get(SESSION_COOKIE)
+        if sid is None or sid not in self._sessions:
+            sid = uuid.uuid4().hex
+            self._sessions[sid] = _SiteSession()
+        return sid, self._sessions[sid]
+
+    async def delay(self, latency_ms: float, jitter_ms: float) -> None:
+        delay = max(0.0, latency_ms + self._rng.uniform(-jitter_ms, jitter_ms))
+        if delay:
+            await asyncio.sleep(delay / 1000)
+
+    def should_fail(self) -> bool:
+        if self._rng.random() < self.config.failure_rate:
+            self._counters["failures"] += 1
+            return True
+        return False
+
+    def needs_captcha(self, session: _SiteSession, random_check: bool = True) -> bool:
+        """Нужна ли капча: сессия не проверена, исчерпана или (с `captcha_rate`) просто так."""
+        if not session.verified or session.uses >= self.config.session_max_uses:
+            return True
+        return random_check and self._rng.random() < self.config.captcha_rate
+
+    def issue_captcha(self, session: _SiteSession) -> str:
+        """Выдает сессии новую капчу и возвращает URL ее изображения."""
+        session.verified = False
+        session.code = random_code(self._rng, self.config.captcha_length)
+        session.captcha_id = uuid.uuid4().hex
+        self._images[session.captcha_id] = render_code(session.code, self._rng)
+        while len(self._images) > _MAX_CAPTCHAS:
+            self._images.popitem(last=False)
+        self._counters["captchas_issued"] += 1
+        return f"/simulator/captcha.png?id={session.captcha_id}"
+
+    def captcha_popup(self, session: _SiteSession) -> str:
+        return render_captcha_popup(self.issue_captcha(session), image_size(self.config.captcha_length))
+
+    def check_code(self, session: _SiteSession, code: str) -> bool:
+        if session.code is not None and code.strip() == session.code:
+            session.verified = True
+            session.uses = 0
+            session.wrong_attempts = 0
+            session.code = None
+            self._counters["captchas_accepted"] += 1
+            return True
+        session.wrong_attempts += 1
+        self._counters["captchas_rejected"] += 1
+        return False
+
+    def image(self, captcha_id: str) -> bytes | None:
+        return self._images.get(captcha_id)
+
+    def count(self, name: str) -> None:
+        self._counters[name] += 1
+
+    def solve(self, image: bytes) -> str | None:
+        """Фейковый провайдер: распознает капчу симулятора, иногда намеренно ошибается."""
+        self._counters["solver_calls"] += 1
+        code = read_code(image, self.config.captcha_length)
+        if code is None:
+            self._counters["solver_errors"] += 1
+            return None
+        if self._rng.random() < self.config.solver_error_rate:
+            position = self._rng.randrange(len(code))
+            wrong = str((int(code[position]) + 1) % 10)
+            return code[:position] + wrong + code[position + 1 :]
+        return code
+
+    def submit_task(self, image: bytes) -> str:
+        """Задача провайдера: ответ известен сразу, но «готов» только через задержку решателя."""
+        jitter = self.config.solver_latency_jitter_ms
+        delay_ms = max(0.0, self.config.solver_latency_ms + self._rng.uniform(-jitter, jitter))
+        task_id = str(self._rng.randrange(10**9, 10**10))
+        self._provider_tasks[task_id] = (time.monotonic() + delay_ms / 1000, self.solve(image))
+        while len(self._provider_tasks) > _MAX_CAPTCHAS:
+            self._provider_tasks.popitem(last=False)
+        self._counters["provider_tasks"] += 1
+        return task_id
+
+    def task_status(self, task_id: str) -> str:
+        if task_id not in self._provider_tasks:
+            return "ERROR_WRONG_CAPTCHA_ID"
+        ready_at, code = self._provider_tasks[task_id]
+        if time.monotonic() < ready_at:
+            return "CAPCHA_NOT_READY"
+        return code if code is not None else "ERROR_CAPTCHA_UNSOLVABLE"
+
+
+def _json_payload(html: str, callback: str | None) -> Response:
+    if callback:
+        return Response(f"{callback}({json.dumps({'data': html})});", media_type="application/javascript")
+    return JSONResponse({"data": html})
+
+
+def _with_session(response: Response, sid: str) -> Response:
+    response.set_cookie(SESSION_COOKIE, sid, httponly=True)
+    return response
+
+
+def create_simulator_app(config: SimulatorConfig) -> FastAPI:
+    """Собирает приложение симулятора.
+
+    Чтобы направить сервис на симулятор, URL из `FsspUrls` переопределяются на его адрес,
+    а решатель капчи — на `CAPTCHA__BACKEND=simulator` (см. README).
+    """
+    simulator = SiteSimulator(config)
+    app = FastAPI(title="Симулятор ФССП", docs_url=None, redoc_url=None, openapi_url=None)
+    app.state.simulator = simulator
+
+    @app.get("/iss/ip/", response_class=HTMLResponse)
+    @app.get("/iss/ip", response_class=HTMLResponse, include_in_schema=False)
+    async def search_form(request: Request) -> Response:
+        await simulator.delay(config.latency_ms, config.latency_jitter_ms)
+        if simulator.should_fail():
+            return HTMLResponse("<h1>503 Service Temporarily Unavailable</h1>", status_code=503)
+        sid, session = simulator.session(request)
+        simulator.count("form_pages")
+
+        params = query_params(list(request.query_params.multi_items()))
+        # Случайная капча разыгрывается в ajax_search, форма показывает ее только непроверенной сессии
+        captcha = simulator.needs_captcha(session, random_check=False)
+        popup = simulator.captcha_popup(session) if captcha else ""
+        html = render_form(params, popup, auto_search=bool(params) and not captcha, config=config)
+        return _with_session(HTMLResponse(html), sid)
+
+    @app.get("/ajax_search")
+    async def ajax_search(request: Request) -> Response:
+        await simulator.delay(config.latency_ms, config.latency_jitter_ms)
+        if simulator.should_fail():
+            return HTMLResponse("<h1>502 Bad Gateway</h1>", status_code=502)
+        items = list(request.query_params.multi_items())
+        params = query_params(items)
+        args = dict(items)
+        callback = args.get("callback")
+        page = int(args.get("page") or 1)
+
+        sid, session = simulator.session(request)
+        if page > 1:
+            # Страницы 2..N отдаются только в сессии, уже прошедшей капчу
+            if session.verified:
+                html = render_results(result_rows(params, config), page, params, config)
+            else:
+                html = simulator.captcha_popup(session)
+            simulator.count("result_pages")
+        elif "code" in args and not simulator.check_code(session, args["code"]):
+            if session.wrong_attempts >= config.captcha_limit_attempts:
+                session.wrong_attempts = 0
+                simulator.count("captcha_limit_pages")
+                html = render_captcha_limit()
+            else:
+                html = simulator.captcha_popup(session)
+        elif "code" not in args and simulator.needs_captcha(session):
+            html = simulator.captcha_popup(session)
+        else:
+            session.uses += 1
+            simulator.count("searches")
+            simulator.count("result_pages")
+            html = render_results(result_rows(params, config), 1, params, config)
+
+        return _with_session(_json_payload(html, callback), sid)
+
+    @app.get("/simulator/captcha.png")
+    async def captcha_image(id: str) -> Response:
+        image = simulator.image(id)
+        if image is None:
+            return Response(status_code=404)
+        return Response(image, media_type="image/png", headers={"Cache-Control": "no-store"})
+
+    @app.get("/simulator/captcha/refresh")
+    async def captcha_refresh(request: Request) -> Response:
+        sid, session = simulator.session(request)
+        return _with_session(JSONResponse({"src": simulator.issue_captcha(session)}), sid)
+
+    @app.post("/simulator/solver")
+    async def solver(request: Request) -> Response:
+        image = await request.body()
+        await simulator.delay(config.solver_latency_ms, config.solver_latency_jitter_ms)
+        code = simulator.solve(image)
+        if code is None:
+            return JSONResponse({"error": "ERROR_CAPTCHA_UNSOLVABLE"}, status_code=422)
+        return JSONResponse({"code": code})
+
+    # Фейковый провайдер с API RuCaptcha/2captcha: CAPTCHA__SERVER=http://<симулятор>/simulator
+    @app.post("/simulator/in.php")
+    async def provider_submit(request: Request) -> Response:
+        form = await request.form()
+        try:
+            image = base64.b64decode(str(form.get("body", "")), validate=True)
+        except binascii.Error:
+            return JSONResponse({"status": 0, "request": "ERROR_WRONG_FILE_EXTENSION"})
+        return JSONResponse({"status": 1, "request": simulator.submit_task(image)})
+
+    @app.get("/simulator/res.php")
+    async def provider_result(request: Request) -> Response:
+        params = request.query_params
+        if params.get("action") == "reportbad":
+            simulator.count("provider_reports")
+            return JSONResponse({"status": 1, "request": "OK_REPORT_RECORDED"})
+        simulator.count("provider_polls")
+        if "ids" in params:
+            return Response("|".join(simulator.task_status(task_id) for task_id in params["ids"].split(",")), media_type="text/plain")
+        status = simulator.task_status(params.get("id", ""))
+        ready = status != "CAPCHA_NOT_READY" and not status.startswith("ERROR")
+        return JSONResponse({"status": int(ready), "request": status})
+
+    @app.get("/simulator/stats")
+    async def stats() -> dict:
+        return simulator.stats()
+
+    return app
@@ -0,0 +1,92 @@
+"""Цифровая капча симулятора: рисование PNG и распознавание для фейкового решателя."""
+import random
+
+from src.infrastructure.png import GrayImage, PngError, decode_gray, encode_gray
+
+
+# Растровый шрифт 5x7
+_FONT = {
+    "0": ("01110", "10001", "10011", "10101", "11001", "10001", "01110"),
+    "1": ("00100", "01100", "00100", "00100", "00100", "00100", "01110"),
+    "2": ("01110", "10001", "00001", "00010", "00100", "01000", "11111"),
+    "3": ("11110", "00001", "00001", "01110", "00001", "00001", "11110"),
+    "4": ("00010", "00110", "01010", "10010", "11111", "00010", "00010"),
+    "5": ("11111", "10000", "11110", "00001", "00001", "10001", "01110"),
+    "6": ("00110", "01000", "10000", "11110", "10001", "10001", "01110"),
+    "7": ("11111", "00001", "00010", "00100", "01000", "01000", "01000"),
+    "8": ("01110", "10001", "10001", "01110", "10001", "10001", "01110"),
+    "9": ("01110", "10001", "10001", "01111", "00001", "00010", "01100"),
+}
+_GLYPH_W, _GLYPH_H = 5, 7
+SCALE = 4
+MARGIN = 8
+MAX_SHIFT = 4
+_PITCH = (_GLYPH_W + 1) * SCALE
+# Пиксели темнее порога — символ, шум всегда светлее
+_THRESHOLD = 128
+
+
+def random_code(rng: random.Random, length: int) -> str:
+    return "".join(rng.choice("0123456789") for _ in range(length))
+
+
+def image_size(length: int) -> tuple[int, int]:
+    return MARGIN * 2 + length * _PITCH - SCALE, MARGIN * 2 + _GLYPH_H * SCALE + MAX_SHIFT
+
+
+def render_code(code: str, rng: random.Random) -> bytes:
+    """PNG с кодом: цифры со случайным вертикальным сдвигом на светлом шуме."""
+    width, height = image_size(len(code))
+    pixels = bytearray(rng.randint(215, 255) for _ in range(width * height))
+    for _ in range(3):
+        y = rng.randrange(height)
+        for x in range(width):
+            pixels[y * width + x] = 170
+
+    for index, digit in enumerate(code):
+        left = MARGIN + index * _PITCH
+        top = MARGIN + rng.randint(0, MAX_SHIFT)
+        ink = rng.randint(0, 70)
+        for row, bits in enumerate(_FONT[digit]):
+            for col, bit in enumerate(bits):
+                if bit == "1":
+                    for dy in range(SCALE):
+                        start = (top + row * SCALE + dy) * width + left + col * SCALE
+                        pixels[start : start + SCALE] = bytes([ink]) * SCALE
+    return encode_gray(GrayImage(width=width, height=height, pixels=bytes(pixels)))
+
+
+def read_code(png: bytes, length: int) -> str | None:
+    """Распознает код с картинки симулятора (в том числе со скриншота элемента) или None."""
+    try:
+        image = decode_gray(png)
+    except PngError:
+        return None
+    if (image.width, image.height) != image_size(length):
+        return None
+
+    digits = []
+    for index in range(length):
+        left = MARGIN + index * _PITCH
+        top = next(
+            (
+                y
+                for y in range(MARGIN, MARGIN + MAX_SHIFT + 1)
+                if any(image.at(left + x, y) < _THRESHOLD for x in range(_GLYPH_W * SCALE))
+            ),
+            None,
+        )
+        if top is None:
+            return None
+        cells = tuple(
+            "".join(
+                "1" if image.at(left + col * SCALE + SCALE // 2, top + row * SCALE + SCALE // 2) < _THRESHOLD else "0"
+                for col in range(_GLYPH_W)
+            )
+            for row in range(_GLYPH_H)
+        )
+        digit = next((digit for digit, glyph in _FONT.items() if glyph == cells), None)
+        if digit is None:
+            return None
+        digits.append(digit)
+    return "".join(digits)
@@ -0,0 +1,193 @@
+"""HTML симулятора: форма поиска, попап капчи, таблица результатов и страницы ошибок.
+
+Разметка повторяет то, на что опираются клиент и парсер: `img#capchaVisualImage`,
+`#captcha-popup-code`, кнопка «Отправить», `.results .results-frame table.list`,
+строки `region-title`, блок `.pagination` и `.results .empty`.
+"""
+from hashlib import sha256
+from html import escape
+import json
+import random
+from urllib.parse import urlencode
+
+from src.infrastructure.config import SimulatorConfig
+from src.infrastructure.parser import CAPTCHA_LIMIT_MESSAGE
+
+
+_REGIONS = ("Москва", "Московская область", "Санкт-Петербург", "Новосибирская область", "Республика Татарстан")
+_LAST_NAMES = ("ИВАНОВ", "ПЕТРОВА", "СИДОРОВ", "КУЗНЕЦОВА", "СМИРНОВ", "ПОПОВА")
+_HEADERS = (
+    "Должник",
+    "Исполнительное производство",
+    "Реквизиты исполнительного документа",
+    "Дата, причина окончания или прекращения ИП",
+    "Сервис",
+    "Предмет исполнения, сумма непогашенной задолженности",
+    "Отдел судебных приставов",
+    "Судебный пристав-исполнитель",
+)
+_FORM_FIELDS = (
+    ("is[variant]", "Тип поиска"),
+    ("is[last_name]", "Фамилия"),
+    ("is[first_name]", "Имя"),
+    ("is[patronymic]", "Отчество"),
+    ("is[date]", "Дата рождения"),
+    ("is[region_id][0]", "Регион"),
+    ("is[ip_number]", "Номер ИП"),
+    ("is[inn]", "ИНН"),
+)
+
+_FORM_SCRIPT = """
+(() => {
+  const form = document.getElementById("search-form");
+  const popup = document.getElementById("captcha-container");
+  const results = document.getElementById("search-results");
+
+  async function search(code) {
+    const params = new URLSearchParams(new FormData(form));
+    params.set("system", "ip");
+    params.set("is[extended]", "1");
+    params.set("nocache", "1");
+    if (code !== undefined) params.set("code", code);
+    const response = await fetch("/ajax_search?" + params.toString(), {credentials: "same-origin"});
+    const payload = await response.json();
+    if (payload.data.includes("capchaVisualImage")) {
+      popup.innerHTML = payload.data;
+      results.innerHTML = "";
+    } else {
+      popup.innerHTML = "";
+      results.innerHTML = payload.data;
+    }
+  }
+
+  document.addEventListener("click", (event) => {
+    if (event.target.id === "captcha-popup-submit") {
+      search(document.getElementById("captcha-popup-code").value);
+    }
+  });
+
+  // Как на сайте: капча периодически обновляется сама
+  setInterval(async () => {
+    const image = document.getElementById("capchaVisualImage");
+    if (!image) return;
+    const response = await fetch("/simulator/captcha/refresh", {credentials: "same-origin"});
+    image.src = (await response.json()).src;
+  }, REFRESH_MS);
+
+  if (AUTO_SEARCH) search();
+})();
+"""
+
+
+def query_params(params: list[tuple[str, str]]) -> list[tuple[str, str]]:
+    """Параметры, определяющие запрос (поля формы `is[...]`, кроме служебных)."""
+    return sorted(
+        (name, value) for name, value in params if name.startswith("is[") and name != "is[extended]" and value
+    )
+
+
+def result_rows(params: list[tuple[str, str]], config: SimulatorConfig) -> list[dict]:
+    """Детерминированный набор производств для запроса: один и тот же запрос — одни и те же строки."""
+    digest = sha256(f"{config.seed}|{urlencode(params)}".encode()).digest()
+    rng = random.Random(digest)
+    variant = dict(params).get("is[variant]")
+    if variant == "3":
+        count = 0 if rng.random() < config.empty_rate else 1
+    else:
+        count = 0 if rng.random() < config.empty_rate else rng.randint(1, config.rows_max)
+    return [_row(rng, index) for index in range(count)]
+
+
+def _row(rng: random.Random, index: int) -> dict:
+    region_code = rng.choice((77, 50, 78, 54, 16))
+    if rng.random() < 0.5:
+        debtor = f'{rng.choice(_LAST_NAMES)} ТЕСТ ТЕСТОВИЧ<br>{rng.randint(1, 28):02d}.{rng.randint(1, 12):02d}.19{rng.randint(50, 99)}'
+    else:
+        debtor = f'ООО "ОБРАЗЕЦ-{rng.randint(1, 9999)}"<br>{rng.randint(100000, 199999)}, Г. ОБРАЗЕЦ'
+    ended = rng.random() < 0.3
+    return {
+        "region": _REGIONS[index // 25 % len(_REGIONS)],
+        "cells": (
+            debtor,
+            f"{rng.randint(10000, 999999)}/2{rng.randint(1, 4)}/{region_code}001-ИП от {rng.randint(1, 28):02d}.{rng.randint(1, 12):02d}.2023",
+            f"Судебный приказ от {rng.randint(1, 28):02d}.0{rng.randint(1, 9)}.2022 № 2-{rng.randint(1, 9999)}/2022",
+            f"{rng.randint(1, 28):02d}.0{rng.randint(1, 9)}.2024<br>ст. 46 ч. 1 п. 3" if ended else "",
+            "" if ended else '<a class="btn-pay" href="#">Оплатить</a>',
+            f"Задолженность: {rng.randint(100, 999999)}.{rng.randint(0, 99):02d} руб.",
+            f"ОСП ПО ТЕСТОВОМУ РАЙОНУ<br>{rng.randint(100000, 199999)}, Г. ОБРАЗЕЦ",
+            f'{rng.choice(_LAST_NAMES)} А. Б.<br><span class="tel">+7(000)000-00-{rng.randint(0, 99):02d}</span>',
+        ),
+    }
+
+
+def render_results(rows: list[dict], page: int, params: list[tuple[str, str]], config: SimulatorConfig) -> str:
+    pages = max(1, -(-len(rows) // config.rows_per_page))
+    if not rows:
+        return '<div class="results"><div class="empty">По вашему запросу ничего не найдено</div></div>'
+
+    start = (page - 1) * config.rows_per_page
+    body = ["<tr>" + "".join(f"<th>{escape(title)}</th>" for title in _HEADERS) + "</tr>"]
+    region = None
+    for row in rows[start : start + config.rows_per_page]:
+        if row["region"] != region:
+            region = row["region"]
+            body.append(f'<tr class="region-title"><td colspan="8"><h3>{escape(region)}</h3></td></tr>')
+        body.append("<tr>" + "".join(f"<td>{cell}</td>" for cell in row["cells"]) + "</tr>")
+
+    return (
+        '<div class="results"><div class="results-frame"><table class="list border table alt-p05"><tbody>'
+        + "".join(body)
+        + "</tbody></table></div>"
+        + _pagination(page, pages, params)
+        + "</div>"
+    )
+
+
+def _pagination(page: int, pages: int, params: list[tuple[str, str]]) -> str:
+    if pages == 1:
+        return ""
+    # Как на сайте: видно только окно соседних страниц
+    links = []
+    for number in range(max(1, page - 4), min(pages, page + 4) + 1):
+        if number == page:
+            links.append(f'<span class="current">{number}</span>')
+        else:
+            href = "/ajax_search?" + urlencode([("system", "ip"), *params, ("page", str(number))])
+            links.append(f'<a href="{escape(href)}">{number}</a>')
+    return '<div class="pagination">' + "".join(links) + "</div>"
+
+
+def render_captcha_popup(src: str, size: tuple[int, int]) -> str:
+    width, height = size
+    return (
+        '<div id="captcha-popup" class="popup">'
+        "<p>Введите код с картинки</p>"
+        f'<img id="capchaVisualImage" src="{escape(src)}" width="{width}" height="{height}" alt="">'
+        '<input id="captcha-popup-code" name="code" type="text" autocomplete="off">'
+        '<button type="button" id="captcha-popup-submit">Отправить</button>'
+        "</div>"
+    )
+
+
+def render_captcha_limit() -> str:
+    return f'<div class="results"><div class="empty">{CAPTCHA_LIMIT_MESSAGE}. Повторите попытку позже.</div></div>'
+
+
+def render_form(params: list[tuple[str, str]], popup: str, auto_search: bool, config: SimulatorConfig) -> str:
+    values = dict(params)
+    fields = "".join(
+        f'<label>{escape(label)} <input name="{escape(name)}" value="{escape(values.get(name, ""))}"></label>'
+        for name, label in _FORM_FIELDS
+    )
+    script = _FORM_SCRIPT.replace("REFRESH_MS", str(int(config.captcha_refresh_s * 1000))).replace(
+        "AUTO_SEARCH", json.dumps(auto_search)
+    )
+    return (
+        '<!DOCTYPE html><html lang="ru"><head><meta charset="utf-8">'
+        "<title>Банк данных исполнительных производств (симулятор)</title></head><body>"
+        f'<form id="search-form" onsubmit="return false">{fields}</form>'
+        f'<div id="captcha-container">{popup}</div>'
+        '<div id="search-results"></div>'
+        f"<script>{script}</script>"
+        "</body></html>"
+    )
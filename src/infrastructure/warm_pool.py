@@ -0,0 +1,166 @@
+import asyncio
+from contextlib import suppress
+from dataclasses import dataclass, field
+import time
+
+from playwright.async_api import BrowserContext, Page
+import structlog
+
+from src.infrastructure.browser import BrowserManager
+from src.infrastructure.captcha import CaptchaAnswer, CaptchaSolver
+from src.infrastructure.config import Settings
+from src.infrastructure.fssp_page import open_search_page, solve_captcha
+
+
+logger = structlog.get_logger()
+
+
+@dataclass
+class WarmPage:
+    """Открытая форма поиска ФССП с уже решенной (но не отправленной) капчей."""
+
+    context: BrowserContext
+    page: Page
+    answer: CaptchaAnswer | None = None
+    solved_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.solved_at
+
+
+class CaptchaPagePool:
+    """Фоновый пул страниц с заранее решенной капчей.
+
+    Держит `warm_pool.size` страниц на форме поиска: входящему запросу остается
+    только заполнить поля и нажать «Отправить». Страницы старше `max_age_s`
+    считаются протухшими и заменяются новыми. Каждая страница занимает
+    контекст из пула `BrowserManager`.
+    """
+
+    def __init__(self, browser: BrowserManager, solver: CaptchaSolver, settings: Settings):
+        self._browser = browser
+        self._solver = solver
+        self._settings = settings
+        self._config = settings.warm_pool
+        self._ready: list[WarmPage] = []
+        self._preparing = 0
+        self._wakeup = asyncio.Event()
+        self._loop_task: asyncio.Task | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self._closed = False
+        self._hits = 0
+        self._misses = 0
+        self._stale = 0
+        self._failures = 0
+
+        # Пул не должен занимать все контексты браузера, иначе холодным запросам не хватит слотов
+        max_size = settings.browser.pool_size - 1
+        if self._config.size > max_size:
+            logger.warning(
+                "Размер пула прогретых страниц уменьшен до размера пула браузера минус один",
+                requested=self._config.size,
+                size=max_size,
+            )
+        self._size = max(0, min(self._config.size, max_size))
+
+    async def start(self) -> None:
+        if self._loop_task is None and self._size > 0:
+            self._closed = False
+            self._loop_task = asyncio.create_task(self._refill_loop())
+
+    async def close(self) -> None:
+        self._closed = True
+        tasks = [t for t in (self._loop_task, *self._tasks) if t is not None]
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            with suppress(asyncio.CancelledError, Exception):
+                await task
+        self._loop_task = None
+        while self._ready:
+            await self.discard(self._ready.pop())
+
+    def take(self) -> WarmPage | None:
+        """Забирает свежую прогретую страницу или возвращает None (промах)."""
+        warm = None
+        while self._ready:
+            candidate = self._ready.pop(0)
+            if candidate.age <= self._config.max_age_s:
+                warm = candidate
+                break
+            self._drop(candidate)
+
+        if warm is None:
+            self._misses += 1
+        else:
+            self._hits += 1
+        self._wakeup.set()
+        return warm
+
+    async def discard(self, warm: WarmPage) -> None:
+        """Возвращает контекст страницы в пул браузера (страница одноразовая)."""
+        await self._browser.release(warm.context)
+
+    def stats(self) -> dict:
+        total = self._hits + self._misses
+        return {
+            "size": self._size,
+            "ready": len(self._ready),
+            "preparing": self._preparing,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / total, 4) if total else None,
+            "stale_discarded": self._stale,
+            "failures": self._failures,
+        }
+
+    async def _refill_loop(self) -> None:
+        while not self._closed:
+            for warm in [w for w in self._ready if w.age > self._config.max_age_s]:
+                self._ready.remove(warm)
+                self._drop(warm)
+
+            missing = self._size - len(self._ready) - self._preparing
+            while missing > 0 and self._preparing < self._config.refill_concurrency:
+                missing -= 1
+                self._preparing += 1
+                self._spawn(self._prepare_one())
+
+            self._wakeup.clear()
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout=1)
+
+    async def _prepare_one(self) -> None:
+        context = None
+        try:
+            context = await self._browser.acquire()
+            page = await context.new_page()
+            browser_cfg = self._settings.browser
+            await open_search_page(page, self._settings.urls.form, browser_cfg)
+            answer = await solve_captcha(page, self._solver, browser_cfg)
+            self._ready.append(WarmPage(context=context, page=page, answer=answer))
+            logger.debug("Подготовлена страница с решенной капчей", ready=len(self._ready))
+        except asyncio.CancelledError:
+            if context is not None:
+                await self._browser.release(context)
+            raise
+        except Exception as exc:  # noqa: BLE001
+            self._failures += 1
+            logger.warning("Не удалось подготовить страницу с капчей", error=str(exc))
+            if context is not None:
+                await self._browser.release(context)
+            # Не долбим сайт в цикле при его недоступности
+            await asyncio.sleep(self._config.retry_delay_s)
+        finally:
+            self._preparing -= 1
+            self._wakeup.set()
+
+    def _drop(self, warm: WarmPage) -> None:
+        self._stale += 1
+        self._spawn(self.discard(warm))
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
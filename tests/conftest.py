@@ -0,0 +1,81 @@
+"""Общие фикстуры тестов поведения и запуск асинхронных тестов без плагинов."""
+import asyncio
+import inspect
+from collections.abc import Callable
+
+import httpx
+import pytest
+
+from src.infrastructure.config import CaptchaCacheConfig, CaptchaConfig, JobsConfig, LimiterConfig, SimulatorConfig
+from src.infrastructure.simulator.app import create_simulator_app
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem: pytest.Function) -> bool | None:
+    """`async def test_...` выполняется в собственном event loop, как под `asyncio.run`."""
+    if not inspect.iscoroutinefunction(pyfuncitem.obj):
+        return None
+    kwargs = {name: pyfuncitem.funcargs[name] for name in pyfuncitem._fixtureinfo.argnames}
+    asyncio.run(pyfuncitem.obj(**kwargs))
+    return True
+
+
+@pytest.fixture
+def simulator() -> Callable[..., tuple[httpx.ASGITransport, SimulatorConfig]]:
+    """Симулятор ФССП в процессе: транспорт httpx и конфиг; по умолчанию без задержек и пустых выдач."""
+
+    def build(**overrides) -> tuple[httpx.ASGITransport, SimulatorConfig]:
+        config = SimulatorConfig(
+            **{
+                "latency_ms": 0,
+                "latency_jitter_ms": 0,
+                "empty_rate": 0,
+                "solver_latency_ms": 100,
+                "solver_latency_jitter_ms": 0,
+                **overrides,
+            }
+        )
+        return httpx.ASGITransport(app=create_simulator_app(config)), config
+
+    return build
+
+
+@pytest.fixture
+def jobs_config(tmp_path) -> Callable[..., JobsConfig]:
+    """Очередь заданий в `tmp_path` с одним воркером и без пауз между попытками."""
+
+    def build(**overrides) -> JobsConfig:
+        defaults = {"sqlite_path": tmp_path / "jobs.sqlite3", "workers": 1, "retry_delay_s": 0, "poll_interval_s": 0.01}
+        return JobsConfig(**{**defaults, **overrides})
+
+    return build
+
+
+@pytest.fixture
+def captcha_config() -> Callable[..., CaptchaConfig]:
+    """Настройки решателя капчи с тестовым ключом провайдера."""
+
+    def build(**overrides) -> CaptchaConfig:
+        return CaptchaConfig(**{"api_key": "test", **overrides})
+
+    return build
+
+
+@pytest.fixture
+def captcha_cache_config() -> Callable[..., CaptchaCacheConfig]:
+    """Кэш ответов капчи только в памяти: по умолчанию он писал бы в `data/` рабочей копии."""
+
+    def build(**overrides) -> CaptchaCacheConfig:
+        return CaptchaCacheConfig(**{"sqlite_path": None, **overrides})
+
+    return build
+
+
+@pytest.fixture
+def limiter_config() -> Callable[..., LimiterConfig]:
+    """Лимитер без паузы между снижениями лимита."""
+
+    def build(**overrides) -> LimiterConfig:
+        return LimiterConfig(**{"initial_limit": 2, "backoff_cooldown_s": 0, **overrides})
+
+    return build
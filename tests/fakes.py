@@ -0,0 +1,123 @@
+"""Фейки браузера и решателя капчи, общие для тестов поведения."""
+import asyncio
+
+import httpx
+
+from src.infrastructure.captcha import CaptchaAnswer, CaptchaSolver
+from src.infrastructure.simulator.captcha_image import read_code
+
+
+class Clock:
+    """Подменяемые часы: тест двигает `now` вручную."""
+
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeSolver(CaptchaSolver):
+    """Решатель с фиксированным кодом; без `code` читает код с картинки симулятора."""
+
+    name = "fake"
+
+    def __init__(self, code: str | None = None, length: int = 5):
+        self._code = code
+        self._length = length
+        self.solved = 0
+        self.reported_correct = 0
+        self.reported_incorrect = 0
+        self.closed = 0
+
+    async def solve(self, image: bytes) -> CaptchaAnswer:
+        self.solved += 1
+        code = self._code if self._code is not None else read_code(image, self._length)
+        return CaptchaAnswer(code=code, backend=self.name)
+
+    async def report_correct(self, answer: CaptchaAnswer) -> None:
+        self.reported_correct += 1
+
+    async def report_incorrect(self, answer: CaptchaAnswer) -> None:
+        self.reported_incorrect += 1
+
+    def stats(self) -> dict:
+        return {"solved": self.solved, "failed": 0, "reported_incorrect": self.reported_incorrect}
+
+    async def close(self) -> None:
+        self.closed += 1
+
+
+class FakePage:
+    def __init__(self):
+        self.closed = False
+
+    def is_closed(self) -> bool:
+        return self.closed
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class FakeContext:
+    def __init__(self):
+        self.pages: list[FakePage] = []
+        self.closed = False
+
+    async def new_page(self) -> FakePage:
+        page = FakePage()
+        self.pages.append(page)
+        return page
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class FakeBrowser:
+    """`BrowserManager` с `slots` слотами: контекст занимает слот до `release`."""
+
+    def __init__(self, slots: int):
+        self._slots = asyncio.Semaphore(slots)
+        self.opened = 0
+        self.released = 0
+
+    async def acquire(self) -> FakeContext:
+        await self._slots.acquire()
+        self.opened += 1
+        return FakeContext()
+
+    async def release(self, context: FakeContext) -> None:
+        self.released += 1
+        await context.close()
+        self._slots.release()
+
+    def is_healthy(self, context: FakeContext) -> bool:
+        return not context.closed
+
+
+class FakeChromium:
+    """Запущенный Chromium: создает `FakeContext` и «падает», если сбросить `connected`."""
+
+    def __init__(self):
+        self.connected = True
+        self.contexts: list[FakeContext] = []
+
+    def is_connected(self) -> bool:
+        return self.connected
+
+    async def new_context(self, **options) -> FakeContext:
+        context = FakeContext()
+        self.contexts.append(context)
+        return context
+
+    def on(self, event: str, callback) -> None:
+        return None
+
+    async def close(self) -> None:
+        self.connected = False
+
+
+async def simulator_stats(transport: httpx.AsyncBaseTransport) -> dict:
+    """Счетчики симулятора (`GET /simulator/stats`)."""
+    async with httpx.AsyncClient(transport=transport, base_url="http://simulator") as client:
+        return (await client.get("/simulator/stats")).json()
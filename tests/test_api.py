@@ -0,0 +1,142 @@
+"""HTTP API поверх подменного сервиса: пакетный поиск NDJSON, ошибки, обрезка результатов и healthcheck."""
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from src.domain import DebtorCaseList, Inn, IpNumber, SearchQuery
+from src.domain.errors import CaptchaLimitExceeded, EmptyResult
+from src.infrastructure.config import BatchConfig, Settings
+from src.infrastructure.http.app import create_app
+from src.infrastructure.http.schemas import BatchResultLine
+
+
+ROW = {
+    "region": "Москва",
+    "debtor": "ИВАНОВ ИВАН",
+    "ip": "12345/23/77001-ИП",
+    "doc": "Судебный приказ",
+    "debt": "Задолженность: 100 руб.",
+    "office": "ОСП",
+    "bailiff": "ПЕТРОВ П. П.",
+}
+
+
+class FakeService:
+    """`FsspService` без сайта: ответ по ИНН задает `results`, задержку — `delays`."""
+
+    def __init__(self):
+        self.results: dict[str, DebtorCaseList | Exception] = {}
+        self.delays: dict[str, float] = {}
+        self.healthy = True
+        self.running = 0
+        self.max_running = 0
+
+    async def search(self, query: SearchQuery, fresh: bool = False) -> DebtorCaseList:
+        key = query.inn if isinstance(query, Inn) else type(query).__name__
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(self.delays.get(key, 0.01))
+        finally:
+            self.running -= 1
+        result = self.results.get(key, DebtorCaseList.from_rows([ROW]))
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def by_ip(self, ip_number: IpNumber, fresh: bool = False) -> DebtorCaseList:
+        return await self.search(ip_number, fresh)
+
+    async def health_check(self) -> bool:
+        return self.healthy
+
+    def stats(self) -> dict:
+        return {}
+
+
+@pytest.fixture
+def api():
+    service = FakeService()
+    app = create_app(Settings(RUCAPTCH_API_KEY="test", batch=BatchConfig(concurrency=2, max_queries=10)))
+    # ASGITransport не выполняет lifespan: сервис подставляется вместо собранного фабрикой
+    app.state.fssp_service = service
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://api")
+    return client, service
+
+
+def _inn(value: str) -> dict:
+    return {"type": "inn", "inn": value}
+
+
+async def test_batch_streams_lines_as_results_are_ready(api):
+    client, service = api
+    service.delays["7707083893"] = 0.2
+    service.results["500100732259"] = EmptyResult("ничего не найдено")
+    service.results["7736050003"] = CaptchaLimitExceeded("лимит попыток капчи")
+    queries = [_inn("7707083893"), _inn("500100732259"), _inn("7736050003"), {"type": "ip", "ip": "12345/23/77001-ИП"}]
+
+    async with client:
+        response = await client.post("/api/batch", json={"queries": queries})
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [BatchResultLine.model_validate(json.loads(line)) for line in response.text.splitlines()]
+    assert sorted(line.index for line in lines) == [0, 1, 2, 3]
+    # Медленный первый запрос не задерживает остальные строки
+    assert lines[-1].index == 0
+    by_index = {line.index: line for line in lines}
+    assert by_index[0].status == by_index[3].status == 200
+    assert by_index[0].items[0].ip == ROW["ip"]
+    assert by_index[1].status == 502
+    assert by_index[1].error.error_type == "EmptyResult"
+    assert by_index[2].status == 429
+    assert by_index[2].error.error_code == "CAPTCHA_LIMIT_EXCEEDED"
+
+
+async def test_batch_concurrency_is_capped_by_settings(api):
+    client, service = api
+    queries = [_inn("7707083893")] * 8
+
+    async with client:
+        response = await client.post("/api/batch", json={"queries": queries, "concurrency": 100})
+
+    assert len(response.text.splitlines()) == 8
+    assert service.max_running == 2
+
+
+async def test_batch_over_the_limit_is_rejected(api):
+    client, _ = api
+
+    async with client:
+        response = await client.post("/api/batch", json={"queries": [_inn("7707083893")] * 11})
+
+    assert response.status_code == 413
+
+
+async def test_truncated_results_are_marked(api):
+    client, service = api
+    truncated = DebtorCaseList.from_rows([ROW], truncated=True)
+    service.results["IpNumber"] = truncated
+    service.results["7707083893"] = truncated
+
+    async with client:
+        single = await client.post("/api/ip", json={"ip": "12345/23/77001-ИП"})
+        batch = await client.post("/api/batch", json={"queries": [_inn("7707083893"), _inn("7736050003")]})
+
+    assert single.headers["x-results-truncated"] == "true"
+    assert single.json()[0]["ip"] == ROW["ip"]
+    lines = {line["index"]: line for line in map(json.loads, batch.text.splitlines())}
+    assert (lines[0]["truncated"], lines[1]["truncated"]) == (True, False)
+
+
+async def test_healthcheck_reports_unhealthy_engine(api):
+    client, service = api
+
+    async with client:
+        healthy = await client.get("/api/healthcheck")
+        service.healthy = False
+        unhealthy = await client.get("/api/healthcheck")
+
+    assert (healthy.status_code, healthy.json()) == (200, {"status": "ok"})
+    assert (unhealthy.status_code, unhealthy.json()) == (503, {"status": "unavailable"})
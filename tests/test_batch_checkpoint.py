@@ -0,0 +1,97 @@
+"""Входные файлы пакетного поиска CLI и контрольная точка для возобновления."""
+import json
+
+import pytest
+
+from src.domain import Inn, IpNumber, Person
+from src.infrastructure.batch_files import Checkpoint, count_rows, read_rows, row_to_query
+
+
+def _line(index: int) -> str:
+    return json.dumps({"index": index, "success": True}) + "\n"
+
+
+@pytest.fixture
+def input_file(tmp_path):
+    path = tmp_path / "queries.csv"
+    path.write_text(
+        "type,ip,inn,last_name,first_name,birthday\n"
+        ",12345/23/77001-ИП,,,,\n"
+        ",,7707083893,,,\n"
+        ",,,Иванов,Иван,01.01.1980\n",
+        encoding="utf-8",
+    )
+    return path
+
+
+def test_rows_are_read_and_typed_by_filled_columns(input_file):
+    rows = list(read_rows(input_file))
+
+    assert [row.index for row in rows] == [0, 1, 2]
+    assert count_rows(input_file) == 3
+    assert [type(row_to_query(row.data)) for row in rows] == [IpNumber, Inn, Person]
+
+
+def test_jsonl_skips_blank_lines(tmp_path):
+    path = tmp_path / "queries.jsonl"
+    path.write_text('{"ip": "12345/23/77001-ИП"}\n\n{"inn": "7707083893"}\n', encoding="utf-8")
+
+    assert [row.index for row in read_rows(path)] == [0, 1]
+    assert count_rows(path) == 2
+
+
+def test_watermark_advances_over_contiguous_rows(tmp_path):
+    checkpoint = Checkpoint(path=tmp_path / "out.checkpoint.json", input="queries.csv")
+
+    for index in (0, 2, 3, 1, 5):
+        checkpoint.mark(index)
+
+    assert checkpoint.watermark == 4
+    assert checkpoint.done == {5}
+    assert checkpoint.completed == 5
+    assert checkpoint.is_done(3) and checkpoint.is_done(5)
+    assert not checkpoint.is_done(4)
+
+
+def test_resume_restores_saved_state(tmp_path, input_file):
+    output = tmp_path / "out.jsonl"
+    checkpoint = Checkpoint.load(output, input_file)
+    with output.open("a", encoding="utf-8") as out:
+        for index in (0, 2):
+            out.write(_line(index))
+            checkpoint.mark(index)
+        checkpoint.save(out.tell())
+
+    resumed = Checkpoint.load(output, input_file)
+
+    assert resumed.watermark == 1
+    assert resumed.done == {2}
+    assert not resumed.is_done(1)
+
+
+def test_rows_written_after_last_save_are_recovered_and_partial_line_dropped(tmp_path, input_file):
+    output = tmp_path / "out.jsonl"
+    checkpoint = Checkpoint.load(output, input_file)
+    with output.open("a", encoding="utf-8") as out:
+        out.write(_line(0))
+        checkpoint.mark(0)
+        checkpoint.save(out.tell())
+        # Процесс упал: строка 1 дописана после сохранения, строка 2 — не до конца
+        out.write(_line(1))
+        out.write(_line(2)[:10])
+
+    resumed = Checkpoint.load(output, input_file)
+
+    assert resumed.watermark == 2
+    assert not resumed.is_done(2)
+    assert output.read_text(encoding="utf-8") == _line(0) + _line(1)
+
+
+def test_checkpoint_of_another_input_is_rejected(tmp_path, input_file):
+    output = tmp_path / "out.jsonl"
+    Checkpoint.load(output, input_file).save(0)
+    other = tmp_path / "other.csv"
+    other.write_text("ip\n", encoding="utf-8")
+
+    with pytest.raises(ValueError, match="другому входному файлу"):
+        Checkpoint.load(output, other)
@@ -0,0 +1,118 @@
+"""Долгоживущий браузер: общий Chromium, ограниченный пул контекстов и перезапуск после падения."""
+import asyncio
+
+import pytest
+
+from src.domain.errors import FsspUnavailable
+from src.infrastructure.browser import BrowserManager
+from src.infrastructure.config import BrowserConfig
+
+from tests.fakes import FakeChromium
+
+
+class FakePlaywright:
+    """`async_playwright()`: каждый `chromium.launch` запускает новый `FakeChromium`."""
+
+    def __init__(self):
+        self.chromium = self
+        self.browsers: list[FakeChromium] = []
+        self.launch_error: Exception | None = None
+        self.stopped = False
+
+    def __call__(self) -> "FakePlaywright":
+        return self
+
+    async def start(self) -> "FakePlaywright":
+        return self
+
+    async def launch(self, **options) -> FakeChromium:
+        if self.launch_error is not None:
+            raise self.launch_error
+        browser = FakeChromium()
+        self.browsers.append(browser)
+        return browser
+
+    async def stop(self) -> None:
+        self.stopped = True
+
+
+@pytest.fixture
+def playwright(monkeypatch) -> FakePlaywright:
+    playwright = FakePlaywright()
+    monkeypatch.setattr("src.infrastructure.browser.async_playwright", playwright)
+    return playwright
+
+
+def _manager(pool_size: int = 2) -> BrowserManager:
+    return BrowserManager(BrowserConfig(pool_size=pool_size, block_resources=False))
+
+
+async def test_contexts_share_one_browser(playwright):
+    manager = _manager(pool_size=2)
+
+    first, second = await manager.acquire(), await manager.acquire()
+    await manager.release(first)
+    async with manager.context() as third:
+        assert manager.stats()["contexts_in_use"] == 2
+
+    assert len(playwright.browsers) == 1
+    assert first is not second
+    assert first.closed and third.closed and not second.closed
+    stats = manager.stats()
+    assert (stats["launches"], stats["restarts"], stats["contexts_in_use"]) == (1, 0, 1)
+
+
+async def test_pool_size_bounds_open_contexts(playwright):
+    manager = _manager(pool_size=1)
+    first = await manager.acquire()
+
+    # Второй контекст ждет свободного слота; отмененное ожидание слот не занимает
+    with pytest.raises(TimeoutError):
+        await asyncio.wait_for(manager.acquire(), timeout=0.05)
+    waiting = asyncio.ensure_future(manager.acquire())
+    await asyncio.sleep(0)
+    assert not waiting.done()
+    await manager.release(first)
+
+    second = await asyncio.wait_for(waiting, timeout=1)
+
+    assert second is not first
+    assert manager.stats()["contexts_in_use"] == 1
+
+
+async def test_crashed_browser_is_relaunched(playwright):
+    manager = _manager()
+    await manager.start()
+    playwright.browsers[0].connected = False
+
+    assert await manager.health_check()
+    context = await manager.acquire()
+
+    assert len(playwright.browsers) == 2
+    assert context is playwright.browsers[1].contexts[0]
+    stats = manager.stats()
+    assert (stats["launches"], stats["restarts"], stats["connected"]) == (2, 1, True)
+
+
+async def test_launch_failure_is_unhealthy_and_frees_the_slot(playwright):
+    manager = _manager(pool_size=1)
+    playwright.launch_error = RuntimeError("chromium не найден")
+
+    assert not await manager.health_check()
+    with pytest.raises(FsspUnavailable):
+        await manager.acquire()
+
+    playwright.launch_error = None
+    context = await asyncio.wait_for(manager.acquire(), timeout=1)
+    assert context is playwright.browsers[0].contexts[0]
+
+
+async def test_close_stops_browser_and_playwright(playwright):
+    manager = _manager()
+    await manager.start()
+
+    await manager.close()
+
+    assert not playwright.browsers[0].connected
+    assert playwright.stopped
+    assert not manager.stats()["connected"]
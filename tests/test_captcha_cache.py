@@ -0,0 +1,112 @@
+"""Кэш проверенных ответов капчи и решатель за ним."""
+import random
+
+from src.infrastructure.captcha import CachingCaptchaSolver
+from src.infrastructure.captcha_cache import CaptchaAnswerCache, image_key
+from src.infrastructure.png import GrayImage, decode_gray, encode_gray
+from src.infrastructure.simulator.captcha_image import render_code
+
+from tests.fakes import FakeSolver
+
+
+def _captcha(code: str, seed: int = 0) -> bytes:
+    return render_code(code, random.Random(seed))
+
+
+def _recompressed(image: bytes) -> bytes:
+    """Та же картинка с другими байтами: несколько пикселей шума изменены."""
+    gray = decode_gray(image)
+    pixels = bytearray(gray.pixels)
+    for index in range(0, len(pixels), 97):
+        pixels[index] = min(255, pixels[index] + 3)
+    return encode_gray(GrayImage(width=gray.width, height=gray.height, pixels=bytes(pixels)))
+
+
+async def test_exact_and_perceptual_hits(captcha_cache_config):
+    cache = CaptchaAnswerCache(captcha_cache_config())
+    image = _captcha("12345")
+    await cache.put(image_key(image), "12345")
+
+    lookups = [cache.get(image_key(image)), cache.get(image_key(_recompressed(image))), cache.get(image_key(_captcha("67890")))]
+
+    assert lookups == ["12345", "12345", None]
+    stats = cache.stats()
+    assert (stats["exact_hits"], stats["perceptual_hits"], stats["misses"]) == (1, 1, 1)
+
+
+async def test_discard_removes_similar_entries(captcha_cache_config):
+    cache = CaptchaAnswerCache(captcha_cache_config())
+    image = _captcha("12345")
+    await cache.put(image_key(image), "12345")
+
+    await cache.discard(image_key(_recompressed(image)))
+
+    assert cache.get(image_key(image)) is None
+    stats = cache.stats()
+    assert stats["discarded"] == 1
+    assert stats["entries"] == 0
+
+
+async def test_least_recently_used_answer_is_evicted(captcha_cache_config):
+    cache = CaptchaAnswerCache(captcha_cache_config(max_entries=2))
+    images = {code: _captcha(code) for code in ("11111", "22222", "33333")}
+    await cache.put(image_key(images["11111"]), "11111")
+    await cache.put(image_key(images["22222"]), "22222")
+    cache.get(image_key(images["11111"]))
+    await cache.put(image_key(images["33333"]), "33333")
+
+    assert {code: cache.get(image_key(image)) for code, image in images.items()} == {
+        "11111": "11111",
+        "22222": None,
+        "33333": "33333",
+    }
+
+
+async def test_sqlite_keeps_answers_between_restarts(captcha_cache_config, tmp_path):
+    config = captcha_cache_config(sqlite_path=tmp_path / "captcha.sqlite3")
+    image = _captcha("12345")
+    cache = CaptchaAnswerCache(config)
+    await cache.put(image_key(image), "12345")
+    await cache.close()
+
+    restarted = CaptchaAnswerCache(config)
+    try:
+        assert restarted.get(image_key(_recompressed(image))) == "12345"
+    finally:
+        await restarted.close()
+
+
+async def test_only_accepted_answers_are_reused(captcha_cache_config):
+    provider = FakeSolver("12345")
+    solver = CachingCaptchaSolver(provider, CaptchaAnswerCache(captcha_cache_config()))
+    image = _captcha("12345")
+
+    rejected = await solver.solve(image)
+    await solver.report_incorrect(rejected)
+    accepted = await solver.solve(image)
+    await solver.report_correct(accepted)
+    cached = await solver.solve(image)
+
+    # Неверный ответ провайдера в кэш не попал, принятый — попал
+    assert provider.solved == 2
+    assert provider.reported_incorrect == 1
+    assert cached.backend == "cache"
+    assert cached.code == "12345"
+
+
+async def test_rejected_cached_answer_is_discarded(captcha_cache_config):
+    provider = FakeSolver("12345")
+    cache = CaptchaAnswerCache(captcha_cache_config())
+    solver = CachingCaptchaSolver(provider, cache)
+    image = _captcha("12345")
+    await solver.report_correct(await solver.solve(image))
+
+    cached = await solver.solve(image)
+    await solver.report_incorrect(cached)
+    again = await solver.solve(image)
+
+    assert cached.backend == "cache"
+    assert again.backend == "fake"
+    # Жалоба на ответ из кэша не уходит провайдеру
+    assert provider.reported_incorrect == 0
+    assert cache.stats()["discarded"] == 1
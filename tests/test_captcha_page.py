@@ -0,0 +1,108 @@
+"""Капча на странице браузера: изображение идет решателю в памяти, файлы пишутся только для отладки."""
+import asyncio
+
+from src.infrastructure.config import BrowserConfig
+from src.infrastructure.fssp_page import CAPTCHA_INPUT_SELECTOR, save_debug_artifacts, solve_captcha
+
+from tests.fakes import FakeSolver
+
+
+PNG = b"\x89PNG captcha"
+
+
+class FakeElement:
+    def __init__(self):
+        self.screenshots: list[dict] = []
+
+    async def screenshot(self, **options) -> bytes:
+        self.screenshots.append(options)
+        return PNG
+
+    async def evaluate(self, script: str) -> None:
+        return None
+
+
+class FakeLocator:
+    def __init__(self, page: "FakeCaptchaPage", selector: str):
+        self._page = page
+        self._selector = selector
+
+    async def click(self) -> None:
+        return None
+
+    async def fill(self, value: str) -> None:
+        self._page.filled[self._selector] = value
+
+
+class FakeCaptchaPage:
+    """Форма поиска с картинкой капчи и полем для кода."""
+
+    def __init__(self):
+        self.captcha = FakeElement()
+        self.filled: dict[str, str] = {}
+        self.screenshots: list[dict] = []
+
+    async def wait_for_selector(self, selector: str, timeout: float) -> FakeElement:
+        return self.captcha
+
+    async def evaluate(self, script: str) -> None:
+        return None
+
+    def locator(self, selector: str) -> FakeLocator:
+        return FakeLocator(self, selector)
+
+    async def screenshot(self, **options) -> bytes:
+        self.screenshots.append(options)
+        return PNG
+
+
+class RecordingSolver(FakeSolver):
+    def __init__(self):
+        super().__init__(code="54321")
+        self.images: list[bytes] = []
+
+    async def solve(self, image: bytes):
+        self.images.append(image)
+        return await super().solve(image)
+
+
+async def test_captcha_image_goes_to_solver_in_memory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    page, solver = FakeCaptchaPage(), RecordingSolver()
+
+    answer = await solve_captcha(page, solver, BrowserConfig())
+
+    assert solver.images == [PNG]
+    # Скриншот элемента без `path`: байты не проходят через общий временный файл
+    assert page.captcha.screenshots == [{}]
+    assert page.screenshots == []
+    assert answer.code == "54321"
+    assert page.filled == {CAPTCHA_INPUT_SELECTOR: "54321"}
+    assert list(tmp_path.iterdir()) == []
+
+
+async def test_concurrent_captchas_do_not_share_state(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    pages = [FakeCaptchaPage() for _ in range(5)]
+    solver = RecordingSolver()
+
+    await asyncio.gather(*(solve_captcha(page, solver, BrowserConfig()) for page in pages))
+
+    assert len(solver.images) == 5
+    assert all(page.filled == {CAPTCHA_INPUT_SELECTOR: "54321"} for page in pages)
+    assert list(tmp_path.iterdir()) == []
+
+
+async def test_debug_artifacts_are_opt_in_and_uniquely_named(tmp_path):
+    page = FakeCaptchaPage()
+
+    await save_debug_artifacts(page, BrowserConfig(), tmp_path, "CaptchaError")
+    assert page.screenshots == []
+
+    config = BrowserConfig(debug_artifacts=True)
+    await save_debug_artifacts(page, config, tmp_path, "CaptchaError")
+    await save_debug_artifacts(page, config, tmp_path, "CaptchaError")
+
+    paths = [options["path"] for options in page.screenshots]
+    assert len(set(paths)) == 2
+    assert all(path.parent == tmp_path and path.name.startswith("error_") for path in paths)
@@ -0,0 +1,122 @@
+"""Гонка решателей капчи: первый уверенный ответ, отмена проигравших, предпочтительный решатель."""
+import asyncio
+
+import pytest
+
+from src.domain.errors import CaptchaError
+from src.infrastructure.captcha import CaptchaAnswer, CaptchaSolver, RacingCaptchaSolver
+from src.infrastructure.config import CaptchaCacheConfig, CaptchaProviderConfig, Settings
+from src.infrastructure.factory import build_captcha_solver
+
+
+class DelayedSolver(CaptchaSolver):
+    """Отвечает `code` через `delay_s` с уверенностью `confidence`; запоминает отмены."""
+
+    def __init__(self, name: str, delay_s: float, code: str = "12345", confidence: float | None = None):
+        self.name = name
+        self._delay_s = delay_s
+        self._code = code
+        self._confidence = confidence
+        self.calls = 0
+        self.cancelled = 0
+        self.reported_incorrect = 0
+
+    async def solve(self, image: bytes) -> CaptchaAnswer:
+        self.calls += 1
+        try:
+            await asyncio.sleep(self._delay_s)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return CaptchaAnswer(code=self._code, backend=self.name, confidence=self._confidence)
+
+    async def report_incorrect(self, answer: CaptchaAnswer) -> None:
+        self.reported_incorrect += 1
+
+    def stats(self) -> dict:
+        return {"solved": self.calls, "failed": 0, "reported_incorrect": self.reported_incorrect}
+
+
+async def test_unconfident_answer_does_not_win(captcha_config):
+    local = DelayedSolver("local", 0, code="99999", confidence=0.3)
+    provider = DelayedSolver("rucaptcha", 0.02)
+    race = RacingCaptchaSolver([local, provider], captcha_config(local_min_confidence=0.8))
+
+    answer = await race.solve(b"png")
+
+    assert answer.backend == "rucaptcha"
+    backends = race.stats()["backends"]
+    assert backends["local"]["unconfident"] == 1
+    # Неуверенный ответ не считается решением и не попадает в статистику задержки
+    assert backends["local"]["latency_ms"] is None
+    assert backends["rucaptcha"]["wins"] == 1
+
+
+async def test_losers_are_cancelled_once_there_is_a_winner(captcha_config):
+    fast = DelayedSolver("fast", 0)
+    slow = DelayedSolver("slow", 10)
+    race = RacingCaptchaSolver([fast, slow], captcha_config())
+
+    answer = await asyncio.wait_for(race.solve(b"png"), timeout=1)
+
+    assert answer.backend == "fast"
+    assert slow.cancelled == 1
+    assert race.stats()["backends"]["slow"]["cancelled"] == 1
+
+
+async def test_cancelled_race_cancels_every_backend(captcha_config):
+    first, second = DelayedSolver("first", 10), DelayedSolver("second", 10)
+    race = RacingCaptchaSolver([first, second], captcha_config())
+    solving = asyncio.ensure_future(race.solve(b"png"))
+    await asyncio.sleep(0.01)
+
+    solving.cancel()
+    await asyncio.gather(solving, return_exceptions=True)
+
+    assert (first.cancelled, second.cancelled) == (1, 1)
+
+
+async def test_no_confident_answer_raises_captcha_error(captcha_config):
+    race = RacingCaptchaSolver([DelayedSolver("local", 0, confidence=0.1)], captcha_config(local_min_confidence=0.8))
+
+    with pytest.raises(CaptchaError):
+        await race.solve(b"png")
+    assert race.stats()["failed"] == 1
+
+
+async def test_wrong_code_is_reported_to_its_author(captcha_config):
+    fast, slow = DelayedSolver("fast", 0), DelayedSolver("slow", 10)
+    race = RacingCaptchaSolver([fast, slow], captcha_config())
+
+    await race.report_incorrect(await race.solve(b"png"))
+
+    assert (fast.reported_incorrect, slow.reported_incorrect) == (1, 0)
+    assert race.stats()["reported_incorrect"] == 1
+
+
+async def test_reliable_backend_is_called_alone(captcha_config):
+    fast, slow = DelayedSolver("fast", 0), DelayedSolver("slow", 10)
+    config = captcha_config(race_min_samples=2, race_single_min_accuracy=0.5, race_explore_every=100)
+    race = RacingCaptchaSolver([fast, slow], config)
+    for _ in range(2):
+        await race.solve(b"png")
+
+    answer = await race.solve(b"png")
+
+    assert answer.backend == "fast"
+    assert slow.calls == 2
+    stats = race.stats()
+    assert stats["preferred"] == "fast"
+    assert stats["modes"] == {"race": 2, "single": 1}
+
+
+def test_default_race_uses_external_providers_only(captcha_config):
+    settings = Settings(
+        RUCAPTCH_API_KEY="test",
+        captcha=captcha_config(backend="race", providers=[CaptchaProviderConfig(name="anticaptcha", api_key="test")]),
+        captcha_cache=CaptchaCacheConfig(enabled=False),
+    )
+
+    solver = build_captcha_solver(settings)
+
+    assert set(solver.stats()["backends"]) == {"rucaptcha", "anticaptcha"}
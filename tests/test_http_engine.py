@@ -0,0 +1,220 @@
+"""HTTP-движок поиска против симулятора ФССП: капча, повторное использование сессий, страницы, ошибки."""
+from contextlib import aclosing
+from urllib.parse import parse_qsl, urlsplit
+
+import httpx
+import pytest
+
+from src.application.fssp_service import FsspService
+from src.domain import IpNumber, Person
+from src.domain.errors import CaptchaError, CaptchaLimitExceeded, EmptyResult, FsspUnavailable
+from src.infrastructure.captcha import CaptchaSolver
+from src.infrastructure.config import FsspUrls, HttpEngineConfig, Settings, SimulatorConfig
+from src.infrastructure.fssp_http_client import HttpFsspClient
+from src.infrastructure.metrics import REGISTRY
+from src.infrastructure.parser import LxmlHtmlParser
+from src.infrastructure.simulator.pages import query_params, result_rows
+
+from tests.fakes import FakeSolver, simulator_stats
+
+
+IP = IpNumber(ip="12345/23/77001-ИП")
+PERSON = Person(last_name="Иванов", first_name="Иван", birthday="01.01.1980")
+WRONG_CODE = "00000"
+
+
+class Engine:
+    """Сервис поиска на HTTP-движке, подключенный к симулятору в том же процессе."""
+
+    def __init__(self, transport: httpx.ASGITransport, simulator_config: SimulatorConfig, solver: CaptchaSolver):
+        self.transport = transport
+        self.simulator_config = simulator_config
+        self.settings = Settings(
+            RUCAPTCH_API_KEY="test",
+            urls=FsspUrls(ajax_search="http://simulator/ajax_search", form="http://simulator/iss/ip/"),
+        )
+        self.solver = solver
+        self.client = HttpFsspClient(solver, HttpEngineConfig(), transport=transport, health_url=self.settings.urls.form)
+        self.service = FsspService(self.settings, self.client, LxmlHtmlParser())
+
+
+def person_url(settings: Settings) -> str:
+    return settings.urls.person.format(
+        last_name=PERSON.last_name, first_name=PERSON.first_name, patronymic="", birthday=PERSON.birthday, region_id=-1
+    )
+
+
+@pytest.fixture
+def engine(simulator):
+    def build(solver: CaptchaSolver | None = None, **overrides) -> Engine:
+        transport, config = simulator(**overrides)
+        return Engine(transport, config, solver or FakeSolver())
+
+    return build
+
+
+async def test_ip_search_passes_captcha_and_reuses_session(engine):
+    http = engine()
+    try:
+        first = await http.service.by_ip(IP)
+        second = await http.service.by_ip(IP, fresh=True)
+        # Статистику клиента читаем до close: он очищает пул свободных сессий
+        stats = http.client.stats()
+        simulator = await simulator_stats(http.transport)
+    finally:
+        await http.service.close()
+
+    assert len(first.items) == len(second.items) == 1
+    # Капча решается один раз: второй поиск идет в той же сессии с cookie
+    assert simulator["captchas_issued"] == simulator["captchas_accepted"] == 1
+    assert simulator["searches"] == 2
+    assert http.solver.reported_correct == 1
+    assert http.solver.reported_incorrect == 0
+    assert (stats["direct_lookups"], stats["captchas_solved"], stats["idle_sessions"]) == (2, 1, 1)
+
+
+async def test_person_search_loads_all_result_pages(engine):
+    http = engine(rows_per_page=2, rows_max=30)
+    try:
+        cases = await http.service.by_person(PERSON)
+        simulator = await simulator_stats(http.transport)
+    finally:
+        await http.service.close()
+
+    url = person_url(http.settings)
+    expected = result_rows(query_params(parse_qsl(urlsplit(url).query)), http.simulator_config)
+    assert len(expected) > 2
+    # Строки всех страниц собраны по порядку, каждая страница загружена один раз
+    assert len(cases.items) == len(expected)
+    assert all(row["cells"][1].startswith(case.ip) for case, row in zip(cases.items, expected))
+    assert simulator["result_pages"] == -(-len(expected) // 2)
+    assert not cases.truncated
+
+
+async def test_page_limit_marks_result_truncated(engine):
+    http = engine(rows_per_page=1, rows_max=30)
+    http.settings.pagination.max_pages = 2
+    before = REGISTRY.get_sample_value("fssp_results_truncated_total", {"kind": "person"}) or 0
+    try:
+        cases = await http.service.by_person(PERSON)
+        simulator = await simulator_stats(http.transport)
+        stats = http.service.stats()
+    finally:
+        await http.service.close()
+
+    # Загружены только первые страницы, а обрезка видна в результате и в метрике
+    assert len(cases.items) == 2
+    assert cases.truncated
+    assert simulator["result_pages"] == 2
+    assert stats["results"]["truncated_lookups"] == 1
+    assert REGISTRY.get_sample_value("fssp_results_truncated_total", {"kind": "person"}) == before + 1
+
+
+async def test_rejected_codes_raise_captcha_error(engine):
+    http = engine(FakeSolver(WRONG_CODE))
+    try:
+        with pytest.raises(CaptchaError, match="не принял код"):
+            await http.service.by_ip(IP)
+        stats = http.client.stats()
+    finally:
+        await http.service.close()
+
+    assert http.solver.reported_incorrect == HttpEngineConfig().captcha_attempts
+    assert http.solver.reported_correct == 0
+    assert stats["idle_sessions"] == 0
+
+
+async def test_captcha_limit_page_is_not_reused(engine):
+    http = engine(FakeSolver(WRONG_CODE), captcha_limit_attempts=1)
+    try:
+        with pytest.raises(CaptchaLimitExceeded):
+            await http.service.by_ip(IP)
+        stats = http.client.stats()
+        simulator = await simulator_stats(http.transport)
+    finally:
+        await http.service.close()
+
+    assert simulator["captcha_limit_pages"] == 1
+    assert http.solver.reported_incorrect == 1
+    assert stats["idle_sessions"] == 0
+
+
+async def test_server_errors_raise_fssp_unavailable(engine):
+    http = engine(failure_rate=1)
+    try:
+        with pytest.raises(FsspUnavailable, match="502"):
+            await http.service.by_ip(IP)
+        stats = http.client.stats()
+    finally:
+        await http.service.close()
+
+    assert stats["idle_sessions"] == 0
+    assert http.solver.solved == 0
+
+
+async def test_empty_result_raises_empty_result(engine):
+    http = engine(empty_rate=1)
+    try:
+        with pytest.raises(EmptyResult):
+            await http.service.by_ip(IP)
+    finally:
+        await http.service.close()
+
+
+async def test_abandoned_search_returns_session_at_once(engine):
+    http = engine(rows_per_page=1, rows_max=30)
+    try:
+        async with aclosing(http.client.fetch_pages(person_url(http.settings), http.settings)) as pages:
+            number, _ = await anext(pages)
+        # Вложенные генераторы закрыты вместе с внешним: сессия уже в пуле, догрузка страниц отменена
+        stats = http.client.stats()
+    finally:
+        await http.service.close()
+
+    assert number == 1
+    assert stats["idle_sessions"] == 1
+
+
+async def test_health_check_probes_search_form(engine):
+    healthy, failing = engine(), engine(failure_rate=1)
+    try:
+        assert await healthy.service.health_check()
+        assert not await failing.service.health_check()
+        simulator = await simulator_stats(healthy.transport)
+    finally:
+        await healthy.service.close()
+        await failing.service.close()
+
+    assert simulator["form_pages"] == 1
+
+
+async def test_health_check_fails_when_site_is_unreachable():
+    def refuse(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("connection refused", request=request)
+
+    client = HttpFsspClient(
+        FakeSolver(), HttpEngineConfig(), transport=httpx.MockTransport(refuse), health_url="http://simulator/iss/ip/"
+    )
+    try:
+        assert not await client.health_check()
+    finally:
+        await client.close()
+
+
+class FallbackStub:
+    def __init__(self, healthy: bool):
+        self.healthy = healthy
+
+    async def health_check(self) -> bool:
+        return self.healthy
+
+    async def close(self) -> None:
+        return None
+
+
+async def test_health_check_without_url_asks_fallback():
+    client = HttpFsspClient(FakeSolver(), HttpEngineConfig(), fallback=FallbackStub(healthy=False))
+    try:
+        assert not await client.health_check()
+    finally:
+        await client.close()
@@ -0,0 +1,147 @@
+"""Очередь асинхронных заданий: выполнение, повторы по типу ошибки, тайминги попыток."""
+import asyncio
+
+from src.application.jobs import JobRunner
+from src.domain import DebtorCaseList, IpNumber
+from src.domain.errors import CaptchaError, CaptchaLimitExceeded, EmptyResult, FsspUnavailable, ParsingError
+from src.infrastructure.config import JobsConfig
+from src.infrastructure.job_store import FAILED, QUEUED, RUNNING, SUCCEEDED, SqliteJobStore
+from src.infrastructure.metrics import stage
+
+
+QUERY = IpNumber(ip="12345/23/77001-ИП")
+ROW = {
+    "region": "Москва",
+    "debtor": "ИВАНОВ ИВАН",
+    "ip": "12345/23/77001-ИП",
+    "doc": "Судебный приказ",
+    "debt": "Штраф: 500 руб.",
+    "office": "ОСП по району",
+    "bailiff": "ПЕТРОВ П. П.",
+}
+
+
+class FakeService:
+    """`FsspService.search`: по очереди выбрасывает ошибки из `errors`, затем находит одно производство."""
+
+    def __init__(self, *errors: Exception):
+        self._errors = list(errors)
+        self.calls = 0
+
+    async def search(self, query) -> DebtorCaseList:
+        self.calls += 1
+        with stage("goto"):
+            await asyncio.sleep(0)
+        if self._errors:
+            raise self._errors.pop(0)
+        with stage("parse"):
+            return DebtorCaseList.from_rows([ROW])
+
+
+async def _run_job(service: FakeService, config: JobsConfig):
+    runner = JobRunner(service, SqliteJobStore(config.sqlite_path), config)
+    await runner.start()
+    try:
+        job = await runner.submit(QUERY)
+        async with asyncio.timeout(5):
+            while (job := await runner.get(job.id)).status not in (SUCCEEDED, FAILED):
+                await asyncio.sleep(0.01)
+        return job
+    finally:
+        await runner.close()
+
+
+async def test_successful_job_records_result_and_stage_timings(jobs_config):
+    job = await _run_job(FakeService(), jobs_config())
+
+    assert job.status == SUCCEEDED
+    assert job.attempts == 1
+    assert job.result[0]["ip"] == ROW["ip"]
+    assert set(job.timings) == {"queue_wait_ms", "attempts", "total_ms"}
+    (attempt,) = job.timings["attempts"]
+    assert set(attempt["stages_ms"]) == {"goto", "parse"}
+    assert "error_type" not in attempt
+
+
+async def test_retryable_errors_are_retried_until_success(jobs_config):
+    service = FakeService(CaptchaError("ФССП не принял код капчи"), FsspUnavailable("Таймаут при работе с ФССП"))
+
+    job = await _run_job(service, jobs_config(max_attempts=3))
+
+    assert job.status == SUCCEEDED
+    assert service.calls == 3
+    assert [attempt.get("error_type") for attempt in job.timings["attempts"]] == ["CaptchaError", "FsspUnavailable", None]
+    # Неудачная попытка тоже хранит свои этапы и паузу перед повтором
+    assert job.timings["attempts"][0]["stages_ms"].keys() == {"goto"}
+    assert job.timings["attempts"][0]["retry_in_s"] == 0
+    assert job.error is None
+
+
+async def test_job_fails_after_max_attempts(jobs_config):
+    service = FakeService(*(FsspUnavailable("ФССП недоступен") for _ in range(5)))
+
+    job = await _run_job(service, jobs_config(max_attempts=2))
+
+    assert job.status == FAILED
+    assert service.calls == 2
+    assert job.error_type == "FsspUnavailable"
+    assert "total_ms" in job.timings
+
+
+async def test_empty_result_is_final(jobs_config):
+    service = FakeService(EmptyResult("По запросу ничего не найдено"))
+
+    job = await _run_job(service, jobs_config(max_attempts=3))
+
+    assert job.status == FAILED
+    assert service.calls == 1
+    assert job.error_type == "EmptyResult"
+
+
+async def test_parsing_error_is_not_retried(jobs_config):
+    service = FakeService(ParsingError("Не удалось разобрать страницу"))
+
+    job = await _run_job(service, jobs_config(max_attempts=3))
+
+    assert job.status == FAILED
+    assert service.calls == 1
+
+
+async def test_captcha_limit_waits_at_least_configured_delay(jobs_config):
+    config = jobs_config(max_attempts=3, captcha_limit_delay_s=600)
+    runner = JobRunner(FakeService(CaptchaLimitExceeded("Превышен лимит попыток")), SqliteJobStore(config.sqlite_path), config)
+    await runner.start()
+    try:
+        job = await runner.submit(QUERY)
+        async with asyncio.timeout(5):
+            while not (job := await runner.get(job.id)).timings.get("attempts"):
+                await asyncio.sleep(0.01)
+    finally:
+        await runner.close()
+
+    assert job.status == QUEUED
+    assert job.timings["attempts"][0]["retry_in_s"] == 600
+    assert job.next_run_at - job.timings["attempts"][0]["started_at"] >= 600
+
+
+async def test_running_job_is_requeued_after_restart(jobs_config):
+    config = jobs_config()
+    store = SqliteJobStore(config.sqlite_path)
+    job = await store.create("ip", QUERY.model_dump())
+    claimed = await store.claim_next()
+    await store.close()
+    assert claimed.status == RUNNING
+
+    store = SqliteJobStore(config.sqlite_path)
+    assert store.recovered == 1
+    runner = JobRunner(FakeService(), store, config)
+    await runner.start()
+    try:
+        async with asyncio.timeout(5):
+            while (finished := await runner.get(job.id)).status not in (SUCCEEDED, FAILED):
+                await asyncio.sleep(0.01)
+    finally:
+        await runner.close()
+
+    assert finished.status == SUCCEEDED
+    assert finished.attempts == 2
@@ -0,0 +1,159 @@
+"""Адаптивный лимит параллелизма (AIMD) и очередь перед ним."""
+import asyncio
+
+import pytest
+
+from src.application.limiter import AdaptiveLimiter, LimitedFetcher
+from src.domain.errors import FsspUnavailable, Overloaded
+from src.infrastructure.parser import CAPTCHA_LIMIT_MESSAGE
+
+
+async def _succeed(limiter: AdaptiveLimiter, times: int) -> None:
+    """`times` успешных поисков, каждый при полностью занятом лимите."""
+    for _ in range(times):
+        held = limiter.limit
+        for _ in range(held):
+            await limiter.acquire()
+        limiter.on_success()
+        for _ in range(held):
+            limiter.release()
+
+
+async def test_limit_grows_about_one_per_round_when_saturated(limiter_config):
+    limiter = AdaptiveLimiter(limiter_config(initial_limit=2, max_limit=8))
+
+    # 2 -> 2.5 -> 2.9 -> 3.24: прибавка 1 / limit, около +1 за круг из limit поисков
+    await _succeed(limiter, 3)
+    assert limiter.limit == 3
+    await _succeed(limiter, 3)
+    assert limiter.limit == 4
+
+
+async def test_limit_does_not_grow_without_saturation(limiter_config):
+    limiter = AdaptiveLimiter(limiter_config(initial_limit=4, max_limit=8))
+    for _ in range(20):
+        await limiter.acquire()
+        limiter.on_success()
+        limiter.release()
+
+    assert limiter.limit == 4
+
+
+@pytest.mark.parametrize(("max_limit", "ceiling", "expected"), [(8, None, 8), (8, 3, 3), (2, 5, 2)])
+async def test_limit_is_capped_by_config_and_engine_pool(limiter_config, max_limit, ceiling, expected):
+    limiter = AdaptiveLimiter(limiter_config(initial_limit=2, max_limit=max_limit), ceiling=ceiling)
+
+    await _succeed(limiter, 100)
+
+    assert limiter.limit == expected
+    assert limiter.stats()["max_limit"] == expected
+
+
+def test_overload_decreases_multiplicatively_down_to_min(limiter_config):
+    limiter = AdaptiveLimiter(limiter_config(initial_limit=8, min_limit=2, decrease_factor=0.5))
+
+    limiter.on_overload("TimeoutException")
+    assert limiter.limit == 4
+    limiter.on_overload("TimeoutException")
+    limiter.on_overload("TimeoutException")
+    assert limiter.limit == 2
+    assert limiter.stats()["backoffs"] == 3
+
+
+def test_captcha_limit_resets_to_min(limiter_config):
+    limiter = AdaptiveLimiter(limiter_config(initial_limit=8, min_limit=1))
+
+    limiter.on_overload("captcha_limit", hard=True)
+
+    assert limiter.limit == 1
+
+
+def test_burst_of_errors_within_cooldown_is_one_backoff(limiter_config):
+    limiter = AdaptiveLimiter(limiter_config(initial_limit=8, backoff_cooldown_s=60))
+
+    for _ in range(5):
+        limiter.on_overload("HTTPStatusError")
+
+    assert limiter.limit == 4
+    assert limiter.stats()["backoffs"] == 1
+
+
+async def test_queued_request_gets_released_slot(limiter_config):
+    limiter = AdaptiveLimiter(limiter_config(initial_limit=1))
+    await limiter.acquire()
+    waiter = asyncio.ensure_future(limiter.acquire())
+    await asyncio.sleep(0)
+    assert limiter.stats()["queued"] == 1
+
+    limiter.release()
+    await asyncio.wait_for(waiter, timeout=1)
+
+    stats = limiter.stats()
+    assert stats["in_flight"] == 1
+    assert stats["queued"] == 0
+
+
+async def test_full_queue_is_rejected(limiter_config):
+    limiter = AdaptiveLimiter(limiter_config(initial_limit=1, max_queue=1))
+    await limiter.acquire()
+    waiter = asyncio.ensure_future(limiter.acquire())
+    await asyncio.sleep(0)
+
+    with pytest.raises(Overloaded):
+        await limiter.acquire()
+    waiter.cancel()
+
+    assert limiter.stats()["rejected"] == 1
+
+
+async def test_queue_timeout_raises_overloaded(limiter_config):
+    limiter = AdaptiveLimiter(limiter_config(initial_limit=1, queue_timeout_s=0.01))
+    await limiter.acquire()
+
+    with pytest.raises(Overloaded):
+        await limiter.acquire()
+
+    stats = limiter.stats()
+    assert stats["queue_timeouts"] == 1
+    assert stats["in_flight"] == 1
+    assert stats["queued"] == 0
+
+
+class FakeFetcher:
+    def __init__(self, pages: list[str] | None = None, error: Exception | None = None):
+        self._pages = pages or []
+        self._error = error
+
+    async def fetch_pages(self, url, settings):
+        for number, html in enumerate(self._pages, start=1):
+            yield number, html
+        if self._error is not None:
+            raise self._error
+
+
+async def _drain(fetcher: LimitedFetcher) -> list[tuple[int, str]]:
+    return [item async for item in fetcher.fetch_pages("https://fssp.example/search", settings=None)]
+
+
+async def test_fetcher_backs_off_on_unavailable_and_frees_slot(limiter_config):
+    limiter = AdaptiveLimiter(limiter_config(initial_limit=4))
+    fetcher = LimitedFetcher(FakeFetcher(error=FsspUnavailable("таймаут")), limiter)
+
+    with pytest.raises(FsspUnavailable):
+        await _drain(fetcher)
+
+    stats = limiter.stats()
+    assert stats["limit"] == 2
+    assert stats["in_flight"] == 0
+
+
+async def test_fetcher_resets_limit_on_captcha_limit_page(limiter_config):
+    limiter = AdaptiveLimiter(limiter_config(initial_limit=4))
+    fetcher = LimitedFetcher(FakeFetcher(pages=[f"<div>{CAPTCHA_LIMIT_MESSAGE}</div>"]), limiter)
+
+    pages = await _drain(fetcher)
+
+    stats = limiter.stats()
+    assert len(pages) == 1
+    assert stats["limit"] == 1
+    assert stats["in_flight"] == 0
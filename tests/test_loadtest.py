@@ -0,0 +1,116 @@
+"""Генератор нагрузки: смесь запросов, замкнутая и открытая модели, перцентили и отчет."""
+import asyncio
+from itertools import islice
+
+import pytest
+
+from src.application.loadtest import LoadReport, latency_summary, parse_mix, percentile, run_load, synthetic_queries
+from src.domain import Inn, IpNumber, Person, SearchQuery, query_type
+
+
+def test_mix_is_normalized():
+    assert parse_mix("ip=1,person=1,inn=2") == {"ip": 0.25, "person": 0.25, "inn": 0.5}
+    assert parse_mix("inn") == {"inn": 1.0}
+
+
+@pytest.mark.parametrize("mix", ["ip=1,phone=1", "ip=x", "ip=0"])
+def test_invalid_mix_is_rejected(mix):
+    with pytest.raises(ValueError):
+        parse_mix(mix)
+
+
+def test_synthetic_queries_follow_the_mix_and_seed():
+    first = list(islice(synthetic_queries({"ip": 0.5, "person": 0.5}, seed=7), 200))
+    second = list(islice(synthetic_queries({"ip": 0.5, "person": 0.5}, seed=7), 200))
+
+    assert first == second
+    assert {type(query) for query in first} == {IpNumber, Person}
+    assert all(isinstance(query, Inn) for query in islice(synthetic_queries({"inn": 1.0}), 20))
+
+
+def test_percentiles_use_nearest_rank():
+    values = [float(value) for value in range(1, 101)]
+
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([], 50) is None
+    summary = latency_summary([30.0, 10.0, 20.0])
+    assert (summary["count"], summary["p50_ms"], summary["max_ms"], summary["mean_ms"]) == (3, 20.0, 30.0, 20.0)
+
+
+class Probe:
+    """Запрос длится `delay_s`; ИНН из `failures` завершается ошибкой."""
+
+    def __init__(self, delay_s: float = 0.01, failures: dict[str, str] | None = None):
+        self.delay_s = delay_s
+        self.failures = failures or {}
+        self.running = 0
+        self.max_running = 0
+
+    async def __call__(self, query: SearchQuery) -> str | None:
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(self.delay_s)
+        finally:
+            self.running -= 1
+        failure = self.failures.get(getattr(query, "inn", None))
+        if failure == "raise":
+            raise TimeoutError("нет ответа")
+        return failure
+
+
+def _queries(*inns: str):
+    while True:
+        yield from (Inn(inn=inn) for inn in inns)
+
+
+async def test_closed_model_keeps_concurrency_and_counts_errors():
+    probe = Probe(failures={"7736050003": "CaptchaError", "500100732259": "raise"})
+    report = LoadReport(mode="concurrency=3", target="service")
+
+    await run_load(probe, _queries("7707083893", "7736050003", "500100732259"), report, concurrency=3, max_requests=9)
+
+    assert probe.max_running == 3
+    data = report.to_dict()
+    assert (data["requests"], data["succeeded"], data["failed"]) == (9, 3, 6)
+    assert data["errors"] == {"CaptchaError": 3, "TimeoutError": 3}
+    assert data["latency_by_type"]["inn"]["count"] == 9
+
+
+async def test_open_model_paces_starts_and_counts_queueing_in_latency():
+    probe = Probe(delay_s=0.05)
+    report = LoadReport(mode="rate=100/s", target="service")
+
+    await run_load(probe, _queries("7707083893"), report, concurrency=1, rate=100, max_requests=4)
+
+    # Запросы запланированы каждые 10 мс, но слот один: ожидание слота входит в задержку
+    assert probe.max_running == 1
+    assert report.latencies_ms[-1] > report.latencies_ms[0] + 50
+    assert report.to_dict()["requests"] == 4
+
+
+async def test_duration_limits_the_run():
+    report = LoadReport(mode="concurrency=2", target="service")
+
+    await asyncio.wait_for(run_load(Probe(), _queries("7707083893"), report, concurrency=2, duration_s=0.1), timeout=1)
+
+    assert 0.1 <= report.duration_s < 0.5
+    assert report.requests > 0
+
+
+async def test_run_needs_duration_or_request_count():
+    with pytest.raises(ValueError):
+        await run_load(Probe(), _queries("7707083893"), LoadReport(mode="", target=""), concurrency=1)
+
+
+def test_report_counts_throughput_and_captchas_per_lookup():
+    report = LoadReport(mode="concurrency=1", target="service", duration_s=2, captchas_solved=3)
+    for error in (None, None, None, "EmptyResult"):
+        report.record(query_type(Inn(inn="7707083893")), 100, error)
+
+    data = report.to_dict()
+
+    assert data["throughput_rps"] == 2
+    assert data["lookups_per_minute"] == 90
+    assert data["captcha"] == {"solved": 3, "per_lookup": 1.0}
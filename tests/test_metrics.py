@@ -0,0 +1,28 @@
+from src.infrastructure.metrics import render_metrics
+
+
+def test_stats_render_as_documented_gauges():
+    stats = {"engine": "http", "client": {"limiter": {"limit": 4, "saturated": True}}}
+
+    text = render_metrics(stats).decode()
+
+    assert "# HELP fssp_stats_client_limiter_limit " in text
+    assert "# TYPE fssp_stats_client_limiter_limit gauge" in text
+    assert "fssp_stats_client_limiter_limit 4.0" in text
+    assert "fssp_stats_client_limiter_saturated 1.0" in text
+    assert "fssp_stats_engine" not in text
+
+
+def test_list_stats_are_labelled_by_item():
+    proxies = [
+        {"proxy": "http://a:1", "contexts": 2, "latency_ms": None},
+        {"proxy": "http://b:2", "contexts": 0, "latency_ms": 12.5},
+    ]
+
+    text = render_metrics({"browser": {"proxies": proxies}, "sizes": [3, 5]}).decode()
+
+    assert 'fssp_stats_browser_proxies_contexts{proxy="http://a:1"} 2.0' in text
+    assert 'fssp_stats_browser_proxies_contexts{proxy="http://b:2"} 0.0' in text
+    assert 'fssp_stats_browser_proxies_latency_ms{proxy="http://b:2"} 12.5' in text
+    assert 'latency_ms{proxy="http://a:1"}' not in text
+    assert 'fssp_stats_sizes{index="1"} 5.0' in text
@@ -0,0 +1,91 @@
+"""Кэш результатов поиска: LRU, TTL по типу запроса и персистентный уровень SQLite."""
+import pytest
+
+from src.infrastructure.cache import ResultCache
+from src.infrastructure.config import CacheConfig
+
+from tests.fakes import Clock
+
+
+ROWS = [{"number": "1/23/45678-ИП", "debtor": "ИВАНОВ ИВАН"}]
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr("src.infrastructure.cache.time.time", clock)
+    return clock
+
+
+async def test_entry_is_returned_until_ttl_expires(clock):
+    cache = ResultCache(CacheConfig(ttl_ip_s=60))
+    await cache.set("ip", "ip:1", ROWS)
+
+    clock.now += 59
+    assert await cache.get("ip:1") == ROWS
+    clock.now += 2
+    assert await cache.get("ip:1") is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["expired"] == 1
+    assert stats["entries"] == 0
+
+
+async def test_ttl_depends_on_query_kind(clock):
+    cache = ResultCache(CacheConfig(ttl_ip_s=3600, ttl_person_s=10, ttl_inn_s=0))
+    for kind in ("ip", "person", "inn"):
+        await cache.set(kind, f"{kind}:1", ROWS)
+
+    clock.now += 60
+
+    assert [await cache.get(f"{kind}:1") for kind in ("ip", "person", "inn")] == [ROWS, None, None]
+
+
+async def test_least_recently_used_entry_is_evicted(clock):
+    cache = ResultCache(CacheConfig(max_entries=2))
+    await cache.set("ip", "ip:1", ROWS)
+    await cache.set("ip", "ip:2", ROWS)
+    # Обращение делает ip:1 свежим, вытесняется ip:2
+    await cache.get("ip:1")
+    await cache.set("ip", "ip:3", ROWS)
+
+    assert [await cache.get(key) for key in ("ip:1", "ip:2", "ip:3")] == [ROWS, None, ROWS]
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["entries"] == 2
+
+
+async def test_sqlite_tier_survives_restart(clock, tmp_path):
+    config = CacheConfig(ttl_ip_s=60, sqlite_path=tmp_path / "cache.sqlite3")
+    cache = ResultCache(config)
+    await cache.set("ip", "ip:1", ROWS)
+    await cache.close()
+
+    restarted = ResultCache(config)
+    try:
+        assert await restarted.get("ip:1") == ROWS
+        # Запись из SQLite поднимается в память: второе обращение — обычное попадание
+        assert await restarted.get("ip:1") == ROWS
+        stats = restarted.stats()
+    finally:
+        await restarted.close()
+
+    assert stats["sqlite_hits"] == 1
+    assert stats["hits"] == 1
+    assert stats["persistent"] is True
+
+
+async def test_sqlite_tier_respects_ttl(clock, tmp_path):
+    config = CacheConfig(ttl_ip_s=60, sqlite_path=tmp_path / "cache.sqlite3")
+    cache = ResultCache(config)
+    await cache.set("ip", "ip:1", ROWS)
+    await cache.close()
+
+    clock.now += 61
+    restarted = ResultCache(config)
+    try:
+        assert await restarted.get("ip:1") is None
+        assert restarted.stats()["misses"] == 1
+    finally:
+        await restarted.close()
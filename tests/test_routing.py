@@ -0,0 +1,91 @@
+"""Политика перехвата запросов браузера: что пропускается, что блокируется и как это считается."""
+from dataclasses import dataclass
+
+import pytest
+
+from src.infrastructure.config import BrowserConfig
+from src.infrastructure.routing import RequestPolicy
+
+
+@dataclass
+class FakeRequest:
+    resource_type: str
+    url: str
+
+
+class FakeRoute:
+    def __init__(self, resource_type: str, url: str):
+        self.request = FakeRequest(resource_type, url)
+        self.outcome: str | None = None
+
+    async def continue_(self) -> None:
+        self.outcome = "continue"
+
+    async def abort(self, error_code: str) -> None:
+        self.outcome = error_code
+
+
+class FakeContext:
+    def __init__(self):
+        self.routes: list[str] = []
+        self.listeners: list[str] = []
+
+    async def route(self, pattern: str, handler) -> None:
+        self.routes.append(pattern)
+
+    def on(self, event: str, callback) -> None:
+        self.listeners.append(event)
+
+
+@pytest.mark.parametrize(
+    ("resource_type", "url", "allowed"),
+    [
+        ("document", "https://fssp.gov.ru/iss/ip/", True),
+        ("xhr", "https://is.fssp.gov.ru/ajax_search?system=ip", True),
+        ("script", "https://fssp.gov.ru/js/app.js", True),
+        # Стили и картинки по умолчанию нужны странице: от них зависят окно капчи и его скриншот
+        ("stylesheet", "https://fssp.gov.ru/css/main.css", True),
+        ("image", "https://fssp.gov.ru/img/logo.png", True),
+        ("font", "https://fssp.gov.ru/fonts/pt.woff2", False),
+        ("media", "https://fssp.gov.ru/video.mp4", False),
+        ("script", "https://mc.yandex.ru/metrika/tag.js", False),
+        ("script", "https://www.googletagmanager.com/gtm.js", False),
+    ],
+)
+def test_default_policy(resource_type, url, allowed):
+    assert RequestPolicy(BrowserConfig()).is_allowed(resource_type, url) is allowed
+
+
+def test_captcha_is_allowed_even_when_its_type_is_blocked():
+    policy = RequestPolicy(BrowserConfig(blocked_resource_types=["image", "stylesheet"]))
+
+    assert policy.is_allowed("image", "https://is.fssp.gov.ru/refresh_visual_captcha/")
+    assert not policy.is_allowed("image", "https://fssp.gov.ru/img/logo.png")
+    assert not policy.is_allowed("stylesheet", "https://fssp.gov.ru/css/main.css")
+
+
+async def test_routed_requests_are_counted_by_outcome():
+    policy = RequestPolicy(BrowserConfig())
+    routes = [
+        FakeRoute("document", "https://fssp.gov.ru/iss/ip/"),
+        FakeRoute("font", "https://fssp.gov.ru/fonts/pt.woff2"),
+        FakeRoute("script", "https://mc.yandex.ru/metrika/tag.js"),
+    ]
+
+    for route in routes:
+        await policy._handle(route)
+
+    assert [route.outcome for route in routes] == ["continue", "blockedbyclient", "blockedbyclient"]
+    stats = policy.stats()
+    assert stats["requests_allowed"] == 1
+    assert stats["requests_blocked"] == 2
+    assert stats["requests_blocked_by_type"] == {"font": 1, "script": 1}
+
+
+async def test_install_routes_every_request_of_the_context():
+    context = FakeContext()
+
+    await RequestPolicy(BrowserConfig()).install(context)
+
+    assert context.routes == ["**/*"]
+    assert context.listeners == ["response"]
@@ -0,0 +1,171 @@
+"""Пул сессий браузера: выдача, переиспользование, истечение и ожидание слота."""
+import asyncio
+
+import pytest
+
+from src.domain.errors import FsspUnavailable
+from src.infrastructure.config import SessionConfig
+from src.infrastructure.session import SessionPool
+
+from tests.fakes import FakeBrowser, FakeContext, FakePage
+
+
+async def _lookup(pool: SessionPool, hold_s: float) -> None:
+    session = await pool.acquire()
+    await asyncio.sleep(hold_s)
+    pool.record_lookup(session, captchas=0)
+    await pool.release(session, reusable=True)
+
+
+async def test_lookups_beyond_browser_slots_get_released_sessions():
+    browser = FakeBrowser(slots=2)
+    pool = SessionPool(browser, SessionConfig())
+
+    # Третий поиск ждет слот, а оба слота заняты сессиями, которые вернутся в пул простаивать
+    await asyncio.wait_for(asyncio.gather(*(_lookup(pool, 0.05) for _ in range(3))), timeout=2)
+
+    stats = pool.stats()
+    assert browser.opened == 2
+    assert stats["created"] == 2
+    assert stats["reused"] == 1
+    assert stats["waiting"] == 0
+
+
+async def test_cancelled_waiter_passes_session_on():
+    browser = FakeBrowser(slots=1)
+    pool = SessionPool(browser, SessionConfig())
+    first = await pool.acquire()
+    waiter = asyncio.ensure_future(pool.acquire())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    await asyncio.gather(waiter, return_exceptions=True)
+    await pool.release(first, reusable=True)
+
+    # Сессия не потерялась вместе с отмененным ожиданием
+    second = await asyncio.wait_for(pool.acquire(), timeout=1)
+
+    assert second is first
+    assert browser.opened == 1
+    assert browser.released == 0
+
+
+async def test_unusable_session_frees_browser_slot():
+    browser = FakeBrowser(slots=1)
+    pool = SessionPool(browser, SessionConfig(max_uses=1))
+    first = await pool.acquire()
+    waiter = asyncio.ensure_future(pool.acquire())
+    await asyncio.sleep(0)
+    pool.record_lookup(first, captchas=1)
+    await pool.release(first, reusable=True)
+
+    second = await asyncio.wait_for(waiter, timeout=1)
+
+    assert second is not first
+    assert browser.opened == 2
+    assert browser.released == 1
+
+
+async def test_idle_session_is_reused():
+    browser = FakeBrowser(slots=2)
+    pool = SessionPool(browser, SessionConfig())
+    first = await pool.acquire()
+    pool.record_lookup(first, captchas=1)
+    await pool.release(first, reusable=True)
+
+    second = await pool.acquire()
+
+    assert second is first
+    stats = pool.stats()
+    assert (stats["created"], stats["reused"], stats["idle"]) == (1, 1, 0)
+    assert browser.opened == 1
+
+
+async def test_expired_or_closed_sessions_are_not_reused():
+    browser = FakeBrowser(slots=2)
+    pool = SessionPool(browser, SessionConfig(max_age_s=300))
+    old, broken = await pool.acquire(), await pool.acquire()
+    old.created_at -= 301
+    broken.page.closed = True
+    # Непригодная сессия не возвращается в пул, а освобождает слот браузера
+    await pool.release(old, reusable=True)
+    await pool.release(broken, reusable=True)
+
+    fresh = await asyncio.wait_for(pool.acquire(), timeout=1)
+
+    assert fresh not in (old, broken)
+    assert browser.released == 2
+    assert pool.stats()["idle"] == 0
+
+
+async def test_session_expired_while_idle_is_closed_on_acquire():
+    browser = FakeBrowser(slots=1)
+    pool = SessionPool(browser, SessionConfig(max_age_s=300))
+    session = await pool.acquire()
+    await pool.release(session, reusable=True)
+    session.created_at -= 301
+
+    fresh = await asyncio.wait_for(pool.acquire(), timeout=1)
+
+    assert fresh is not session
+    assert session.context.closed
+    assert pool.stats()["reused"] == 0
+
+
+async def test_disabled_pool_closes_every_session():
+    browser = FakeBrowser(slots=1)
+    pool = SessionPool(browser, SessionConfig(enabled=False))
+    session = await pool.acquire()
+
+    await pool.release(session, reusable=True)
+
+    assert session.context.closed
+    assert pool.stats()["idle"] == 0
+
+
+class BrokenPageContext(FakeContext):
+    async def new_page(self) -> FakePage:
+        raise RuntimeError("страница не открылась")
+
+
+class BrokenPageBrowser(FakeBrowser):
+    async def acquire(self) -> FakeContext:
+        await super().acquire()
+        return BrokenPageContext()
+
+
+async def test_failed_page_returns_context_and_leaves_no_waiter():
+    browser = BrokenPageBrowser(slots=1)
+    pool = SessionPool(browser, SessionConfig())
+
+    with pytest.raises(RuntimeError):
+        await pool.acquire()
+
+    assert browser.released == 1
+    assert pool.stats()["waiting"] == 0
+
+
+class FailingBrowser(FakeBrowser):
+    async def acquire(self) -> FakeContext:
+        raise FsspUnavailable("браузер не запустился")
+
+
+async def test_failed_context_is_raised_to_the_caller():
+    pool = SessionPool(FailingBrowser(slots=1), SessionConfig())
+
+    with pytest.raises(FsspUnavailable, match="браузер"):
+        await pool.acquire()
+
+    assert pool.stats()["waiting"] == 0
+
+
+async def test_close_releases_idle_sessions():
+    browser = FakeBrowser(slots=2)
+    pool = SessionPool(browser, SessionConfig())
+    sessions = [await pool.acquire(), await pool.acquire()]
+    for session in sessions:
+        await pool.release(session, reusable=True)
+
+    await pool.close()
+
+    assert all(session.context.closed for session in sessions)
+    assert browser.released == 2
@@ -0,0 +1,116 @@
+"""Симулятор ФССП: капча и сессии ajax_search, страницы результатов, фейковые решатель и провайдер."""
+import base64
+from html import unescape
+import re
+
+import httpx
+import pytest
+
+from src.infrastructure.fssp_page import captcha_result, has_results, unwrap_json_payload
+from src.infrastructure.simulator.captcha_image import read_code
+
+
+QUERY = {"system": "ip", "is[extended]": "1", "is[variant]": "2", "is[last_name]": "Иванов", "is[date]": "01.01.1980"}
+_CAPTCHA_SRC_RE = re.compile(r'id="capchaVisualImage" src="([^"]+)"')
+
+
+@pytest.fixture
+def site(simulator):
+    def build(**overrides) -> httpx.AsyncClient:
+        transport, _ = simulator(**overrides)
+        return httpx.AsyncClient(transport=transport, base_url="http://simulator")
+
+    return build
+
+
+async def search(client: httpx.AsyncClient, **params) -> str:
+    response = await client.get("/ajax_search", params={**QUERY, **params})
+    return unwrap_json_payload(response.text)
+
+
+async def captcha_image(client: httpx.AsyncClient, html: str) -> bytes:
+    src = unescape(_CAPTCHA_SRC_RE.search(html).group(1))
+    return (await client.get(src)).content
+
+
+async def stats(client: httpx.AsyncClient) -> dict:
+    return (await client.get("/simulator/stats")).json()
+
+
+async def test_captcha_once_per_session_then_results(site):
+    async with site() as client:
+        first = await search(client)
+        code = read_code(await captcha_image(client, first), 5)
+        answered = await search(client, code=code)
+        again = await search(client)
+        counters = await stats(client)
+
+    assert captcha_result(first) == "rejected"
+    assert captcha_result(answered) == "accepted" and has_results(answered)
+    # Cookie сессии помнит решенную капчу
+    assert has_results(again)
+    assert (counters["captchas_issued"], counters["captchas_accepted"], counters["searches"]) == (1, 1, 2)
+
+
+async def test_wrong_codes_end_with_the_limit_page(site):
+    async with site(captcha_limit_attempts=2) as client:
+        await search(client)
+        rejected = await search(client, code="00000")
+        limit = await search(client, code="00000")
+        counters = await stats(client)
+
+    assert captcha_result(rejected) == "rejected"
+    assert captcha_result(limit) == "limit"
+    assert counters["captcha_limit_pages"] == 1
+
+
+async def test_later_pages_need_a_verified_session(site):
+    async with site() as client, site() as stranger:
+        html = await search(client)
+        await search(client, code=read_code(await captcha_image(client, html), 5))
+        page_two = await search(client, page="2")
+        foreign = await search(stranger, page="2")
+
+    assert has_results(page_two)
+    assert captcha_result(foreign) == "rejected"
+
+
+async def test_same_query_gives_same_results_across_instances(site):
+    pages = []
+    for _ in range(2):
+        async with site() as client:
+            html = await search(client)
+            pages.append(await search(client, code=read_code(await captcha_image(client, html), 5)))
+
+    assert pages[0] == pages[1]
+
+
+async def test_failure_rate_returns_server_errors(site):
+    async with site(failure_rate=1) as client:
+        response = await client.get("/ajax_search", params=QUERY)
+
+    assert response.status_code == 502
+
+
+async def test_fake_solver_reads_the_captcha(site):
+    async with site(solver_latency_ms=0) as client:
+        image = await captcha_image(client, await search(client))
+        solved = (await client.post("/simulator/solver", content=image)).json()
+        unsolvable = await client.post("/simulator/solver", content=b"not an image")
+
+    assert solved["code"] == read_code(image, 5)
+    assert unsolvable.status_code == 422
+
+
+async def test_fake_provider_speaks_rucaptcha_api(site):
+    async with site(solver_latency_ms=0) as client:
+        image = await captcha_image(client, await search(client))
+        task = (await client.post("/simulator/in.php", data={"body": base64.b64encode(image).decode()})).json()
+        result = (await client.get("/simulator/res.php", params={"id": task["request"]})).json()
+        report = (await client.get("/simulator/res.php", params={"action": "reportbad", "id": task["request"]})).json()
+        counters = await stats(client)
+
+    assert task["status"] == 1
+    assert result == {"status": 1, "request": read_code(image, 5)}
+    assert report["request"] == "OK_REPORT_RECORDED"
+    assert (counters["provider_tasks"], counters["provider_reports"]) == (1, 1)
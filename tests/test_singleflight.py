@@ -0,0 +1,108 @@
+"""Объединение одинаковых одновременных запросов в один."""
+import asyncio
+
+import pytest
+
+from src.application.singleflight import SingleFlight
+
+
+class SlowFetch:
+    """Фабрика поиска: считает запуски, ждет `release` и отдает результат или исключение."""
+
+    def __init__(self, result: object = "cases"):
+        self.result = result
+        self.started = 0
+        self.cancelled = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self) -> object:
+        self.started += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+async def test_concurrent_calls_with_same_key_share_one_fetch():
+    flight = SingleFlight()
+    fetch = SlowFetch()
+    waiters = [asyncio.ensure_future(flight.do("ip:1", fetch)) for _ in range(5)]
+    await asyncio.sleep(0)
+    fetch.release.set()
+
+    assert await asyncio.gather(*waiters) == ["cases"] * 5
+    assert fetch.started == 1
+    assert flight.stats() == {"in_flight": 0, "started": 1, "coalesced": 4}
+
+
+async def test_different_keys_are_not_coalesced():
+    flight = SingleFlight()
+    fetch = SlowFetch()
+    waiters = [asyncio.ensure_future(flight.do(key, fetch)) for key in ("ip:1", "ip:2")]
+    await asyncio.sleep(0)
+    fetch.release.set()
+    await asyncio.gather(*waiters)
+
+    assert fetch.started == 2
+
+
+async def test_all_waiters_get_the_same_exception():
+    flight = SingleFlight()
+    fetch = SlowFetch(result=RuntimeError("ФССП недоступен"))
+    waiters = [asyncio.ensure_future(flight.do("ip:1", fetch)) for _ in range(3)]
+    await asyncio.sleep(0)
+    fetch.release.set()
+    errors = await asyncio.gather(*waiters, return_exceptions=True)
+
+    assert fetch.started == 1
+    assert all(isinstance(error, RuntimeError) for error in errors)
+    assert len({id(error) for error in errors}) == 1
+
+
+async def test_cancelling_one_waiter_keeps_the_fetch_for_others():
+    flight = SingleFlight()
+    fetch = SlowFetch()
+    first = asyncio.ensure_future(flight.do("ip:1", fetch))
+    second = asyncio.ensure_future(flight.do("ip:1", fetch))
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    fetch.release.set()
+
+    assert await second == "cases"
+    assert first.cancelled()
+    assert fetch.cancelled == 0
+
+
+async def test_fetch_is_cancelled_when_the_last_waiter_leaves():
+    flight = SingleFlight()
+    fetch = SlowFetch()
+    waiters = [asyncio.ensure_future(flight.do("ip:1", fetch)) for _ in range(2)]
+    await asyncio.sleep(0)
+    for waiter in waiters:
+        waiter.cancel()
+    await asyncio.gather(*waiters, return_exceptions=True)
+    await asyncio.sleep(0)
+
+    assert fetch.cancelled == 1
+    assert flight.stats()["in_flight"] == 0
+    # Следующий вызов с тем же ключом запускает новый поиск, а не ждет отмененный
+    fetch.release.set()
+    assert await flight.do("ip:1", fetch) == "cases"
+    assert fetch.started == 2
+
+
+@pytest.mark.parametrize("waiters", [1, 3])
+async def test_finished_call_is_forgotten(waiters):
+    flight = SingleFlight()
+    fetch = SlowFetch()
+    fetch.release.set()
+    await asyncio.gather(*(flight.do("ip:1", fetch) for _ in range(waiters)))
+    await flight.do("ip:1", fetch)
+
+    assert fetch.started == 2
+    assert flight.stats()["in_flight"] == 0
@@ -0,0 +1,104 @@
+"""Планировщик решений капчи против фейкового провайдера симулятора (`/simulator/in.php`, `res.php`)."""
+import asyncio
+import random
+
+import httpx
+import pytest
+
+from src.domain.errors import CaptchaError
+from src.infrastructure.captcha import SolveScheduler
+from src.infrastructure.config import CaptchaConfig
+from src.infrastructure.simulator.captcha_image import random_code, render_code
+
+from tests.fakes import simulator_stats
+
+
+BASE_URL = "http://simulator/simulator"
+
+
+@pytest.fixture
+def scheduler(simulator):
+    """Фабрика планировщика против симулятора: `(планировщик, транспорт симулятора)`."""
+
+    def build(solver_latency_ms: float = 100, **captcha) -> tuple[SolveScheduler, httpx.ASGITransport]:
+        transport, _ = simulator(solver_latency_ms=solver_latency_ms)
+        config = CaptchaConfig(
+            api_key="test",
+            **{"poll_first_delay_s": 0.05, "poll_min_interval_s": 0.01, "poll_max_interval_s": 0.05, **captcha},
+        )
+        return SolveScheduler(BASE_URL, "test", config, transport=transport), transport
+
+    return build
+
+
+def _captchas(count: int) -> list[tuple[str, bytes]]:
+    rng = random.Random(7)
+    codes = [random_code(rng, 5) for _ in range(count)]
+    return [(code, render_code(code, rng)) for code in codes]
+
+
+async def test_concurrent_solves_share_batched_polls(scheduler):
+    solver, transport = scheduler()
+    captchas = _captchas(8)
+    try:
+        answers = await asyncio.gather(*(solver.solve(image) for _, image in captchas))
+        provider = await simulator_stats(transport)
+        stats = solver.stats()
+    finally:
+        await solver.close()
+
+    assert [code for _, code in answers] == [code for code, _ in captchas]
+    assert len({task_id for task_id, _ in answers}) == 8
+    assert provider["provider_tasks"] == 8
+    # Все задачи отправлены одновременно и опрашиваются общими запросами res.php?ids=…
+    assert provider["provider_polls"] == stats["polls"]
+    assert stats["polls"] < 8
+    assert stats["tasks_per_poll"] > 1
+    assert stats["outstanding"] == 0
+
+
+async def test_unsolvable_image_fails_with_provider_error(scheduler):
+    solver, _ = scheduler()
+    try:
+        with pytest.raises(CaptchaError, match="ERROR_CAPTCHA_UNSOLVABLE"):
+            await solver.solve(b"not a captcha")
+    finally:
+        await solver.close()
+
+
+async def test_solve_timeout_raises_captcha_error(scheduler):
+    solver, _ = scheduler(solver_latency_ms=10_000, solve_timeout_s=0.2)
+    try:
+        with pytest.raises(CaptchaError, match="не решил капчу за"):
+            await solver.solve(_captchas(1)[0][1])
+        stats = solver.stats()
+    finally:
+        await solver.close()
+
+    assert stats["timeouts"] == 1
+    assert stats["outstanding"] == 0
+
+
+async def test_report_incorrect_reaches_provider(scheduler):
+    solver, transport = scheduler()
+    try:
+        task_id, _ = await solver.solve(_captchas(1)[0][1])
+        await solver.report_incorrect(task_id)
+        provider = await simulator_stats(transport)
+    finally:
+        await solver.close()
+
+    assert provider["provider_reports"] == 1
+
+
+async def test_first_poll_follows_observed_solve_time(scheduler):
+    solver, _ = scheduler(solver_latency_ms=20, poll_first_delay_s=0.3)
+    try:
+        # Пока нет статистики, первый опрос — через poll_first_delay_s; после 10 решений — около p10
+        await asyncio.gather(*(solver.solve(image) for _, image in _captchas(10)))
+        stats = solver.stats()
+    finally:
+        await solver.close()
+
+    assert stats["first_poll_s"] < 0.3
+    assert stats["solve_p50_s"] is not None
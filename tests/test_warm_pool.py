@@ -0,0 +1,150 @@
+"""Пул страниц с заранее решенной капчей: подготовка, выдача поиску, протухание и отмена."""
+import asyncio
+from collections.abc import Callable
+
+import pytest
+
+from src.domain.errors import CaptchaError
+from src.infrastructure.captcha import CaptchaAnswer
+from src.infrastructure.config import BrowserConfig, SessionConfig, Settings, WarmPoolConfig
+from src.infrastructure.fssp_client import FsspClient
+from src.infrastructure.session import SessionPool
+from src.infrastructure.warm_pool import CaptchaPagePool
+
+from tests.fakes import FakeBrowser, FakeSolver
+
+
+class FakeForm:
+    """Подмена `open_search_page` и `solve_captcha`: капча «решается», пока открыт `gate`."""
+
+    def __init__(self):
+        self.gate = asyncio.Event()
+        self.gate.set()
+        self.error: Exception | None = None
+        self.opened = 0
+
+    async def open_search_page(self, page, url, browser_cfg) -> None:
+        self.opened += 1
+
+    async def solve_captcha(self, page, solver, browser_cfg) -> CaptchaAnswer:
+        await self.gate.wait()
+        if self.error is not None:
+            raise self.error
+        return CaptchaAnswer(code="12345", backend="fake")
+
+
+@pytest.fixture
+def form(monkeypatch) -> FakeForm:
+    form = FakeForm()
+    monkeypatch.setattr("src.infrastructure.warm_pool.open_search_page", form.open_search_page)
+    monkeypatch.setattr("src.infrastructure.warm_pool.solve_captcha", form.solve_captcha)
+    return form
+
+
+@pytest.fixture
+def warm_pool() -> Callable[..., tuple[CaptchaPagePool, FakeBrowser]]:
+    def build(pool_size: int = 3, **overrides) -> tuple[CaptchaPagePool, FakeBrowser]:
+        browser = FakeBrowser(slots=pool_size)
+        settings = Settings(
+            RUCAPTCH_API_KEY="test",
+            browser=BrowserConfig(pool_size=pool_size),
+            warm_pool=WarmPoolConfig(**{"enabled": True, "size": 2, "retry_delay_s": 0, **overrides}),
+        )
+        return CaptchaPagePool(browser, FakeSolver(), settings), browser
+
+    return build
+
+
+async def until(predicate: Callable[[], bool], timeout: float = 1) -> None:
+    async with asyncio.timeout(timeout):
+        while not predicate():
+            await asyncio.sleep(0.01)
+
+
+async def test_pool_keeps_size_pages_and_refills_after_take(form, warm_pool):
+    pool, browser = warm_pool(pool_size=3, size=5)
+    await pool.start()
+    try:
+        # Один контекст браузера всегда остается холодным запросам
+        await until(lambda: pool.stats()["ready"] == 2)
+        warm = pool.take()
+        await until(lambda: pool.stats()["ready"] == 2)
+    finally:
+        await pool.close()
+
+    assert warm is not None
+    assert warm.answer.code == "12345"
+    assert warm.page in warm.context.pages
+    stats = pool.stats()
+    assert (stats["size"], stats["hits"], stats["misses"]) == (2, 1, 0)
+    assert browser.opened == 3
+    # Выданная страница принадлежит поиску, close возвращает только оставшиеся в пуле
+    assert browser.released == 2
+    assert not warm.context.closed
+
+
+async def test_stale_pages_are_discarded_on_take(form, warm_pool):
+    pool, browser = warm_pool(max_age_s=90)
+    await pool.start()
+    try:
+        await until(lambda: pool.stats()["ready"] == 2)
+        form.gate.clear()
+        for warm in pool._ready:
+            warm.solved_at -= 91
+
+        assert pool.take() is None
+        await until(lambda: browser.released == 2)
+        stats = pool.stats()
+    finally:
+        await pool.close()
+
+    assert (stats["hits"], stats["misses"], stats["stale_discarded"]) == (0, 1, 2)
+
+
+async def test_failed_preparation_returns_context(form, warm_pool):
+    form.error = CaptchaError("решатель недоступен")
+    pool, browser = warm_pool(size=1)
+    await pool.start()
+    try:
+        await until(lambda: pool.stats()["failures"] >= 2)
+    finally:
+        await pool.close()
+
+    # Ни неудачная попытка, ни отмененная повторная не оставили контекст занятым
+    assert browser.opened == browser.released >= 2
+    assert pool.stats()["ready"] == 0
+
+
+async def test_close_cancels_preparation_and_returns_contexts(form, warm_pool):
+    form.gate.clear()
+    pool, browser = warm_pool(size=2, refill_concurrency=2)
+    await pool.start()
+    await until(lambda: browser.opened == 2)
+
+    await asyncio.wait_for(pool.close(), timeout=1)
+
+    assert browser.released == 2
+    assert pool.stats()["preparing"] == 0
+
+
+async def test_search_checks_out_warm_page_as_session(form, warm_pool):
+    pool, browser = warm_pool(size=1)
+    sessions = SessionPool(browser, SessionConfig())
+    client = FsspClient(FakeSolver(), browser, sessions, warm_pool=pool)
+    await pool.start()
+    try:
+        await until(lambda: pool.stats()["ready"] == 1)
+        form.gate.clear()
+        warm_session, warm_answer = await client._checkout()
+        cold_session, cold_answer = await client._checkout()
+        # После поиска прогретая страница живет дальше как обычная сессия пула
+        await sessions.release(warm_session, reusable=True)
+        reused = await sessions.acquire()
+    finally:
+        await pool.close()
+
+    assert warm_answer.code == "12345"
+    assert cold_answer is None
+    assert cold_session.page is not warm_session.page
+    assert reused is warm_session
+    assert pool.stats()["hits"] == pool.stats()["misses"] == 1